@@ -3,4 +3,9 @@ Heart Disease Predictor API
 A production-ready ML service for predicting heart disease risk.
 """
 
+import time
+
+# Taken before anything else in the package loads; app.main reports the import time
+IMPORT_START = time.perf_counter()
+
 __version__ = "1.0.0"
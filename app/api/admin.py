@@ -0,0 +1,57 @@
+"""Administrative API endpoints."""
+
+import secrets
+
+from fastapi import APIRouter, Header, HTTPException, status
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import Settings, get_settings
+from app.core.logging import get_logger
+from app.models.schemas import ModelType
+from app.services.reload import ReloadError, get_model_reloader
+
+settings = get_settings()
+logger = get_logger(__name__)
+router = APIRouter(prefix="/api/v1/admin", tags=["Admin"])
+
+# The committed placeholder key; admin endpoints stay closed until it is replaced
+PLACEHOLDER_API_KEY = Settings.model_fields["API_KEY"].default
+
+
+def require_api_key(x_api_key: str):
+    """Reject requests without the configured API key, and all requests if none is configured."""
+    if settings.API_KEY in ("", PLACEHOLDER_API_KEY):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Admin endpoints are disabled until API_KEY is set"
+        )
+    if not secrets.compare_digest(x_api_key.encode(), settings.API_KEY.encode()):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid API key")
+
+
+@router.post(
+    "/reload",
+    summary="Reload a Model",
+    description=(
+        "Load the model's files again, check the new model on the canary set and swap it in. "
+        "Requests already in flight finish on the previous model. Requires the X-API-Key header."
+    )
+)
+async def reload_model(
+    model_type: ModelType = "random_forest",
+    x_api_key: str = Header("")
+):
+    """Hot-reload a model (and the models built from it) without downtime."""
+    require_api_key(x_api_key)
+    try:
+        # Loading and the canary check are CPU-bound; keep them off the event loop
+        swapped = await run_in_threadpool(get_model_reloader().reload, model_type)
+        return {"reloaded": swapped}
+    except ReloadError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except Exception as e:
+        logger.error(f"Reload error: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Model reload failed"
+        )
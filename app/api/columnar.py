@@ -0,0 +1,147 @@
+"""Columnar (JSON arrays) and binary (float32 matrix) batch formats."""
+
+import json
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.models.schemas import feature_constraints
+from app.services.prediction import FEATURE_NAMES, RISK_LEVELS, risk_level_codes
+
+BINARY_MEDIA_TYPE = "application/octet-stream"
+SHAPE_HEADER = "X-Matrix-Shape"
+COLUMNS_HEADER = "X-Matrix-Columns"
+RISK_LEVELS_HEADER = "X-Risk-Levels"
+
+# Binary responses carry one float32 row per patient with these columns;
+# risk_level holds the index into the X-Risk-Levels header
+BINARY_RESPONSE_COLUMNS = ["prediction", "probability", "risk_level"]
+
+# Validation errors listed per request; further invalid rows are not reported
+MAX_REPORTED_ERRORS = 20
+
+
+class ColumnarFormatError(ValueError):
+    """Raised when a columnar or binary request body is malformed."""
+
+
+FEATURE_CONSTRAINTS = feature_constraints(FEATURE_NAMES)
+
+
+def parse_json_columns(body: bytes) -> np.ndarray:
+    """Parse a JSON object of 13 parallel feature arrays into an (n, 13) matrix."""
+    try:
+        columns = json.loads(body)
+    except ValueError as e:
+        raise ColumnarFormatError(f"Invalid JSON: {str(e)}")
+    if not isinstance(columns, dict):
+        raise ColumnarFormatError("Body must be a JSON object of feature arrays")
+
+    missing = [name for name in FEATURE_NAMES if name not in columns]
+    if missing:
+        raise ColumnarFormatError(f"Missing feature columns: {', '.join(missing)}")
+
+    lengths = {
+        len(columns[name]) if isinstance(columns[name], list) else -1
+        for name in FEATURE_NAMES
+    }
+    if -1 in lengths or len(lengths) != 1:
+        raise ColumnarFormatError("Feature columns must be arrays of equal length")
+
+    X = np.empty((lengths.pop(), len(FEATURE_NAMES)))
+    for j, name in enumerate(FEATURE_NAMES):
+        try:
+            X[:, j] = columns[name]
+        except (TypeError, ValueError):
+            raise ColumnarFormatError(f"Column '{name}' must contain only numbers")
+    return X
+
+
+def parse_binary_matrix(body: bytes, shape_header: Optional[str]) -> np.ndarray:
+    """Decode a little-endian float32 (n, 13) matrix whose shape is sent in a header."""
+    if not shape_header:
+        raise ColumnarFormatError(f"Missing {SHAPE_HEADER} header")
+    try:
+        n_rows, n_cols = (int(part) for part in shape_header.split(","))
+    except ValueError:
+        raise ColumnarFormatError(
+            f"{SHAPE_HEADER} must look like '<rows>,{len(FEATURE_NAMES)}'"
+        )
+    if n_cols != len(FEATURE_NAMES) or n_rows < 0:
+        raise ColumnarFormatError(
+            f"Matrix must have {len(FEATURE_NAMES)} columns in {FEATURE_NAMES} order"
+        )
+    expected = n_rows * n_cols * 4
+    if len(body) != expected:
+        raise ColumnarFormatError(
+            f"Body is {len(body)} bytes, expected {expected} for shape {n_rows}x{n_cols}"
+        )
+
+    X = np.frombuffer(body, dtype="<f4").reshape(n_rows, n_cols).astype(np.float64)
+    # float32 keeps ~7 significant digits; recover the decimal values that were sent
+    return np.round(X, 6)
+
+
+def validate_feature_matrix(X: np.ndarray) -> List[Dict]:
+    """Apply the PatientData rules to every row at once; returns FastAPI-style errors."""
+    errors = []
+    for j, name in enumerate(FEATURE_NAMES):
+        column = X[:, j]
+        rule = FEATURE_CONSTRAINTS[name]
+        bad = ~np.isfinite(column)
+        if rule["integer"]:
+            bad |= column != np.floor(column)
+        if rule["allowed"] is not None:
+            bad |= ~np.isin(column, rule["allowed"])
+        if rule["ge"] is not None:
+            bad |= column < rule["ge"]
+        if rule["le"] is not None:
+            bad |= column > rule["le"]
+
+        for row in np.flatnonzero(bad)[:MAX_REPORTED_ERRORS - len(errors)].tolist():
+            errors.append({
+                "loc": ["body", name, row],
+                "msg": _describe(rule),
+                "input": X[row, j].item()
+            })
+        if len(errors) >= MAX_REPORTED_ERRORS:
+            break
+    return errors
+
+
+def _describe(rule: Dict) -> str:
+    """Human-readable statement of a feature rule."""
+    if rule["allowed"] is not None:
+        return f"Input should be one of {[int(v) for v in rule['allowed']]}"
+    kind = "an integer" if rule["integer"] else "a number"
+    return f"Input should be {kind} between {rule['ge']} and {rule['le']}"
+
+
+def columnar_response(predictions: np.ndarray, probabilities: np.ndarray) -> Dict:
+    """Build the JSON columnar response: one array per output field."""
+    return {
+        "prediction": predictions.astype(int).tolist(),
+        "probability": np.round(probabilities, 2).tolist(),
+        "risk_level": RISK_LEVELS[risk_level_codes(probabilities)].tolist(),
+        "count": len(predictions),
+        "timestamp": datetime.utcnow().isoformat() + "Z"
+    }
+
+
+def binary_response(predictions: np.ndarray, probabilities: np.ndarray) -> bytes:
+    """Encode predictions as a little-endian float32 (n, 3) matrix."""
+    out = np.empty((len(predictions), len(BINARY_RESPONSE_COLUMNS)), dtype="<f4")
+    out[:, 0] = predictions
+    out[:, 1] = probabilities
+    out[:, 2] = risk_level_codes(probabilities)
+    return out.tobytes()
+
+
+def binary_response_headers(n_rows: int) -> Dict[str, str]:
+    """Headers describing a binary prediction matrix."""
+    return {
+        SHAPE_HEADER: f"{n_rows},{len(BINARY_RESPONSE_COLUMNS)}",
+        COLUMNS_HEADER: ",".join(BINARY_RESPONSE_COLUMNS),
+        RISK_LEVELS_HEADER: ",".join(RISK_LEVELS.tolist())
+    }
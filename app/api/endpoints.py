@@ -1,37 +1,78 @@
 """API endpoints for predictions."""
 
-from fastapi import APIRouter, HTTPException, status
-from datetime import datetime
-from typing import List
+from fastapi import APIRouter, HTTPException, Query, Request, status
+from fastapi.responses import JSONResponse, Response
+from typing import List, Optional
 
-from app.models.schemas import PatientData
-from app.services.prediction import PredictionService
+from app.api.columnar import (
+    BINARY_MEDIA_TYPE,
+    SHAPE_HEADER,
+    ColumnarFormatError,
+    binary_response,
+    binary_response_headers,
+    columnar_response,
+    parse_binary_matrix,
+    parse_json_columns,
+    validate_feature_matrix,
+)
+from app.api.serialization import PredictionJSONResponse, utc_timestamp
+from app.api.streaming import NDJSONStreamingResponse, score_ndjson_stream
+from app.models.schemas import ModelType, PatientData
+from app.services.registry import get_model_registry
+from app.services.batcher import get_micro_batcher
+from app.services.executor import InferenceOverloadedError, get_inference_executor
+from app.core.config import get_settings
 from app.core.logging import get_logger
+from app.core.metrics import get_instrumentation
+from app.services.prediction import RISK_LEVELS, risk_level_codes, to_matrix
 
+settings = get_settings()
 logger = get_logger(__name__)
+instrumentation = get_instrumentation()
 router = APIRouter(prefix="/api/v1", tags=["Predictions"])
 
-# Initialize prediction service
-prediction_service = PredictionService()
+MODEL_TYPE_QUERY = Query(
+    None,
+    description=(
+        "Model to score with; unset uses the server's default model, auto the "
+        "forest cascade (or the default model with CASCADE_ENABLED=false)"
+    )
+)
 
 
 @router.post(
     "/predict",
     status_code=status.HTTP_200_OK,
     summary="Predict Heart Disease Risk",
-    description="Predict the risk of heart disease based on patient health data."
+    description="Predict the risk of heart disease based on patient health data.",
+    response_class=PredictionJSONResponse
 )
-async def predict_heart_disease(patient_data: PatientData):
+async def predict_heart_disease(
+    patient_data: PatientData,
+    model_type: Optional[ModelType] = MODEL_TYPE_QUERY
+):
     """
     Predict heart disease risk for a single patient.
     
     Returns prediction with probability and risk level.
     """
     try:
-        result = prediction_service.predict(patient_data)
-        result["timestamp"] = datetime.utcnow().isoformat() + "Z"
-        return result
+        model_used = get_model_registry().resolve(model_type)
+        if settings.MICRO_BATCH_ENABLED:
+            result = await get_micro_batcher().submit(patient_data, model_used)
+        else:
+            result = (await get_inference_executor().predict_batch([patient_data], model_used))[0]
+        instrumentation.count(model_used, (result["risk_level"],))
+        result["model_used"] = model_used
+        result["timestamp"] = utc_timestamp()
+        return PredictionJSONResponse(content=result)
         
+    except InferenceOverloadedError as e:
+        logger.warning(f"Prediction rejected: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Prediction capacity exceeded. Please retry shortly."
+        )
     except Exception as e:
         logger.error(f"Prediction error: {str(e)}", exc_info=True)
         raise HTTPException(
@@ -44,26 +85,40 @@ async def predict_heart_disease(patient_data: PatientData):
     "/predict/batch",
     status_code=status.HTTP_200_OK,
     summary="Batch Predict Heart Disease Risk",
-    description="Predict heart disease risk for multiple patients."
+    description="Predict heart disease risk for multiple patients.",
+    response_class=PredictionJSONResponse
 )
-async def predict_batch(patients: dict):
+async def predict_batch(
+    patients: dict,
+    model_type: Optional[ModelType] = MODEL_TYPE_QUERY
+):
     """
     Predict heart disease risk for multiple patients.
     
-    Returns predictions for all patients.
+    Returns predictions for all patients, serialized straight from the
+    model's output arrays.
     """
     try:
+        model_used = get_model_registry().resolve(model_type)
+        start = instrumentation.start()
         patient_list = [PatientData(**p) for p in patients["patients"]]
-        results = prediction_service.predict_batch(patient_list)
-        
-        for result in results:
-            result["timestamp"] = datetime.utcnow().isoformat() + "Z"
-        
-        return {
-            "predictions": results,
-            "count": len(results)
-        }
+        instrumentation.observe(model_used, "validate", len(patient_list), start)
+        start = instrumentation.start()
+        X = to_matrix(patient_list)
+        instrumentation.observe(model_used, "to_matrix", len(patient_list), start)
+        predictions, probabilities = await get_inference_executor().predict_matrix(X, model_used)
+        instrumentation.count(model_used, RISK_LEVELS[risk_level_codes(probabilities)])
+        start = instrumentation.start()
+        response = PredictionJSONResponse.batch(predictions, probabilities, model_used)
+        instrumentation.observe(model_used, "serialize", len(predictions), start)
+        return response
         
+    except InferenceOverloadedError as e:
+        logger.warning(f"Batch prediction rejected: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Prediction capacity exceeded. Please retry shortly."
+        )
     except Exception as e:
         logger.error(f"Batch prediction error: {str(e)}", exc_info=True)
         raise HTTPException(
@@ -72,22 +127,130 @@ async def predict_batch(patients: dict):
         )
 
 
+@router.post(
+    "/predict/batch/columnar",
+    status_code=status.HTTP_200_OK,
+    summary="Batch Predict from Columnar or Binary Input",
+    description=(
+        "Predict for a cohort sent either as a JSON object of 13 parallel feature arrays, "
+        "or as a raw little-endian float32 matrix (Content-Type: application/octet-stream) "
+        f"whose shape is given in the {SHAPE_HEADER} header as '<rows>,13'. "
+        "The response uses the same form as the request."
+    )
+)
+async def predict_batch_columnar(
+    request: Request,
+    model_type: Optional[ModelType] = MODEL_TYPE_QUERY
+):
+    """
+    Predict heart disease risk for a cohort without per-patient objects.
+    
+    Returns parallel prediction, probability and risk level arrays.
+    """
+    binary = request.headers.get("content-type", "").startswith(BINARY_MEDIA_TYPE)
+    body = await request.body()
+    model_used = get_model_registry().resolve(model_type)
+    start = instrumentation.start()
+    try:
+        if binary:
+            X = parse_binary_matrix(body, request.headers.get(SHAPE_HEADER))
+        else:
+            X = parse_json_columns(body)
+    except ColumnarFormatError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    errors = validate_feature_matrix(X)
+    if errors:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=errors)
+    instrumentation.observe(model_used, "validate", len(X), start)
+    
+    try:
+        predictions, probabilities = await get_inference_executor().predict_matrix(X, model_used)
+    except InferenceOverloadedError as e:
+        logger.warning(f"Columnar batch prediction rejected: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Prediction capacity exceeded. Please retry shortly."
+        )
+    except Exception as e:
+        logger.error(f"Columnar batch prediction error: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Batch prediction failed: {str(e)}"
+        )
+    
+    instrumentation.count(model_used, RISK_LEVELS[risk_level_codes(probabilities)])
+    start = instrumentation.start()
+    if binary:
+        response = Response(
+            content=binary_response(predictions, probabilities),
+            media_type=BINARY_MEDIA_TYPE,
+            headers=binary_response_headers(len(predictions))
+        )
+    else:
+        content = columnar_response(predictions, probabilities)
+        content["model_used"] = model_used
+        response = JSONResponse(content=content)
+    instrumentation.observe(model_used, "serialize", len(predictions), start)
+    return response
+
+
+@router.post(
+    "/predict/stream",
+    status_code=status.HTTP_200_OK,
+    summary="Stream Predictions for NDJSON Input",
+    description=(
+        "Score newline-delimited JSON patients as they arrive and stream NDJSON results back. "
+        "Each output line carries the 1-based input line number and either the prediction "
+        "or an inline error for that line."
+    ),
+    response_class=NDJSONStreamingResponse
+)
+async def predict_stream(
+    request: Request,
+    model_type: Optional[ModelType] = MODEL_TYPE_QUERY
+):
+    """
+    Predict heart disease risk for an NDJSON stream of patients.
+    
+    Memory use is bounded by STREAM_CHUNK_SIZE, whatever the input size.
+    """
+    return NDJSONStreamingResponse(
+        score_ndjson_stream(
+            request.stream(),
+            get_inference_executor(),
+            chunk_size=settings.STREAM_CHUNK_SIZE,
+            max_line_bytes=settings.STREAM_MAX_LINE_BYTES,
+            model_type=get_model_registry().resolve(model_type)
+        )
+    )
+
+
 @router.get(
     "/model/info",
     summary="Get Model Information",
-    description="Retrieve information about the ML model."
+    description=(
+        "Retrieve information about the ML model, plus the load state, memory footprint "
+        "and observed latency of every servable model."
+    )
 )
 async def get_model_info():
-    """Get information about the model."""
+    """Get information about the model, as recorded in its exported artifact."""
     try:
-        features = prediction_service.get_feature_names()
+        registry = get_model_registry()
+        service = registry.get()
+        features = service.manifest.get("feature_names", service.get_feature_names())
+        metadata = service.manifest.get("metadata", {})
         return {
-            "model_name": "RandomForestClassifier",
-            "version": "1.0.0",
+            "model_name": service.manifest.get("estimator", "RandomForestClassifier"),
+            "version": metadata.get("version"),
             "features": features,
             "feature_count": len(features),
-            "trained_date": "2024-01-15",
-            "accuracy": 0.85
+            "trained_date": metadata.get("trained_date"),
+            "accuracy": metadata.get("accuracy"),
+            "checksum": service.manifest.get("checksum"),
+            "default_model": registry.default_model,
+            "models": registry.describe()
         }
     except Exception as e:
         logger.error(f"Error getting model info: {str(e)}", exc_info=True)
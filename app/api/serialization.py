@@ -0,0 +1,94 @@
+"""Direct JSON serialization of prediction results."""
+
+import json
+from datetime import datetime
+from typing import Any, Optional
+
+import numpy as np
+from starlette.responses import Response
+
+from app.services.prediction import RISK_LEVELS, risk_level_codes
+
+
+def utc_timestamp() -> str:
+    """The response timestamp format: ISO 8601 UTC with a Z suffix."""
+    return datetime.utcnow().isoformat() + "Z"
+
+
+def _dumps(content: Any) -> bytes:
+    """Compact JSON, the same bytes as JSONResponse renders."""
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def encode_prediction_rows(
+    predictions: np.ndarray, probabilities: np.ndarray, timestamp: str
+) -> np.ndarray:
+    """
+    Encode each row as the JSON object PredictionService.format_results describes.
+
+    A row's JSON only depends on its class, its probability rounded to two
+    decimals and its risk level, so each distinct combination is encoded
+    once and the rows are gathered from those fragments. Returns an object
+    array holding one bytes object per row.
+    """
+    if len(predictions) == 0:
+        return np.empty(0, dtype=object)
+    classes, class_index = np.unique(predictions.astype(int), return_inverse=True)
+    # np.round(p, 2) is rint(p * 100) / 100, so cents / 100 reproduces it exactly
+    cents, cent_index = np.unique(np.rint(probabilities * 100), return_inverse=True)
+    codes = risk_level_codes(probabilities)
+    keys = (class_index * len(cents) + cent_index) * len(RISK_LEVELS) + codes
+    unique_keys, row_fragment = np.unique(keys, return_inverse=True)
+
+    suffix = f',"timestamp":{json.dumps(timestamp)}}}'
+    fragments = np.empty(len(unique_keys), dtype=object)
+    for i, key in enumerate(unique_keys.tolist()):
+        rest, code = divmod(key, len(RISK_LEVELS))
+        klass, cent = divmod(rest, len(cents))
+        fragments[i] = (
+            f'{{"prediction":{int(classes[klass])},'
+            f'"probability":{json.dumps(float(cents[cent]) / 100)},'
+            f'"risk_level":{json.dumps(RISK_LEVELS[code])}{suffix}'
+        ).encode()
+    return fragments.take(row_fragment)
+
+
+def encode_batch(
+    predictions: np.ndarray,
+    probabilities: np.ndarray,
+    model_used: str,
+    timestamp: Optional[str] = None
+) -> bytes:
+    """Render the /predict/batch response body straight from the model's arrays."""
+    rows = encode_prediction_rows(predictions, probabilities, timestamp or utc_timestamp())
+    return b"".join((
+        b'{"predictions":[',
+        b",".join(rows.tolist()),
+        f'],"count":{len(rows)},"model_used":{json.dumps(model_used)}}}'.encode()
+    ))
+
+
+class PredictionJSONResponse(Response):
+    """
+    JSON response for prediction endpoints.
+
+    Takes either an encoded body (from ``batch``) or a plain dict, which is
+    rendered compactly like JSONResponse without FastAPI's jsonable_encoder
+    pass over the structure.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return _dumps(content)
+
+    @classmethod
+    def batch(
+        cls, predictions: np.ndarray, probabilities: np.ndarray, model_used: str
+    ) -> "PredictionJSONResponse":
+        """Batch response with one timestamp shared by every row."""
+        return cls(content=encode_batch(predictions, probabilities, model_used))
@@ -0,0 +1,147 @@
+"""Incremental NDJSON scoring for the streaming endpoint."""
+
+import json
+from typing import AsyncIterator, Dict, List, Optional, Tuple, Union
+
+from pydantic import ValidationError
+from starlette.requests import ClientDisconnect
+from starlette.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+from app.core.logging import get_logger
+from app.core.metrics import get_instrumentation
+from app.models.schemas import PatientData
+from app.services.executor import InferenceExecutor
+
+logger = get_logger(__name__)
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+class NDJSONStreamingResponse(StreamingResponse):
+    """
+    Streaming response whose body is produced while the request is still being read.
+
+    StreamingResponse normally listens for a client disconnect in parallel,
+    which would compete with the body generator for request messages. Here
+    the generator is the only reader, and a disconnect surfaces as
+    ClientDisconnect from ``request.stream()``.
+    """
+
+    media_type = NDJSON_MEDIA_TYPE
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await self.stream_response(send)
+        except ClientDisconnect:
+            logger.warning("Client disconnected during NDJSON stream")
+            return
+        if self.background is not None:
+            await self.background()
+
+
+# A parsed input line: its 1-based line number and a patient or an error line
+Entry = Tuple[int, Union[PatientData, Dict]]
+
+
+def _parse_line(line_no: int, line: bytes) -> Entry:
+    """Validate one NDJSON line into a patient, or an inline error record."""
+    try:
+        return line_no, PatientData.model_validate_json(line)
+    except ValidationError as e:
+        return line_no, {
+            "line": line_no,
+            "error": "Validation failed",
+            "detail": json.loads(e.json(include_url=False))
+        }
+
+
+async def _score_chunk(
+    executor: InferenceExecutor, entries: List[Entry], model_type: Optional[str]
+) -> bytes:
+    """Score the valid patients of a chunk and render every entry, in input order."""
+    patients = [entry for _, entry in entries if isinstance(entry, PatientData)]
+    try:
+        if patients:
+            scored = await executor.predict_batch(patients, model_type)
+            get_instrumentation().count(model_type, (result["risk_level"] for result in scored))
+            results = iter(scored)
+        else:
+            results = iter(())
+        failure = None
+    except Exception as e:
+        logger.error(f"Stream chunk of {len(patients)} failed: {str(e)}", exc_info=True)
+        failure = f"Prediction failed: {str(e)}"
+
+    lines = []
+    for line_no, entry in entries:
+        if not isinstance(entry, PatientData):
+            record = entry
+        elif failure is not None:
+            record = {"line": line_no, "error": failure}
+        else:
+            record = {"line": line_no, **next(results)}
+        lines.append(json.dumps(record))
+    return ("\n".join(lines) + "\n").encode()
+
+
+async def score_ndjson_stream(
+    body: AsyncIterator[bytes],
+    executor: InferenceExecutor,
+    chunk_size: int,
+    max_line_bytes: int,
+    model_type: Optional[str] = None
+) -> AsyncIterator[bytes]:
+    """
+    Read NDJSON patients from ``body`` and yield NDJSON results chunk by chunk.
+
+    At most ``chunk_size`` parsed lines and one partial input line are held
+    at a time, and the next part of the body is only read once the
+    previous chunk's results have been handed on, so memory use does not
+    grow with the size of the input. Blank lines are skipped but still
+    counted in line numbers. A line longer than ``max_line_bytes`` is
+    reported as an error and skipped.
+    """
+    chunk_size = max(1, chunk_size)
+    entries: List[Entry] = []
+    buffer = b""
+    line_no = 0
+    skipping = False
+
+    def too_long(line_no: int) -> Entry:
+        return line_no, {"line": line_no, "error": f"Line exceeds {max_line_bytes} bytes"}
+
+    def add_line(line: bytes):
+        nonlocal line_no
+        line_no += 1
+        if len(line) > max_line_bytes:
+            entries.append(too_long(line_no))
+        elif line.strip():
+            entries.append(_parse_line(line_no, line))
+
+    async for data in body:
+        lines = (buffer + data).split(b"\n")
+        buffer = lines.pop()
+        for line in lines:
+            if skipping:
+                # Tail of an oversized line that was already reported
+                skipping = False
+                continue
+            add_line(line)
+            if len(entries) >= chunk_size:
+                yield await _score_chunk(executor, entries, model_type)
+                entries = []
+
+        if skipping:
+            buffer = b""
+        elif len(buffer) > max_line_bytes:
+            # Report the oversized line now and drop the rest as it streams in
+            line_no += 1
+            entries.append(too_long(line_no))
+            skipping = True
+            buffer = b""
+
+    if buffer.strip():
+        add_line(buffer)
+    if entries:
+        yield await _score_chunk(executor, entries, model_type)
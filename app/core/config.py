@@ -23,14 +23,68 @@ class Settings(BaseSettings):
     FOREST_MODEL_PATH: str = "models/heart_disease_model_forest.joblib"
     KNN_SCALER_PATH: str = "models/scaler_knn.joblib"
     FOREST_SCALER_PATH: str = "models/scaler_forest.joblib"
+    # Pickle-free exports served by the compiled backends (see scripts/export_model.py)
+    FOREST_ARTIFACT_PATH: str = "models/heart_disease_model_forest.artifact"
+    KNN_ARTIFACT_PATH: str = "models/heart_disease_knn_model.artifact"
+    DEFAULT_MODEL: str = "random_forest"  # served when model_type is unset
+    
+    # Inference
+    FOREST_BACKEND: str = "compiled"  # "compiled" (flat node arrays) or "sklearn"
+    COMPILED_FOREST_MAX_ROWS: int = 512  # larger batches use sklearn's C walk
+    KNN_BACKEND: str = "compiled"  # "compiled" (float32 block + BLAS) or "sklearn"
+    KNN_INDEX: str = "brute"  # "brute" or "kd_tree" (built at load time)
+    KNN_GRID_CACHE_ENABLED: bool = True  # exact KNN cache over the quantized input grid
+    CASCADE_ENABLED: bool = True  # model_type=auto runs the cascade, else DEFAULT_MODEL
+    CASCADE_FAST_TREES: int = 16  # forest prefix used as the cheap first stage
+    CASCADE_MARGIN: float = 0.15  # fast-stage rows this close to a risk boundary escalate
+    MODEL_MMAP: bool = True  # serve model artifacts from shared memory-mapped files
+    
+    # Hot model reload (POST /api/v1/admin/reload, or watching the model files)
+    MODEL_RELOAD_WATCH: bool = False
+    MODEL_RELOAD_POLL_SECONDS: float = 10.0
+    MODEL_RELOAD_CANARY_SIZE: int = 256
+    MODEL_RELOAD_MAX_CHANGED: float = 0.25  # share of canary rows allowed to change risk level
+    
+    # Startup: models are loaded and warmed before /ready returns 200
+    WARMUP_ENABLED: bool = True
+    WARMUP_ROWS: int = 64
+    WARMUP_MODELS: List[str] = []  # empty: DEFAULT_MODEL only; others load on first use
+    
+    # Micro-batching of /predict requests
+    MICRO_BATCH_ENABLED: bool = True
+    MICRO_BATCH_MAX_SIZE: int = 64
+    MICRO_BATCH_MAX_WAIT_MS: float = 2.0
+    
+    # Inference executor (keeps model calls off the event loop)
+    INFERENCE_POOL_MODE: str = "thread"  # "thread" or "process"
+    INFERENCE_POOL_SIZE: int = 2
+    INFERENCE_POOL_MAX_QUEUE: int = 256  # jobs waiting beyond this are rejected with 503
+    
+    # Prediction cache (keyed on the validated feature vector)
+    PREDICTION_CACHE_ENABLED: bool = True
+    PREDICTION_CACHE_SIZE: int = 10000
+    PREDICTION_CACHE_TTL_SECONDS: float = 3600
+    PREDICTION_CACHE_OLDPEAK_DECIMALS: int = 2  # oldpeak is rounded to this before scoring
+    
+    # Streaming NDJSON endpoint
+    STREAM_CHUNK_SIZE: int = 1000
+    STREAM_MAX_LINE_BYTES: int = 65536
     
     # API
     API_V1_PREFIX: str = "/api/v1"
     CORS_ORIGINS: List[str] = ["http://localhost:3000", "http://localhost:8000"]
     
+    # Per-stage inference histograms and prediction counts on /metrics
+    INFERENCE_METRICS_ENABLED: bool = True
+    
     # Logging
     LOG_LEVEL: str = "INFO"
     LOG_FILE: str = "logs/app.log"
+    LOG_MAX_BYTES: int = 10 * 1024 * 1024  # rotate the log file beyond this size
+    LOG_BACKUP_COUNT: int = 5
+    LOG_QUEUE_SIZE: int = 10000  # records beyond this are dropped, never waited for
+    LOG_BATCH_SIZE: int = 256
+    LOG_REQUEST_SAMPLE_RATE: float = 1.0  # share of successful requests logged; errors always are
     
     # Security
     SECRET_KEY: str = "your-secret-key-change-in-production"
@@ -1,52 +1,190 @@
 """Logging configuration."""
 
+import atexit
 import logging
+import os
+import queue
 import sys
+import threading
+from logging.handlers import QueueHandler
 from pathlib import Path
+from typing import List, Optional
 from pythonjsonlogger import jsonlogger
 
 from app.core.config import get_settings
+from app.core.metrics import LOG_QUEUE_DEPTH, LOG_RECORDS_DROPPED
 
 settings = get_settings()
 
 
+class DroppingQueueHandler(QueueHandler):
+    """Queue handler that drops (and counts) records when the queue is full, never blocking."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Merge the message arguments now, as they may change before the writer
+        # runs; formatting (including exc_info) is left to the writer thread
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_RECORDS_DROPPED.inc()
+
+
+class LogWriter:
+    """
+    Background thread that writes queued log records.
+
+    Records are taken off the queue in batches of up to ``batch_size``;
+    each batch is formatted and written to stdout and the log file with
+    one write and one flush per stream. The file is rotated once it
+    exceeds ``max_bytes``, keeping ``backup_count`` old files
+    (app.log.1 is the most recent).
+    """
+
+    def __init__(
+        self,
+        records: queue.Queue,
+        log_file: str,
+        max_bytes: int = 10 * 1024 * 1024,
+        backup_count: int = 5,
+        batch_size: int = 256
+    ):
+        """Initialize the writer; call ``start`` to begin draining the queue."""
+        self.records = records
+        self.log_file = Path(log_file)
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.batch_size = max(1, batch_size)
+        self.console_level = logging.INFO
+        self.console_formatter = logging.Formatter(
+            '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+            datefmt='%Y-%m-%d %H:%M:%S'
+        )
+        self.file_formatter = jsonlogger.JsonFormatter(
+            '%(asctime)s %(name)s %(levelname)s %(message)s',
+            datefmt='%Y-%m-%d %H:%M:%S'
+        )
+        self._file = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Open the log file and start the writer thread."""
+        self.log_file.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.log_file, "a", encoding="utf-8")
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Write everything queued so far, then stop the thread and close the file."""
+        if self._thread is None:
+            return
+        try:
+            # Waits only if the queue is full, until the writer makes room
+            self.records.put(None, timeout=5)
+        except queue.Full:
+            pass
+        self._thread.join(timeout=5)
+        self._thread = None
+        self._file.close()
+
+    def _run(self):
+        """Drain the queue batch by batch until the stop sentinel arrives."""
+        while True:
+            batch: List[logging.LogRecord] = [self.records.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.records.get_nowait())
+                except queue.Empty:
+                    break
+            stopping = batch[-1] is None
+            self.write([record for record in batch if record is not None])
+            if stopping:
+                return
+
+    def write(self, batch: List[logging.LogRecord]):
+        """Format and write one batch of records."""
+        if not batch:
+            return
+        try:
+            console = [
+                self.console_formatter.format(record) + "\n"
+                for record in batch if record.levelno >= self.console_level
+            ]
+            if console:
+                sys.stdout.write("".join(console))
+                sys.stdout.flush()
+            self._file.write("".join(self.file_formatter.format(record) + "\n" for record in batch))
+            self._file.flush()
+            if self._file.tell() >= self.max_bytes:
+                self.rotate()
+        except Exception:
+            # Never let a logging failure kill the writer
+            LOG_RECORDS_DROPPED.inc(len(batch))
+
+    def rotate(self):
+        """Shift app.log -> app.log.1 -> ... and start a new file."""
+        self._file.close()
+        if self.backup_count > 0:
+            for i in range(self.backup_count - 1, 0, -1):
+                source = f"{self.log_file}.{i}"
+                if os.path.exists(source):
+                    os.replace(source, f"{self.log_file}.{i + 1}")
+            os.replace(self.log_file, f"{self.log_file}.1")
+        else:
+            self.log_file.unlink()
+        self._file = open(self.log_file, "a", encoding="utf-8")
+
+
+_log_writer: Optional[LogWriter] = None
+
+
 def setup_logging():
-    """Configure application logging."""
-    
-    # Create logs directory if it doesn't exist
-    log_dir = Path(settings.LOG_FILE).parent
-    log_dir.mkdir(parents=True, exist_ok=True)
-    
+    """
+    Configure application logging.
+
+    Loggers only enqueue records (dropping them if LOG_QUEUE_SIZE are
+    already waiting); formatting and disk writes happen on the log writer
+    thread, so a slow disk never holds up a request.
+    """
+    global _log_writer
+    if _log_writer is not None:
+        _log_writer.stop()
+
+    records: queue.Queue = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+    LOG_QUEUE_DEPTH.set_function(records.qsize)
+    _log_writer = LogWriter(
+        records,
+        settings.LOG_FILE,
+        max_bytes=settings.LOG_MAX_BYTES,
+        backup_count=settings.LOG_BACKUP_COUNT,
+        batch_size=settings.LOG_BATCH_SIZE
+    )
+    _log_writer.start()
+
     # Create logger
     logger = logging.getLogger()
     logger.setLevel(getattr(logging, settings.LOG_LEVEL.upper()))
-    
+
     # Remove existing handlers
     logger.handlers = []
-    
-    # Console handler with standard formatting
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(logging.INFO)
-    console_formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    console_handler.setFormatter(console_formatter)
-    logger.addHandler(console_handler)
-    
-    # File handler with JSON formatting for structured logs
-    file_handler = logging.FileHandler(settings.LOG_FILE)
-    file_handler.setLevel(logging.DEBUG)
-    json_formatter = jsonlogger.JsonFormatter(
-        '%(asctime)s %(name)s %(levelname)s %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    file_handler.setFormatter(json_formatter)
-    logger.addHandler(file_handler)
-    
+    logger.addHandler(DroppingQueueHandler(records))
+
     return logger
 
 
+@atexit.register
+def shutdown_logging():
+    """Flush queued records on interpreter exit."""
+    global _log_writer
+    if _log_writer is not None:
+        _log_writer.stop()
+        _log_writer = None
+
+
 def get_logger(name: str) -> logging.Logger:
     """Get a logger instance with the specified name."""
     return logging.getLogger(name)
@@ -0,0 +1,34 @@
+"""Process memory reporting."""
+
+import resource
+import sys
+from typing import Dict
+
+
+def memory_usage() -> Dict[str, int]:
+    """
+    Resident memory of this process in bytes.
+
+    On Linux, ``rss`` is split into ``anon`` (private to the process) and
+    ``file`` (file-backed pages such as memory-mapped models, shared with
+    other processes mapping the same files). Elsewhere only the peak
+    resident size is available, reported as ``rss``.
+    """
+    try:
+        with open("/proc/self/status") as status:
+            fields = dict(line.split(":", 1) for line in status if ":" in line)
+        # Values are reported in kB
+        return {
+            key: int(fields[name].split()[0]) * 1024
+            for key, name in (("rss", "VmRSS"), ("anon", "RssAnon"), ("file", "RssFile"))
+            if name in fields
+        }
+    except OSError:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+        return {"rss": peak if sys.platform == "darwin" else peak * 1024}
+
+
+def format_memory_usage(usage: Dict[str, int]) -> str:
+    """Render memory_usage() for a log line, in MiB."""
+    return ", ".join(f"{key} {value / 2**20:.1f} MiB" for key, value in usage.items())
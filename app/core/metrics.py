@@ -0,0 +1,231 @@
+"""Prometheus metrics shared by the service layer."""
+
+import collections
+import threading
+import time
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+from prometheus_client import Counter, Gauge, Histogram
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+# HTTP requests, labelled by route template
+REQUEST_COUNT = Counter(
+    'http_requests_total',
+    'Total HTTP requests',
+    ['method', 'endpoint', 'status']
+)
+REQUEST_DURATION = Histogram(
+    'http_request_duration_seconds',
+    'HTTP request duration',
+    ['method', 'endpoint']
+)
+
+# Logging pipeline
+LOG_QUEUE_DEPTH = Gauge(
+    'log_queue_depth',
+    'Log records waiting for the background writer'
+)
+LOG_RECORDS_DROPPED = Counter(
+    'log_records_dropped_total',
+    'Log records dropped because the log queue was full or a write failed'
+)
+
+# Inference stages and predictions
+INFERENCE_STAGE_DURATION = Histogram(
+    'inference_stage_duration_seconds',
+    'Time spent in each inference stage per call',
+    ['model', 'stage', 'batch_size'],
+    buckets=(0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001,
+             0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1, 2.5)
+)
+PREDICTION_COUNT = Counter(
+    'predictions_total',
+    'Total predictions made',
+    ['model_type', 'risk_level']
+)
+
+# Upper bound and label of each batch_size bucket
+BATCH_SIZE_BUCKETS = ((1, "1"), (16, "2-16"), (128, "17-128"), (1024, "129-1024"))
+
+# Micro-batching
+BATCH_QUEUE_DEPTH = Gauge(
+    'prediction_batch_queue_depth',
+    'Single-patient predictions waiting to be micro-batched'
+)
+BATCH_SIZE = Histogram(
+    'prediction_batch_size',
+    'Number of patients scored per micro-batch',
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256)
+)
+
+# Inference executor
+INFERENCE_POOL_SIZE = Gauge(
+    'inference_pool_size',
+    'Worker slots in the inference executor'
+)
+INFERENCE_POOL_ACTIVE = Gauge(
+    'inference_pool_active',
+    'Inference jobs currently running'
+)
+INFERENCE_POOL_QUEUED = Gauge(
+    'inference_pool_queued',
+    'Inference jobs submitted but not yet running'
+)
+INFERENCE_POOL_REJECTED = Counter(
+    'inference_pool_rejected_total',
+    'Inference jobs rejected because the executor backlog was full'
+)
+INFERENCE_POOL_CANCELLED = Counter(
+    'inference_pool_cancelled_total',
+    'Inference jobs abandoned by their caller before completing'
+)
+
+# Prediction cache
+PREDICTION_CACHE_HITS = Counter(
+    'prediction_cache_hits_total',
+    'Rows answered from the prediction cache',
+    ['model']
+)
+PREDICTION_CACHE_MISSES = Counter(
+    'prediction_cache_misses_total',
+    'Rows that had to be scored by the model',
+    ['model']
+)
+PREDICTION_CACHE_EVICTIONS = Counter(
+    'prediction_cache_evictions_total',
+    'Entries removed from the prediction cache',
+    ['model', 'reason']
+)
+PREDICTION_CACHE_SIZE = Gauge(
+    'prediction_cache_entries',
+    'Entries currently held in the prediction cache',
+    ['model']
+)
+
+# Cascade (model_type=auto)
+CASCADE_ROWS = Counter(
+    'cascade_rows_total',
+    'Rows finally scored by each cascade stage',
+    ['stage']
+)
+CASCADE_STAGE_DURATION = Histogram(
+    'cascade_stage_duration_seconds',
+    'Time spent in each cascade stage per batch',
+    ['stage']
+)
+CASCADE_SECONDS_SAVED = Counter(
+    'cascade_estimated_seconds_saved_total',
+    'Estimated full-forest time avoided by rows settled in the fast stage'
+)
+
+# Model reloads
+MODEL_RELOADS = Counter(
+    'model_reloads_total',
+    'Model reload attempts by outcome',
+    ['model', 'outcome']
+)
+MODEL_RELOAD_DURATION = Histogram(
+    'model_reload_duration_seconds',
+    'Time to load, warm and check a model before swapping it in',
+    ['model'],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+)
+MODEL_VERSION = Gauge(
+    'model_version_info',
+    'Version and artifact checksum of each live model (value is always 1)',
+    ['model', 'version', 'checksum']
+)
+
+
+def batch_size_bucket(n_rows: int) -> str:
+    """The batch_size label for a call scoring n_rows rows."""
+    for bound, label in BATCH_SIZE_BUCKETS:
+        if n_rows <= bound:
+            return label
+    return f"{BATCH_SIZE_BUCKETS[-1][0] + 1}+"
+
+
+class InferenceInstrumentation:
+    """
+    Per-stage inference timings and prediction counts.
+
+    Callers take ``start()`` before a stage and pass it to ``observe`` after
+    it. Label lookups are cached, so an observation costs two clock reads
+    and a histogram update. When disabled, ``start`` and every recording
+    call return at once, and nothing is recorded.
+    """
+
+    def __init__(self, enabled: bool = True):
+        """Initialize the instrumentation; ``enabled`` can be flipped at runtime."""
+        self.enabled = enabled
+        self._stages: Dict[Tuple[str, str, str], object] = {}
+        self._counts: Dict[Tuple[str, str], object] = {}
+
+    def start(self) -> float:
+        """Timestamp for a stage that is about to run."""
+        return time.perf_counter() if self.enabled else 0.0
+
+    def observe(self, model: str, stage: str, n_rows: int, start: float):
+        """Record a stage that began at ``start`` and scored n_rows rows."""
+        if not self.enabled:
+            return
+        elapsed = time.perf_counter() - start
+        key = (model, stage, batch_size_bucket(n_rows))
+        child = self._stages.get(key)
+        if child is None:
+            child = self._stages[key] = INFERENCE_STAGE_DURATION.labels(*key)
+        child.observe(elapsed)
+
+    def count(self, model: str, risk_levels: Iterable[str]):
+        """Count predictions by model and risk level."""
+        if not self.enabled:
+            return
+        for risk_level, n in collections.Counter(risk_levels).items():
+            key = (model, risk_level)
+            child = self._counts.get(key)
+            if child is None:
+                child = self._counts[key] = PREDICTION_COUNT.labels(*key)
+            child.inc(n)
+
+
+_instrumentation = InferenceInstrumentation(enabled=settings.INFERENCE_METRICS_ENABLED)
+
+
+def get_instrumentation() -> InferenceInstrumentation:
+    """The process-wide inference instrumentation."""
+    return _instrumentation
+
+
+class LatencyWindow:
+    """Durations of the most recent model calls, summarized for /model/info."""
+
+    def __init__(self, size: int = 1000):
+        """Keep at most ``size`` recent samples."""
+        self._samples = collections.deque(maxlen=size)
+        self._lock = threading.Lock()
+        self.count = 0
+
+    def observe(self, seconds: float):
+        """Record one call."""
+        with self._lock:
+            self._samples.append(seconds)
+            self.count += 1
+
+    def summary(self) -> Dict[str, Optional[float]]:
+        """Call count plus mean/p50/p95 in milliseconds over the recent window."""
+        with self._lock:
+            samples = np.array(self._samples)
+            count = self.count
+        if not len(samples):
+            return {"calls": count, "mean_ms": None, "p50_ms": None, "p95_ms": None}
+        p50, p95 = np.percentile(samples, [50, 95]) * 1e3
+        return {
+            "calls": count,
+            "mean_ms": round(float(samples.mean() * 1e3), 3),
+            "p50_ms": round(float(p50), 3),
+            "p95_ms": round(float(p95), 3)
+        }
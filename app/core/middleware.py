@@ -0,0 +1,87 @@
+"""Pure-ASGI request logging and metrics middleware."""
+
+import random
+import time
+
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import get_settings
+from app.core.logging import get_logger
+from app.core.metrics import REQUEST_COUNT, REQUEST_DURATION
+
+settings = get_settings()
+logger = get_logger(__name__)
+
+# Label for requests that matched no route (404s, scanner probes)
+UNMATCHED_ROUTE = "unmatched"
+
+KNOWN_METHODS = frozenset(
+    ("GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS", "TRACE", "CONNECT")
+)
+
+
+def route_template(scope: Scope) -> str:
+    """
+    The path template of the route that handled a request, e.g. ``/api/v1/predict``.
+
+    The router records the matched route in the scope; if it did not (older
+    Starlette), the app's routes are matched again. Paths that match no
+    route share UNMATCHED_ROUTE, so they cannot create new series.
+    """
+    route = scope.get("route")
+    if route is None:
+        router = scope.get("router")
+        for candidate in getattr(router, "routes", ()):
+            match, _ = candidate.matches(scope)
+            if match != Match.NONE:
+                route = candidate
+                break
+    return getattr(route, "path", None) or UNMATCHED_ROUTE
+
+
+class RequestMetricsMiddleware:
+    """
+    Log HTTP requests and record REQUEST_COUNT and REQUEST_DURATION.
+
+    A plain ASGI wrapper: messages are passed on as they come, so streamed
+    bodies are not buffered, and only the status is read off the response
+    start. The duration runs until the last body message has been sent.
+    Metrics are labelled by route template and a bounded set of methods.
+
+    Every request is counted, but only ``sample_rate`` of the requests
+    that succeed are logged; those with a 4xx/5xx status always are.
+    """
+
+    def __init__(self, app: ASGIApp, sample_rate: float = 1.0):
+        self.app = app
+        self.sample_rate = sample_rate
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - start
+            method = scope["method"] if scope["method"] in KNOWN_METHODS else "OTHER"
+            endpoint = route_template(scope)
+            if status_code >= 400 or random.random() < self.sample_rate:
+                logger.info(
+                    f"{method} {scope['path']} - "
+                    f"Status: {status_code} - "
+                    f"Duration: {duration:.3f}s"
+                )
+            REQUEST_COUNT.labels(method=method, endpoint=endpoint, status=status_code).inc()
+            REQUEST_DURATION.labels(method=method, endpoint=endpoint).observe(duration)
@@ -4,14 +4,23 @@ from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
-from prometheus_client import Counter, Histogram, generate_latest
+from prometheus_client import generate_latest
 from fastapi.responses import Response
+import os
 import time
 
+from app import IMPORT_START
 from app.core.config import get_settings
+from app.core.memory import format_memory_usage, memory_usage
 from app.core.logging import setup_logging, get_logger
+from app.core.middleware import RequestMetricsMiddleware
+from app.api.admin import router as admin_router
 from app.api.endpoints import router as prediction_router
-from app.services.prediction import get_prediction_service
+from app.services.registry import get_model_registry
+from app.services.batcher import get_micro_batcher
+from app.services.executor import get_inference_executor
+from app.services.reload import get_model_reloader
+from app.services.startup import get_startup_pipeline
 from app.models.schemas import HealthResponse
 
 # Initialize settings and logging
@@ -19,23 +28,6 @@ settings = get_settings()
 setup_logging()
 logger = get_logger(__name__)
 
-# Prometheus metrics
-REQUEST_COUNT = Counter(
-    'http_requests_total',
-    'Total HTTP requests',
-    ['method', 'endpoint', 'status']
-)
-REQUEST_DURATION = Histogram(
-    'http_request_duration_seconds',
-    'HTTP request duration',
-    ['method', 'endpoint']
-)
-PREDICTION_COUNT = Counter(
-    'predictions_total',
-    'Total predictions made',
-    ['model_type', 'risk_level']
-)
-
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -44,17 +36,26 @@ async def lifespan(app: FastAPI):
     logger.info(f"Starting {settings.APP_NAME} v{settings.APP_VERSION}")
     logger.info(f"Environment: {settings.ENVIRONMENT}")
     
-    # Load ML models
-    service = get_prediction_service()
-    if not service.models_loaded:
-        logger.error("Failed to load ML models!")
-    else:
-        logger.info("ML models loaded successfully")
+    logger.info(f"Imported application in {IMPORT_SECONDS:.3f}s")
+    
+    # Load and warm the models in the background; /ready reports when done
+    pipeline = get_startup_pipeline()
+    pipeline.timings["import"] = IMPORT_SECONDS
+    task = pipeline.start()
+    task.add_done_callback(lambda _: logger.info(
+        f"Resident memory of worker {os.getpid()}: {format_memory_usage(memory_usage())}"
+    ))
+    if settings.MODEL_RELOAD_WATCH:
+        get_model_reloader().watch(settings.MODEL_RELOAD_POLL_SECONDS)
     
     yield
     
     # Shutdown
     logger.info("Shutting down application")
+    await pipeline.stop()
+    get_model_reloader().stop()
+    await get_micro_batcher().stop()
+    get_inference_executor().shutdown()
 
 
 # Create FastAPI app
@@ -76,39 +77,8 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-
-# Middleware for request logging and metrics
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    """Log all requests and collect metrics."""
-    start_time = time.time()
-    
-    # Process request
-    response = await call_next(request)
-    
-    # Calculate duration
-    duration = time.time() - start_time
-    
-    # Log request
-    logger.info(
-        f"{request.method} {request.url.path} - "
-        f"Status: {response.status_code} - "
-        f"Duration: {duration:.3f}s"
-    )
-    
-    # Update metrics
-    REQUEST_COUNT.labels(
-        method=request.method,
-        endpoint=request.url.path,
-        status=response.status_code
-    ).inc()
-    
-    REQUEST_DURATION.labels(
-        method=request.method,
-        endpoint=request.url.path
-    ).observe(duration)
-    
-    return response
+# Request logging and metrics
+app.add_middleware(RequestMetricsMiddleware, sample_rate=settings.LOG_REQUEST_SAMPLE_RATE)
 
 
 # Health check endpoint
@@ -116,20 +86,35 @@ async def log_requests(request: Request, call_next):
     "/health",
     tags=["Health"],
     summary="Health Check",
-    description="Check if the API is running and models are loaded."
+    description="Liveness check: the process is up. Never loads models."
 )
 async def health_check():
     """Health check endpoint."""
-    service = get_prediction_service()
     from datetime import datetime
     return {
         "status": "healthy",
-        "model_loaded": service.models_loaded,
+        "model_loaded": get_model_registry().is_loaded(None),
         "timestamp": datetime.utcnow().isoformat() + "Z",
         "version": settings.APP_VERSION
     }
 
 
+# Readiness endpoint
+@app.get(
+    "/ready",
+    tags=["Health"],
+    summary="Readiness Check",
+    description="200 once the models are loaded and warmed up, 503 until then."
+)
+async def readiness_check():
+    """Readiness endpoint."""
+    pipeline = get_startup_pipeline()
+    return JSONResponse(
+        status_code=200 if pipeline.ready else 503,
+        content=pipeline.describe()
+    )
+
+
 # Metrics endpoint for Prometheus
 @app.get("/metrics", include_in_schema=False)
 async def metrics():
@@ -147,12 +132,17 @@ async def root():
         "version": settings.APP_VERSION,
         "status": "running",
         "docs": "/docs",
-        "health": "/health"
+        "health": "/health",
+        "ready": "/ready"
     }
 
 
 # Include routers
 app.include_router(prediction_router)
+app.include_router(admin_router)
+
+
+IMPORT_SECONDS = time.perf_counter() - IMPORT_START
 
 
 # Global exception handler
@@ -1,8 +1,14 @@
 """Pydantic schemas for request/response validation."""
 
-from typing import Literal
+import typing
+from typing import Dict, List, Literal
+
+import numpy as np
 from pydantic import BaseModel, Field, validator
 
+# Selectable models; auto is the forest cascade when CASCADE_ENABLED, else the default model
+ModelType = Literal["knn", "random_forest", "auto"]
+
 
 class PatientData(BaseModel):
     """Input schema for patient health data."""
@@ -41,11 +47,28 @@ class PatientData(BaseModel):
         }
 
 
+def feature_constraints(names: List[str]) -> Dict[str, Dict]:
+    """Derive per-feature bounds and allowed values from the PatientData schema."""
+    constraints = {}
+    for name in names:
+        field = PatientData.model_fields[name]
+        allowed = None
+        if typing.get_origin(field.annotation) is typing.Literal:
+            allowed = typing.get_args(field.annotation)
+        constraints[name] = {
+            "integer": allowed is not None or field.annotation is int,
+            "allowed": np.array(allowed, dtype=np.float64) if allowed else None,
+            "ge": next((m.ge for m in field.metadata if hasattr(m, "ge")), None),
+            "le": next((m.le for m in field.metadata if hasattr(m, "le")), None),
+        }
+    return constraints
+
+
 class PredictionRequest(BaseModel):
     """Request schema for prediction."""
     
     patient_data: PatientData
-    model_type: Literal["knn", "random_forest", "auto"] = Field(
+    model_type: ModelType = Field(
         default="auto",
         description="Model to use for prediction (auto selects best performing model)"
     )
@@ -0,0 +1,270 @@
+"""Pickle-free, versioned model artifacts."""
+
+import hashlib
+import json
+import os
+import struct
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.services.neighbors import CompiledKNN
+from app.services.tree_ensemble import CompiledForest
+
+# File layout: MAGIC, header length (uint64 LE), JSON header, then the raw
+# arrays, each starting on an ALIGNMENT boundary
+MAGIC = b"HDPMODEL"
+ARTIFACT_FORMAT = 2
+ALIGNMENT = 64
+
+_PREFIX = struct.Struct("<8sQ")
+
+
+class ArtifactError(ValueError):
+    """A model artifact is missing, corrupt or of an unsupported format."""
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def file_digest(paths: Sequence[Path]) -> str:
+    """SHA-256 over the contents of the given files, in order."""
+    digest = hashlib.sha256()
+    for path in paths:
+        digest.update(Path(path).read_bytes())
+    return digest.hexdigest()
+
+
+class ScalerStatistics:
+    """
+    Standardization statistics read from an artifact.
+
+    Stands in for the fitted StandardScaler (``mean_``, ``scale_`` and
+    ``transform``) without importing sklearn.
+    """
+
+    def __init__(self, mean: np.ndarray, scale: np.ndarray):
+        self.mean_ = np.array(mean, dtype=np.float64)
+        self.scale_ = np.array(scale, dtype=np.float64)
+        self.n_features_in_ = len(self.mean_)
+
+    def transform(self, X: np.ndarray) -> np.ndarray:
+        """Standardize X with the same arithmetic as StandardScaler.transform."""
+        return (np.asarray(X, dtype=np.float64) - self.mean_) / self.scale_
+
+
+def scaler_statistics(scaler) -> Tuple[np.ndarray, np.ndarray]:
+    """(mean, scale) of a fitted StandardScaler, for folding into a compiled model."""
+    if isinstance(scaler, ScalerStatistics):
+        return scaler.mean_, scaler.scale_
+    # A StandardScaler instance implies sklearn is already imported
+    preprocessing = sys.modules.get("sklearn.preprocessing")
+    if preprocessing is None or not isinstance(scaler, preprocessing.StandardScaler):
+        raise ArtifactError(f"Cannot fold {type(scaler).__name__} into a compiled model")
+    n_features = scaler.n_features_in_
+    mean = scaler.mean_ if scaler.with_mean else np.zeros(n_features)
+    scale = scaler.scale_ if scaler.with_std else np.ones(n_features)
+    return np.asarray(mean, dtype=np.float64), np.asarray(scale, dtype=np.float64)
+
+
+def write_artifact(path: Path, arrays: Dict[str, np.ndarray], manifest: Dict) -> str:
+    """
+    Write arrays and a JSON manifest as one artifact file; returns its checksum.
+
+    The file is written under a temporary name and renamed into place, so
+    concurrent readers never see a partial artifact.
+    """
+    path = Path(path)
+    arrays = {name: np.ascontiguousarray(array) for name, array in arrays.items()}
+    table = {}
+    offset = 0
+    for name, array in arrays.items():
+        offset = _aligned(offset)
+        table[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        offset += array.nbytes
+    data = bytearray(offset)
+    for name, array in arrays.items():
+        start = table[name]["offset"]
+        data[start:start + array.nbytes] = array.tobytes()
+
+    header = {
+        "format": ARTIFACT_FORMAT,
+        "checksum": hashlib.sha256(data).hexdigest(),
+        "manifest": manifest,
+        "arrays": table
+    }
+    encoded = json.dumps(header).encode()
+    encoded += b" " * (_aligned(_PREFIX.size + len(encoded)) - _PREFIX.size - len(encoded))
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.tmp-{os.getpid()}")
+    with open(tmp, "wb") as handle:
+        handle.write(_PREFIX.pack(MAGIC, len(encoded)))
+        handle.write(encoded)
+        handle.write(data)
+    os.replace(tmp, path)
+    return header["checksum"]
+
+
+def _read_header(handle) -> Tuple[Dict, int]:
+    """Parse the header; returns it with the offset of the data section."""
+    prefix = handle.read(_PREFIX.size)
+    if len(prefix) != _PREFIX.size:
+        raise ArtifactError("Truncated model artifact")
+    magic, length = _PREFIX.unpack(prefix)
+    if magic != MAGIC:
+        raise ArtifactError("Not a model artifact")
+    try:
+        header = json.loads(handle.read(length))
+    except ValueError:
+        raise ArtifactError("Corrupt model artifact header")
+    if header.get("format") != ARTIFACT_FORMAT:
+        raise ArtifactError(f"Unsupported model artifact format: {header.get('format')}")
+    return header, _PREFIX.size + length
+
+
+def read_manifest(path: Path) -> Optional[Dict]:
+    """Return an artifact's manifest plus its checksum, or None if there is no usable one."""
+    try:
+        with open(path, "rb") as handle:
+            header, _ = _read_header(handle)
+    except (OSError, ArtifactError):
+        return None
+    return dict(header["manifest"], checksum=header["checksum"])
+
+
+def read_artifact(
+    path: Path, mmap_mode: Optional[str] = "r", verify: bool = True
+) -> Tuple[Dict, Dict[str, np.ndarray]]:
+    """
+    Load an artifact's manifest and arrays.
+
+    With ``mmap_mode`` the arrays are views into a memory map of the file,
+    so loading costs one header parse and the pages are shared with every
+    other process mapping the same file. ``verify`` checks the data
+    section against the stored checksum.
+    """
+    with open(path, "rb") as handle:
+        header, data_start = _read_header(handle)
+        if mmap_mode is None:
+            data = np.frombuffer(handle.read(), dtype=np.uint8)
+    if mmap_mode is not None:
+        data = np.memmap(path, dtype=np.uint8, mode=mmap_mode, offset=data_start)
+    if verify and hashlib.sha256(data).hexdigest() != header["checksum"]:
+        raise ArtifactError(f"Checksum mismatch in model artifact {path}")
+
+    arrays = {}
+    for name, spec in header["arrays"].items():
+        dtype = np.dtype(spec["dtype"])
+        count = int(np.prod(spec["shape"], dtype=np.int64))
+        start = spec["offset"]
+        arrays[name] = data[start:start + count * dtype.itemsize].view(dtype).reshape(spec["shape"])
+    return dict(header["manifest"], checksum=header["checksum"]), arrays
+
+
+def export_model(
+    model,
+    scaler,
+    path: Path,
+    feature_names: Sequence[str],
+    source_digest: str = "",
+    metadata: Optional[Dict] = None
+) -> str:
+    """
+    Compile a fitted forest or KNN plus its scaler into an artifact file.
+
+    The scaler is folded into the compiled model, which then takes raw
+    feature vectors; its statistics are stored too, so the sklearn model
+    can still be fed when it is loaded alongside. ``metadata`` (version,
+    accuracy, ...) is stored in the manifest. Returns the checksum.
+    """
+    import sklearn
+
+    if len(feature_names) != model.n_features_in_:
+        raise ArtifactError("Feature names do not match the model's inputs")
+    mean, scale = scaler_statistics(scaler)
+
+    if hasattr(model, "estimators_"):
+        compiled = CompiledForest.from_sklearn(model).fold_scaler(mean, scale)
+        kind = "random_forest"
+    else:
+        compiled = CompiledKNN.from_sklearn(model).fold_scaler(mean, scale)
+        kind = "knn"
+    arrays = compiled.to_arrays()
+    arrays["scaler_mean"] = mean
+    arrays["scaler_scale"] = scale
+
+    manifest = {
+        "kind": kind,
+        "estimator": type(model).__name__,
+        "feature_names": list(feature_names),
+        "params": compiled.params(),
+        "source_digest": source_digest,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "sklearn_version": sklearn.__version__,
+        "n_samples": int(np.max(getattr(scaler, "n_samples_seen_", 0))),
+        "metadata": metadata or {}
+    }
+    return write_artifact(path, arrays, manifest)
+
+
+def export_compiled_forest(
+    compiled: CompiledForest,
+    scaler,
+    path: Path,
+    feature_names: Sequence[str],
+    metadata: Optional[Dict] = None
+) -> str:
+    """
+    Write an already compiled forest, such as a compressed one, as an artifact.
+
+    The forest must take raw inputs (scaler folded in). It was not exported
+    from the joblib files, so the manifest marks it ``standalone``: the
+    service serves it as it is, and neither rebuilds it from the joblib
+    files nor hands large batches to the sklearn forest. Returns the checksum.
+    """
+    if not compiled.folded:
+        raise ArtifactError("Compiled forest must have its scaler folded in")
+    if len(feature_names) != compiled.n_features:
+        raise ArtifactError("Feature names do not match the model's inputs")
+    mean, scale = scaler_statistics(scaler)
+    arrays = compiled.to_arrays()
+    arrays["scaler_mean"] = mean
+    arrays["scaler_scale"] = scale
+    manifest = {
+        "kind": "random_forest",
+        "estimator": type(compiled).__name__,
+        "feature_names": list(feature_names),
+        "params": compiled.params(),
+        "source_digest": "",
+        "standalone": True,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "metadata": metadata or {}
+    }
+    return write_artifact(path, arrays, manifest)
+
+
+def load_model(
+    path: Path, mmap_mode: Optional[str] = "r", verify: bool = True, knn_index: str = "brute"
+):
+    """
+    Load an exported artifact.
+
+    Returns (compiled model, ScalerStatistics, manifest); nothing is
+    unpickled and sklearn is not imported. ``knn_index`` selects the
+    neighbor search of a KNN artifact.
+    """
+    manifest, arrays = read_artifact(path, mmap_mode=mmap_mode, verify=verify)
+    mean = arrays.pop("scaler_mean")
+    scale = arrays.pop("scaler_scale")
+    if manifest["kind"] == "random_forest":
+        compiled = CompiledForest.from_arrays(arrays, manifest["params"])
+    elif manifest["kind"] == "knn":
+        compiled = CompiledKNN.from_arrays(arrays, manifest["params"], index=knn_index)
+    else:
+        raise ArtifactError(f"Unknown model kind in artifact: {manifest['kind']}")
+    return compiled, ScalerStatistics(mean, scale), manifest
@@ -0,0 +1,170 @@
+"""Asyncio micro-batching of single-patient predictions."""
+
+import asyncio
+from typing import Dict, List, Optional, Set, Tuple
+
+from app.core.config import get_settings
+from app.core.logging import get_logger
+from app.core.metrics import BATCH_QUEUE_DEPTH, BATCH_SIZE
+from app.models.schemas import PatientData
+from app.services.executor import InferenceExecutor, get_inference_executor
+
+settings = get_settings()
+logger = get_logger(__name__)
+
+# A queued request: the patient, the requested model and the caller's future
+Item = Tuple[PatientData, Optional[str], asyncio.Future]
+
+
+class MicroBatcher:
+    """
+    Coalesce concurrent single-patient predictions into one model pass.
+
+    Callers ``await submit(patient, model_type)``. A worker task takes the
+    first queued request, waits up to ``max_wait_ms`` for more to arrive
+    (or until ``max_batch_size`` are queued), scores them as one matrix per
+    requested model and resolves each caller's future with its own row.
+    Scoring runs on the inference executor, and the next batch accumulates
+    while it does. Up to ``max_in_flight`` batches (by default the
+    executor's worker count) are scored at once, so every pool worker can
+    be busy under load; beyond that, requests keep queueing into the next
+    batch.
+    """
+
+    def __init__(
+        self,
+        executor: InferenceExecutor,
+        max_batch_size: int = 64,
+        max_wait_ms: float = 2.0,
+        max_in_flight: Optional[int] = None
+    ):
+        """Initialize the batcher; the worker starts on first use."""
+        self.executor = executor
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self.max_in_flight = max(1, max_in_flight or executor.max_workers)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._full: Optional[asyncio.Event] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._in_flight: Set[asyncio.Task] = set()
+
+    def _ensure_started(self):
+        """Start the worker on the running event loop if needed."""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._worker is not None and not self._worker.done():
+            return
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        self._full = asyncio.Event()
+        self._slots = asyncio.Semaphore(self.max_in_flight)
+        self._in_flight = set()
+        self._worker = loop.create_task(self._run())
+
+    async def submit(self, patient_data: PatientData, model_type: Optional[str] = None) -> Dict:
+        """Queue one patient and wait for its prediction by the given model."""
+        self._ensure_started()
+        future = self._loop.create_future()
+        self._queue.put_nowait((patient_data, model_type, future))
+        queued = self._queue.qsize()
+        BATCH_QUEUE_DEPTH.set(queued)
+        if queued >= self.max_batch_size:
+            self._full.set()
+        return await future
+
+    async def _collect(self) -> List[Item]:
+        """Wait for the next batch: the first request plus whatever joins it in time."""
+        items = [await self._queue.get()]
+        if self.max_wait > 0 and self._queue.qsize() + 1 < self.max_batch_size:
+            self._full.clear()
+            try:
+                await asyncio.wait_for(self._full.wait(), self.max_wait)
+            except asyncio.TimeoutError:
+                pass
+        while len(items) < self.max_batch_size and not self._queue.empty():
+            items.append(self._queue.get_nowait())
+        BATCH_QUEUE_DEPTH.set(self._queue.qsize())
+        return items
+
+    async def _run(self):
+        """Worker loop: collect batches and dispatch them until cancelled."""
+        while True:
+            # Wait for a free slot first, so requests keep joining the next batch meanwhile
+            await self._slots.acquire()
+            try:
+                items = await self._collect()
+            except BaseException:
+                self._slots.release()
+                raise
+            task = asyncio.get_running_loop().create_task(self._dispatch(items))
+            self._in_flight.add(task)
+            task.add_done_callback(self._finished)
+
+    def _finished(self, task: asyncio.Task):
+        """Free the slot of a dispatched batch."""
+        self._in_flight.discard(task)
+        self._slots.release()
+
+    async def _dispatch(self, items: List[Item]):
+        """Score a collected batch, one executor job per requested model."""
+        # Callers that went away while queued are not scored
+        groups: Dict[Optional[str], List[Item]] = {}
+        for item in items:
+            if not item[2].done():
+                groups.setdefault(item[1], []).append(item)
+        for group in groups.values():
+            BATCH_SIZE.observe(len(group))
+        await asyncio.gather(*(
+            self._score(model_type, group) for model_type, group in groups.items()
+        ))
+
+    async def _score(self, model_type: Optional[str], items: List[Item]):
+        """Score one model's share of a batch and hand each caller its own result."""
+        try:
+            results = await self.executor.predict_batch(
+                [patient for patient, _, _ in items], model_type
+            )
+        except asyncio.CancelledError:
+            for _, _, future in items:
+                future.cancel()
+            raise
+        except Exception as e:
+            logger.error(f"Micro-batch of {len(items)} failed: {str(e)}", exc_info=True)
+            for _, _, future in items:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, _, future), result in zip(items, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def stop(self):
+        """Stop the worker and cancel requests that are still queued."""
+        worker, self._worker = self._worker, None
+        # A worker left on another (finished) event loop is already dead
+        if worker is not None and self._loop is asyncio.get_running_loop():
+            worker.cancel()
+            for task in list(self._in_flight):
+                task.cancel()
+            await asyncio.gather(worker, *self._in_flight, return_exceptions=True)
+            while not self._queue.empty():
+                _, _, future = self._queue.get_nowait()
+                future.cancel()
+        BATCH_QUEUE_DEPTH.set(0)
+
+
+# Singleton instance
+_micro_batcher: MicroBatcher = None
+
+
+def get_micro_batcher() -> MicroBatcher:
+    """Get or create the micro-batcher instance."""
+    global _micro_batcher
+    if _micro_batcher is None:
+        _micro_batcher = MicroBatcher(
+            get_inference_executor(),
+            max_batch_size=settings.MICRO_BATCH_MAX_SIZE,
+            max_wait_ms=settings.MICRO_BATCH_MAX_WAIT_MS
+        )
+    return _micro_batcher
@@ -0,0 +1,170 @@
+"""In-process LRU/TTL cache of prediction results."""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.metrics import (
+    PREDICTION_CACHE_EVICTIONS,
+    PREDICTION_CACHE_HITS,
+    PREDICTION_CACHE_MISSES,
+    PREDICTION_CACHE_SIZE,
+)
+
+
+class PredictionCache:
+    """
+    Size-bounded LRU cache with per-entry expiry.
+
+    Keys are the raw bytes of a canonical feature row: the validated
+    features with ``oldpeak`` rounded to a fixed number of decimals, so
+    equivalent submissions share an entry. Values are the (predicted class,
+    positive-class probability) pair for that row. Safe to share between
+    inference threads.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 10000,
+        ttl_seconds: float = 3600,
+        oldpeak_column: int = 9,
+        oldpeak_decimals: int = 2,
+        model_name: str = "random_forest"
+    ):
+        """Initialize an empty cache for one model's results."""
+        self.model_name = model_name
+        self._hits = PREDICTION_CACHE_HITS.labels(model=model_name)
+        self._misses = PREDICTION_CACHE_MISSES.labels(model=model_name)
+        self._size = PREDICTION_CACHE_SIZE.labels(model=model_name)
+        self.max_size = max(1, max_size)
+        self.ttl_seconds = ttl_seconds
+        self.oldpeak_column = oldpeak_column
+        self.oldpeak_decimals = oldpeak_decimals
+        self._entries: "OrderedDict[Hashable, Tuple[float, int, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def canonicalize(self, X: np.ndarray) -> np.ndarray:
+        """Return a contiguous float64 copy of X with oldpeak at the cache precision."""
+        X = np.array(X, dtype=np.float64, order="C")
+        X[:, self.oldpeak_column] = np.round(X[:, self.oldpeak_column], self.oldpeak_decimals)
+        return X
+
+    def keys(self, X: np.ndarray) -> List[Optional[Hashable]]:
+        """One hashable key per row of a canonical feature matrix."""
+        row_type = np.dtype((np.void, X.dtype.itemsize * X.shape[1]))
+        return X.view(row_type).ravel().tolist()
+
+    def get_many(self, keys: Sequence[Optional[Hashable]]) -> List[Optional[Tuple[int, float]]]:
+        """Look up all keys in one pass; missing or expired entries give None.
+
+        A None key marks a row that cannot be cached and always misses.
+        """
+        now = time.monotonic()
+        results = []
+        hits = expired = 0
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key) if key is not None else None
+                if entry is None:
+                    results.append(None)
+                elif entry[0] <= now:
+                    del self._entries[key]
+                    expired += 1
+                    results.append(None)
+                else:
+                    self._entries.move_to_end(key)
+                    hits += 1
+                    results.append(entry[1:])
+            self._size.set(len(self._entries))
+        self._hits.inc(hits)
+        self._misses.inc(len(keys) - hits)
+        if expired:
+            PREDICTION_CACHE_EVICTIONS.labels(model=self.model_name, reason="expired").inc(expired)
+        return results
+
+    def put_many(
+        self,
+        keys: Sequence[Optional[Hashable]],
+        predictions: np.ndarray,
+        probabilities: np.ndarray
+    ):
+        """Store freshly scored rows, evicting least recently used entries."""
+        expires_at = time.monotonic() + self.ttl_seconds
+        evicted = 0
+        with self._lock:
+            for key, prediction, probability in zip(
+                keys, predictions.tolist(), probabilities.tolist()
+            ):
+                if key is None:
+                    continue
+                self._entries[key] = (expires_at, prediction, probability)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                evicted += 1
+            self._size.set(len(self._entries))
+        if evicted:
+            PREDICTION_CACHE_EVICTIONS.labels(model=self.model_name, reason="size").inc(evicted)
+
+    def clear(self):
+        """Drop every entry, e.g. after the model changes."""
+        with self._lock:
+            self._entries.clear()
+            self._size.set(0)
+
+
+class GridPredictionCache(PredictionCache):
+    """
+    Exact prediction cache keyed on the quantized input grid.
+
+    Every feature the API accepts lies on a small grid: integer codes, and
+    ``oldpeak`` in tenths. A row exactly on the grid is encoded as one
+    integer (mixed radix over the per-feature grids), so keys are cheap to
+    build and results are reused only for bit-identical inputs. Rows off
+    the grid, such as an ``oldpeak`` of 1.25, are always scored.
+    """
+
+    def __init__(
+        self,
+        constraints: Dict[str, Dict],
+        max_size: int = 10000,
+        ttl_seconds: float = 3600,
+        fractional_steps: int = 10,
+        model_name: str = "knn"
+    ):
+        """Build the grid from per-feature bounds, as given by feature_constraints()."""
+        super().__init__(max_size=max_size, ttl_seconds=ttl_seconds, model_name=model_name)
+        scales, lows, levels = [], [], []
+        for rule in constraints.values():
+            scale = 1 if rule["integer"] else fractional_steps
+            low = rule["allowed"].min() if rule["allowed"] is not None else rule["ge"]
+            high = rule["allowed"].max() if rule["allowed"] is not None else rule["le"]
+            scales.append(scale)
+            lows.append(round(low * scale))
+            levels.append(round(high * scale) - round(low * scale) + 1)
+        if np.prod(levels, dtype=object) >= 2 ** 63:
+            raise ValueError("Feature grid does not fit in a 64-bit key")
+        self._scales = np.array(scales, dtype=np.float64)
+        self._lows = np.array(lows, dtype=np.int64)
+        self._levels = np.array(levels, dtype=np.int64)
+        self._radix = np.concatenate([[1], np.cumprod(levels[:-1])]).astype(np.int64)
+
+    def canonicalize(self, X: np.ndarray) -> np.ndarray:
+        """Grid keys are exact, so rows are used as given."""
+        return np.asarray(X, dtype=np.float64)
+
+    def keys(self, X: np.ndarray) -> List[Optional[int]]:
+        """Integer grid code per row, or None for rows off the grid."""
+        with np.errstate(invalid="ignore"):
+            scaled = np.round(X * self._scales)
+            on_grid = (scaled / self._scales == X).all(axis=1)
+            codes = np.where(np.isfinite(scaled), scaled, 0).astype(np.int64) - self._lows
+        on_grid &= ((codes >= 0) & (codes < self._levels)).all(axis=1)
+        keys = (codes * self._radix).sum(axis=1)
+        return [key if ok else None for key, ok in zip(keys.tolist(), on_grid.tolist())]
@@ -0,0 +1,144 @@
+"""Cost-aware cascade served for model_type=auto."""
+
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from app.core.logging import get_logger
+from app.core.metrics import (
+    CASCADE_ROWS,
+    CASCADE_SECONDS_SAVED,
+    CASCADE_STAGE_DURATION,
+    LatencyWindow,
+    get_instrumentation,
+)
+from app.models.schemas import PatientData
+from app.services.artifact import scaler_statistics
+from app.services.prediction import RISK_THRESHOLDS, PredictionService
+from app.services.tree_ensemble import CompiledForest
+
+logger = get_logger(__name__)
+
+
+class CascadeService:
+    """
+    Score with a cheap forest prefix and escalate only uncertain rows.
+
+    Every row is first scored by the first ``fast_trees`` trees of the
+    forest. Rows whose fast probability lies within ``margin`` of a risk
+    band boundary (0.3, 0.5, 0.7) are scored again by the full forest
+    service, including its cache; all other rows keep the fast result, so
+    their risk level matches the full forest's unless the prefix is off by
+    more than ``margin``.
+
+    Offers the same scoring interface as PredictionService, so the
+    registry and executor can serve it as a model of its own.
+    """
+
+    model_name = "auto"
+    cache = None
+
+    def __init__(self, forest: PredictionService, fast_trees: int = 16, margin: float = 0.15):
+        """Build the fast stage from the forest service's model."""
+        self.forest = forest
+        self.margin = margin
+        self.latency = LatencyWindow()
+        self.instrumentation = get_instrumentation()
+        full = forest.compiled_model
+        if not isinstance(full, CompiledForest):
+            full = CompiledForest.from_sklearn(forest.model).fold_scaler(
+                *scaler_statistics(forest.scaler)
+            )
+        self.compiled_model = full.prefix(fast_trees)
+        # Forest evaluation cost grows with the number of trees walked
+        self._full_cost_ratio = full.n_trees / self.compiled_model.n_trees
+        logger.info(
+            f"Cascade: {self.compiled_model.n_trees} of {full.n_trees} trees first, "
+            f"margin {margin}"
+        )
+
+    @property
+    def models_loaded(self) -> bool:
+        return self.forest.models_loaded
+
+    @property
+    def sklearn_loaded(self) -> bool:
+        return False
+
+    @property
+    def classes(self) -> np.ndarray:
+        return self.compiled_model.classes_
+
+    @property
+    def manifest(self) -> Dict:
+        return self.forest.manifest
+
+    def source_paths(self) -> List[Path]:
+        """None of its own; the cascade is rebuilt whenever the forest reloads."""
+        return []
+
+    def memory_footprint(self) -> Dict[str, int]:
+        """Bytes held by the fast stage; the full forest is reported under its own name."""
+        return {"private_bytes": self.compiled_model.nbytes, "mapped_bytes": 0}
+
+    def near_boundary(self, probabilities: np.ndarray) -> np.ndarray:
+        """Rows whose probability is within the margin of a risk band boundary."""
+        distance = np.abs(probabilities[:, None] - RISK_THRESHOLDS).min(axis=1)
+        return distance < self.margin
+
+    def warm_up(self, X: np.ndarray):
+        """Run both stages on X, past the forest's cache and the latency windows."""
+        self.compiled_model.predict_proba(X)
+        self.forest.warm_up(X)
+
+    def predict_matrix(self, X: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Score a raw feature matrix through the cascade."""
+        return self._score_matrix(X)
+
+    def _score_matrix(self, X: np.ndarray, record: bool = True) -> Tuple[np.ndarray, np.ndarray]:
+        """Score X through both stages; without ``record``, past the cache and all metrics."""
+        if len(X) == 0:
+            return np.empty(0, dtype=self.classes.dtype), np.empty(0)
+        start = time.perf_counter()
+        proba = self.compiled_model.predict_proba(X)
+        if record:
+            self.instrumentation.observe(self.model_name, "predict_proba", len(X), start)
+        predictions = self.classes.take(np.argmax(proba, axis=1))
+        probabilities = proba[:, 1]
+        escalate = self.near_boundary(probabilities)
+        if not record:
+            if escalate.any():
+                predictions[escalate], probabilities[escalate] = self.forest._score_matrix(
+                    X[escalate], record=False
+                )
+            return predictions, probabilities
+        fast_seconds = time.perf_counter() - start
+        CASCADE_STAGE_DURATION.labels(stage="fast").observe(fast_seconds)
+
+        n_full = int(escalate.sum())
+        if n_full:
+            full_start = time.perf_counter()
+            predictions[escalate], probabilities[escalate] = self.forest.predict_matrix(X[escalate])
+            CASCADE_STAGE_DURATION.labels(stage="full").observe(time.perf_counter() - full_start)
+
+        n_fast = len(X) - n_full
+        CASCADE_ROWS.labels(stage="fast").inc(n_fast)
+        CASCADE_ROWS.labels(stage="full").inc(n_full)
+        # The rows settled early would have cost about this much more in the full forest
+        CASCADE_SECONDS_SAVED.inc(fast_seconds * (self._full_cost_ratio - 1) * n_fast / len(X))
+        self.latency.observe(time.perf_counter() - start)
+        return predictions, probabilities
+
+    def predict_batch(self, patients: List[PatientData]) -> List[Dict]:
+        """Predict for multiple patients through the cascade."""
+        if not patients:
+            return []
+        return self.format_results(*self.predict_matrix(self.to_matrix(patients)))
+
+    def to_matrix(self, patients: List[PatientData]) -> np.ndarray:
+        return self.forest.to_matrix(patients)
+
+    def format_results(self, predictions: np.ndarray, probabilities: np.ndarray) -> List[Dict]:
+        return self.forest.format_results(predictions, probabilities)
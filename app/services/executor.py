@@ -0,0 +1,241 @@
+"""Bounded executor that keeps CPU-bound inference off the event loop."""
+
+import asyncio
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import get_settings
+from app.core.logging import get_logger
+from app.core.metrics import (
+    INFERENCE_POOL_ACTIVE,
+    INFERENCE_POOL_CANCELLED,
+    INFERENCE_POOL_QUEUED,
+    INFERENCE_POOL_REJECTED,
+    INFERENCE_POOL_SIZE,
+)
+from app.models.schemas import PatientData
+from app.services.prediction import PredictionService, format_results, to_matrix
+from app.services.registry import ModelRegistry, get_model_registry
+
+settings = get_settings()
+logger = get_logger(__name__)
+
+
+class InferenceOverloadedError(RuntimeError):
+    """Raised when the executor backlog is full and a job is rejected."""
+
+
+def _init_process_worker():
+    """Load the default model once per worker process."""
+    get_model_registry().get()
+
+
+def _predict_matrix_in_process(
+    X: np.ndarray, model_type: Optional[str] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Score a feature matrix with the worker process's own copy of a model."""
+    return get_model_registry().get(model_type).predict_matrix(X)
+
+
+def _warm_up_in_process(X: np.ndarray, model_type: Optional[str] = None):
+    """Warm up the worker process's own copy of a model."""
+    get_model_registry().get(model_type).warm_up(X)
+
+
+class InferenceExecutor:
+    """
+    Run inference jobs on a dedicated, bounded worker pool.
+
+    ``thread`` mode (the default) shares the process's loaded models; NumPy
+    and sklearn release the GIL for the heavy lifting. ``process`` mode
+    ships feature matrices to worker processes that each hold a copy of the
+    models. At most ``max_workers`` jobs run at once and at most
+    ``max_queue`` more wait; beyond that jobs are rejected with
+    InferenceOverloadedError. A caller that is cancelled while its job is
+    still queued removes the job; a running job finishes and its result is
+    dropped.
+
+    Jobs name the model to use, looked up in ``registry`` from the worker
+    when the job starts, so a model's first (loading) use does not block the
+    event loop and a reloaded model is picked up by the next job. Nothing
+    else holds on to a service, so a replaced model is freed once its last
+    job finishes. Without a registry every job uses ``service``.
+    """
+
+    def __init__(
+        self,
+        service: Optional[PredictionService] = None,
+        max_workers: int = 4,
+        mode: str = "thread",
+        max_queue: int = 256,
+        registry: Optional[ModelRegistry] = None
+    ):
+        """Initialize the executor; the pool is created on first use."""
+        if mode not in ("thread", "process"):
+            raise ValueError(f"Unknown inference pool mode: {mode}")
+        if service is None and registry is None:
+            raise ValueError("An inference executor needs a service or a registry")
+        self.service = service
+        self.registry = registry
+        self.max_workers = max(1, max_workers)
+        self.mode = mode
+        self.max_queue = max(0, max_queue)
+        self._pool = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._active = 0
+        INFERENCE_POOL_SIZE.set(self.max_workers)
+
+    def _get_pool(self):
+        """Create the worker pool on first use; call with the lock held."""
+        if self._pool is None:
+            if self.mode == "process":
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers, initializer=_init_process_worker
+                )
+            else:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="inference"
+                )
+            logger.info(f"Started {self.mode} inference pool with {self.max_workers} workers")
+        return self._pool
+
+    def _publish(self):
+        """Update the saturation gauges; call with the lock held."""
+        # Process workers cannot report when a job starts, so assume FIFO
+        active = self._active if self.mode == "thread" else min(self._pending, self.max_workers)
+        INFERENCE_POOL_ACTIVE.set(active)
+        INFERENCE_POOL_QUEUED.set(self._pending - active)
+
+    def _run_tracked(self, func: Callable, *args):
+        """Run a job in a pool thread, counting it as active meanwhile."""
+        with self._lock:
+            self._active += 1
+            self._publish()
+        try:
+            return func(*args)
+        finally:
+            with self._lock:
+                self._active -= 1
+                self._publish()
+
+    def _on_done(self, future: Future):
+        """Release the job's backlog slot, whether it ran or was cancelled."""
+        with self._lock:
+            self._pending -= 1
+            self._publish()
+
+    async def run(self, func: Callable, *args):
+        """Run func(*args) on the pool and await its result."""
+        with self._lock:
+            if self._pending >= self.max_workers + self.max_queue:
+                INFERENCE_POOL_REJECTED.inc()
+                raise InferenceOverloadedError(
+                    f"Inference backlog full ({self._pending} jobs pending)"
+                )
+            self._pending += 1
+            self._publish()
+
+        try:
+            # Under the lock, so recycle() cannot shut the pool down in between
+            with self._lock:
+                if self.mode == "thread":
+                    future = self._get_pool().submit(self._run_tracked, func, *args)
+                else:
+                    future = self._get_pool().submit(func, *args)
+        except Exception:
+            with self._lock:
+                self._pending -= 1
+                self._publish()
+            raise
+        future.add_done_callback(self._on_done)
+
+        try:
+            # Cancelling the awaiting task also cancels the job if it has not started
+            return await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            INFERENCE_POOL_CANCELLED.inc()
+            raise
+
+    def service_for(self, model_type: Optional[str]) -> PredictionService:
+        """The service scoring jobs for model_type."""
+        if self.registry is None:
+            return self.service
+        return self.registry.get(model_type)
+
+    def _predict_matrix(self, X: np.ndarray, model_type: Optional[str]):
+        """Pool job: score a feature matrix with the selected model."""
+        return self.service_for(model_type).predict_matrix(X)
+
+    def _warm_up(self, X: np.ndarray, model_type: Optional[str]):
+        """Pool job: warm up the selected model."""
+        self.service_for(model_type).warm_up(X)
+
+    def _predict_batch(self, patients: List[PatientData], model_type: Optional[str]):
+        """Pool job: score patients with the selected model."""
+        return self.service_for(model_type).predict_batch(patients)
+
+    async def predict_matrix(
+        self, X: np.ndarray, model_type: Optional[str] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Score a raw feature matrix on the pool."""
+        if self.mode == "process":
+            return await self.run(_predict_matrix_in_process, X, model_type)
+        return await self.run(self._predict_matrix, X, model_type)
+
+    async def warm_up(self, X: np.ndarray, model_type: Optional[str] = None):
+        """Score X on the pool past the model's cache and latency window."""
+        if self.mode == "process":
+            return await self.run(_warm_up_in_process, X, model_type)
+        return await self.run(self._warm_up, X, model_type)
+
+    async def predict_batch(
+        self, patients: List[PatientData], model_type: Optional[str] = None
+    ) -> List[Dict]:
+        """Predict for multiple patients on the pool."""
+        if self.mode == "thread":
+            return await self.run(self._predict_batch, patients, model_type)
+        if not patients:
+            return []
+        # Built here rather than through a service, which could load the model on the loop
+        predictions, probabilities = await self.predict_matrix(to_matrix(patients), model_type)
+        return format_results(predictions, probabilities)
+
+    def recycle(self):
+        """
+        Replace the worker pool, e.g. after a model reload in process mode.
+
+        Jobs already submitted finish on the old pool (and its models); new
+        jobs go to fresh workers, which load the models as they are now.
+        """
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False)
+            logger.info(f"Recycled {self.mode} inference pool")
+
+    def shutdown(self):
+        """Stop the pool, dropping jobs that have not started."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+# Singleton instance
+_inference_executor: InferenceExecutor = None
+
+
+def get_inference_executor() -> InferenceExecutor:
+    """Get or create the inference executor instance."""
+    global _inference_executor
+    if _inference_executor is None:
+        _inference_executor = InferenceExecutor(
+            max_workers=settings.INFERENCE_POOL_SIZE,
+            mode=settings.INFERENCE_POOL_MODE,
+            max_queue=settings.INFERENCE_POOL_MAX_QUEUE,
+            registry=get_model_registry()
+        )
+    return _inference_executor
@@ -0,0 +1,244 @@
+"""Dense nearest-neighbor evaluator for fitted KNN classifiers."""
+
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+
+class CompiledKNN:
+    """
+    K-nearest-neighbors classifier over a packed training block.
+
+    Queries are answered in blocks: one float32 matrix product gives the
+    squared distances to every training row, ``np.argpartition`` keeps a
+    few more candidates than ``n_neighbors``, and the candidates are
+    re-ranked with exact float64 distances. Neighbors at equal distance are
+    ordered by training row, so results are deterministic. With
+    ``index="kd_tree"`` a KDTree built at load time answers the queries
+    instead, which pays off for large, low-dimensional training sets.
+    Only the float64 block is stored, and it stays memory-mapped when
+    loaded from a model artifact; the float32 copy is built on the first
+    brute-force query.
+    With ``mean`` and ``scale`` set (see ``fold_scaler``), queries are raw
+    feature vectors and are standardized before the search.
+
+    Exposes ``predict_proba`` and ``classes_`` like the sklearn estimator
+    it was built from, so it can be used in its place.
+    """
+
+    # Distance block size in elements; keeps the float32 block near 4 MB
+    BLOCK_ELEMENTS = 1 << 20
+
+    # Extra float32 candidates re-ranked in float64, absorbing rounding error
+    REFINE_CANDIDATES = 8
+
+    # Largest candidate count selected by repeated argmin instead of argpartition
+    ARGMIN_SELECT_LIMIT = 16
+    ARGMIN_SELECT_MIN_ROWS = 64
+
+    def __init__(
+        self,
+        train: np.ndarray,
+        labels: np.ndarray,
+        classes: np.ndarray,
+        n_neighbors: int,
+        weights: str = "uniform",
+        index: str = "brute",
+        mean: Optional[np.ndarray] = None,
+        scale: Optional[np.ndarray] = None
+    ):
+        """Wrap a scaled training matrix and its encoded class labels."""
+        if weights not in ("uniform", "distance"):
+            raise ValueError(f"Unsupported KNN weights: {weights}")
+        if index not in ("brute", "kd_tree"):
+            raise ValueError(f"Unknown KNN index: {index}")
+        if not (isinstance(train, np.ndarray) and train.dtype == np.float64
+                and train.flags.c_contiguous):
+            train = np.ascontiguousarray(train, dtype=np.float64)
+        # Kept as given so a memory-mapped block is not copied
+        self.train = train
+        self._train32 = None
+        self._sq_norms = None
+        self.labels = np.asarray(labels, dtype=np.intp)
+        self.classes_ = np.asarray(classes)
+        self.n_neighbors = min(int(n_neighbors), len(self.train))
+        self.weights = weights
+        self.index = index
+        self._tree = None
+        if index == "kd_tree":
+            # Imported here so serving without a KDTree never loads sklearn
+            from sklearn.neighbors import KDTree
+            self._tree = KDTree(self.train)
+        self.mean = None if mean is None else np.asarray(mean, dtype=np.float64)
+        self.scale = None if scale is None else np.asarray(scale, dtype=np.float64)
+
+    @classmethod
+    def from_sklearn(cls, knn, index: str = "brute") -> "CompiledKNN":
+        """Pack the training data of a fitted sklearn KNeighborsClassifier."""
+        if knn.effective_metric_ != "euclidean":
+            raise ValueError(f"Unsupported KNN metric: {knn.effective_metric_}")
+        if callable(knn.weights):
+            raise ValueError("Callable KNN weights are not supported")
+        labels = np.asarray(knn._y)
+        if labels.ndim != 1:
+            raise ValueError("Multi-output KNN models are not supported")
+        return cls(
+            train=knn._fit_X,
+            labels=labels,
+            classes=knn.classes_,
+            n_neighbors=knn.n_neighbors,
+            weights=knn.weights or "uniform",
+            index=index
+        )
+
+    @property
+    def folded(self) -> bool:
+        """Whether queries are raw inputs standardized by the model itself."""
+        return self.mean is not None
+
+    def fold_scaler(self, mean: np.ndarray, scale: np.ndarray) -> "CompiledKNN":
+        """A copy that takes raw inputs and standardizes them with mean and scale."""
+        if self.folded:
+            raise ValueError("KNN already has a scaler folded in")
+        return CompiledKNN(
+            self.train, self.labels, self.classes_, self.n_neighbors,
+            weights=self.weights, index=self.index, mean=mean, scale=scale
+        )
+
+    def params(self) -> Dict:
+        """Scalar settings stored alongside the arrays in a model artifact."""
+        return {"n_neighbors": self.n_neighbors, "weights": self.weights, "folded": self.folded}
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        """The training block, labels and scaler statistics, by name."""
+        arrays = {"train": self.train, "labels": self.labels, "classes_": self.classes_}
+        if self.folded:
+            arrays.update(mean=self.mean, scale=self.scale)
+        return arrays
+
+    @classmethod
+    def from_arrays(
+        cls, arrays: Dict[str, np.ndarray], params: Dict, index: str = "brute"
+    ) -> "CompiledKNN":
+        """Rebuild a KNN from to_arrays() output."""
+        return cls(
+            train=arrays["train"],
+            labels=arrays["labels"],
+            classes=np.array(arrays["classes_"]),
+            n_neighbors=params["n_neighbors"],
+            weights=params["weights"],
+            index=index,
+            mean=arrays.get("mean"),
+            scale=arrays.get("scale")
+        )
+
+    @property
+    def nbytes(self) -> int:
+        """Total size of the training block, labels and, once built, the float32 block."""
+        nbytes = self.train.nbytes + self.labels.nbytes
+        if self._train32 is not None:
+            nbytes += self._train32.nbytes + self._sq_norms.nbytes
+        return nbytes
+
+    @property
+    def mapped_nbytes(self) -> int:
+        """Size of the training block and labels memory-mapped from a model artifact."""
+        if not self.is_mapped:
+            return 0
+        return self.train.nbytes + self.labels.nbytes
+
+    @property
+    def is_mapped(self) -> bool:
+        """Whether the training block is memory-mapped from a model artifact."""
+        return isinstance(self.train, np.memmap)
+
+    def _search_block(self) -> Tuple[np.ndarray, np.ndarray]:
+        """The float32 training block and its squared row norms, built on first use."""
+        if self._train32 is None:
+            train32 = self.train.astype(np.float32)
+            self._sq_norms = np.einsum("ij,ij->i", train32, train32)
+            self._train32 = train32
+        return self._train32, self._sq_norms
+
+    def kneighbors(self, X: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (distances, training row indices) of the nearest neighbors, closest first."""
+        X = np.ascontiguousarray(X, dtype=np.float64)
+        if self.folded:
+            # Same arithmetic as the service's scaler
+            X = (X - self.mean) / self.scale
+        if self._tree is not None:
+            return self._tree.query(X, k=self.n_neighbors)
+
+        n = X.shape[0]
+        distances = np.empty((n, self.n_neighbors))
+        indices = np.empty((n, self.n_neighbors), dtype=np.intp)
+        block = max(1, self.BLOCK_ELEMENTS // len(self.train))
+        for start in range(0, n, block):
+            stop = min(start + block, n)
+            distances[start:stop], indices[start:stop] = self._kneighbors_block(X[start:stop])
+        return distances, indices
+
+    def _kneighbors_block(self, X: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Brute-force neighbors of one block of queries."""
+        train32, sq_norms = self._search_block()
+        X32 = X.astype(np.float32)
+        # |x - t|^2 = |x|^2 - 2 x.t + |t|^2; the product is one BLAS call
+        sq_dist = X32 @ train32.T
+        sq_dist *= -2
+        sq_dist += sq_norms
+        sq_dist += np.einsum("ij,ij->i", X32, X32)[:, None]
+
+        n_candidates = min(self.n_neighbors + self.REFINE_CANDIDATES, len(self.train))
+        candidates = self._smallest(sq_dist, n_candidates)
+
+        diff = X[:, None, :] - self.train[candidates]
+        exact = np.sqrt(np.einsum("ijk,ijk->ij", diff, diff))
+        # Closest first; equal distances in training-row order
+        order = np.lexsort((candidates, exact))[:, :self.n_neighbors]
+        return (
+            np.take_along_axis(exact, order, axis=1),
+            np.take_along_axis(candidates, order, axis=1)
+        )
+
+    @classmethod
+    def _smallest(cls, sq_dist: np.ndarray, m: int) -> np.ndarray:
+        """Column indices of the m smallest entries of each row, in no particular order."""
+        n_rows, n_cols = sq_dist.shape
+        if m >= n_cols:
+            return np.broadcast_to(np.arange(n_cols), sq_dist.shape)
+        if m > cls.ARGMIN_SELECT_LIMIT or n_rows < cls.ARGMIN_SELECT_MIN_ROWS:
+            return np.argpartition(sq_dist, m - 1, axis=1)[:, :m]
+        # On larger blocks a few vectorized argmin passes beat argpartition's
+        # per-row selection
+        rows = np.arange(n_rows)
+        found = np.empty((n_rows, m), dtype=np.intp)
+        for j in range(m):
+            found[:, j] = sq_dist.argmin(axis=1)
+            sq_dist[rows, found[:, j]] = np.inf
+        return found
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """Class probabilities from the neighbors' labels, weighted like sklearn."""
+        distances, indices = self.kneighbors(X)
+        neighbor_labels = self.labels[indices]
+        weights = self._weights(distances)
+        proba = np.empty((len(indices), len(self.classes_)))
+        for code in range(len(self.classes_)):
+            proba[:, code] = (weights * (neighbor_labels == code)).sum(axis=1)
+        proba /= proba.sum(axis=1, keepdims=True)
+        return proba
+
+    def _weights(self, distances: np.ndarray) -> np.ndarray:
+        """Per-neighbor vote weights."""
+        if self.weights == "uniform":
+            return np.ones_like(distances)
+        # Like sklearn, exact matches outvote everything else
+        with np.errstate(divide="ignore"):
+            weights = 1.0 / distances
+        exact_match = np.isinf(weights).any(axis=1)
+        weights[exact_match] = np.isinf(weights[exact_match])
+        return weights
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """Predict class labels for X."""
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1))
@@ -1,96 +1,441 @@
 """ML prediction service."""
 
-import joblib
+import pickle
+import threading
+import time
 import numpy as np
+from operator import attrgetter
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Optional, Sequence, Tuple
 
 from app.core.config import get_settings
 from app.core.logging import get_logger
-from app.models.schemas import PatientData
+from app.core.metrics import LatencyWindow, get_instrumentation
+from app.models.schemas import PatientData, feature_constraints
+from app.services.artifact import (
+    ArtifactError,
+    file_digest,
+    load_model,
+    read_manifest,
+    scaler_statistics,
+)
+from app.services.cache import GridPredictionCache, PredictionCache
+from app.services.neighbors import CompiledKNN
+from app.services.tree_ensemble import CompiledForest
 
 settings = get_settings()
 logger = get_logger(__name__)
 
+# Model input order; must match the column order the scaler was fitted on
+FEATURE_NAMES = [
+    "age", "sex", "cp", "trestbps", "chol", "fbs",
+    "restecg", "thalach", "exang", "oldpeak",
+    "slope", "ca", "thal"
+]
+
+# Upper bounds of the Low/Moderate/High bands; anything above is Very High
+RISK_THRESHOLDS = np.array([0.3, 0.5, 0.7])
+RISK_LEVELS = np.array(["Low", "Moderate", "High", "Very High"], dtype=object)
+
+_feature_getter = attrgetter(*FEATURE_NAMES)
+
+
+def _joblib_load(path: Path):
+    """Unpickle a joblib file; joblib and sklearn are only imported when needed."""
+    import joblib
+    return joblib.load(path)
+
+
+# Servable models; each is trained on FEATURE_NAMES with its own scaler
+MODEL_NAMES = ("random_forest", "knn")
+
+
+def risk_level_codes(probabilities: np.ndarray) -> np.ndarray:
+    """Index into RISK_LEVELS for each probability (same bands as _get_risk_level)."""
+    return np.searchsorted(RISK_THRESHOLDS, probabilities, side="right")
+
+
+def to_matrix(patients: Sequence[PatientData]) -> np.ndarray:
+    """Pack patients into one contiguous (n, 13) float64 feature matrix."""
+    n = len(patients)
+    flat = np.fromiter(
+        (value for patient in patients for value in _feature_getter(patient)),
+        dtype=np.float64,
+        count=n * len(FEATURE_NAMES)
+    )
+    return flat.reshape(n, len(FEATURE_NAMES))
+
+
+def format_results(predictions: np.ndarray, probabilities: np.ndarray) -> List[Dict]:
+    """Turn prediction arrays into the per-patient response dictionaries."""
+    risk_levels = RISK_LEVELS[risk_level_codes(probabilities)]
+    return [
+        {
+            "prediction": prediction,
+            "probability": probability,
+            "risk_level": risk_level
+        }
+        for prediction, probability, risk_level in zip(
+            predictions.astype(int).tolist(),
+            np.round(probabilities, 2).tolist(),
+            risk_levels.tolist()
+        )
+    ]
+
+
+def _estimate_nbytes(obj) -> int:
+    """Approximate in-memory size of a fitted estimator by its pickled size."""
+    return len(pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL))
+
 
 class PredictionService:
     """Service for handling ML predictions."""
     
-    def __init__(self):
-        """Initialize the prediction service."""
-        self.model = None
-        self.scaler = None
+    def __init__(self, model_name: str = "random_forest"):
+        """Initialize the prediction service for one of MODEL_NAMES."""
+        if model_name not in MODEL_NAMES:
+            raise ValueError(f"Unknown model: {model_name}")
+        self.model_name = model_name
+        self.latency = LatencyWindow()
+        self.instrumentation = get_instrumentation()
+        self._model_bytes = 0
+        self._model = None
+        self._model_path: Optional[Path] = None
+        self._model_lock = threading.Lock()
+        self._scaler = None
+        self._scaler_stats: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        self.compiled_model = None
+        self.manifest: Dict = {}
         self.models_loaded = False
+        self.cache = None
+        if settings.PREDICTION_CACHE_ENABLED:
+            if model_name == "knn" and settings.KNN_GRID_CACHE_ENABLED:
+                self.cache = GridPredictionCache(
+                    feature_constraints(FEATURE_NAMES),
+                    max_size=settings.PREDICTION_CACHE_SIZE,
+                    ttl_seconds=settings.PREDICTION_CACHE_TTL_SECONDS,
+                    model_name=model_name
+                )
+            else:
+                self.cache = PredictionCache(
+                    max_size=settings.PREDICTION_CACHE_SIZE,
+                    ttl_seconds=settings.PREDICTION_CACHE_TTL_SECONDS,
+                    oldpeak_column=FEATURE_NAMES.index("oldpeak"),
+                    oldpeak_decimals=settings.PREDICTION_CACHE_OLDPEAK_DECIMALS,
+                    model_name=model_name
+                )
         self.load_models()
         
+    def _joblib_paths(self) -> Tuple[Path, Path]:
+        """Pickled model and scaler paths for this service's model."""
+        if self.model_name == "knn":
+            return Path(settings.KNN_MODEL_PATH), Path(settings.KNN_SCALER_PATH)
+        return Path(settings.FOREST_MODEL_PATH), Path(settings.FOREST_SCALER_PATH)
+    
+    def _artifact_path(self) -> Path:
+        """Exported artifact path for this service's model."""
+        if self.model_name == "knn":
+            return Path(settings.KNN_ARTIFACT_PATH)
+        return Path(settings.FOREST_ARTIFACT_PATH)
+    
+    def source_paths(self) -> List[Path]:
+        """Files this model is loaded from; a reload is due when they change."""
+        return [self._artifact_path(), *self._joblib_paths()]
+    
     def load_models(self) -> bool:
-        """Load ML model and scaler."""
+        """
+        Load the model and scaler.
+        
+        With the compiled backend the exported artifact is served, and the
+        joblib files are only unpickled on demand (batches above
+        COMPILED_FOREST_MAX_ROWS). Without a current artifact the joblib
+        files are loaded and compiled in memory; artifacts are only written
+        by the training and export scripts.
+        """
         try:
-            logger.info("Loading ML models...")
+            logger.info(f"Loading {self.model_name} model...")
             
-            # Load Random Forest model and scaler
-            forest_path = Path(settings.FOREST_MODEL_PATH)
-            forest_scaler_path = Path(settings.FOREST_SCALER_PATH)
+            model_path, scaler_path = self._joblib_paths()
+            has_joblib = model_path.exists() and scaler_path.exists()
+            backend = settings.KNN_BACKEND if self.model_name == "knn" else settings.FOREST_BACKEND
             
-            if forest_path.exists() and forest_scaler_path.exists():
-                self.model = joblib.load(forest_path)
-                self.scaler = joblib.load(forest_scaler_path)
-                logger.info(f"Random Forest model loaded from {forest_path}")
-                self.models_loaded = True
-                return True
-            else:
-                logger.error(f"Model not found at {forest_path}")
-                return False
+            self._model = None
+            self._model_bytes = 0
+            self._model_path = model_path if has_joblib else None
+            self.compiled_model = None
+            self.manifest = {}
+            if backend == "compiled":
+                self._load_artifact(has_joblib)
+            if self.compiled_model is None:
+                if not has_joblib:
+                    logger.error(f"Model not found at {model_path}")
+                    return False
+                self.scaler = _joblib_load(scaler_path)
+                self._load_sklearn_model()
+                if backend == "compiled":
+                    self._compile_model()
+            if self.cache is not None:
+                self.cache.clear()
+            self.models_loaded = True
+            return True
             
         except Exception as e:
             logger.error(f"Error loading models: {str(e)}", exc_info=True)
             return False
     
+    def _load_artifact(self, has_joblib: bool):
+        """
+        Serve the exported artifact unless it is missing or stale.
+        
+        The artifact records a digest of the joblib files it was exported
+        from; one exported from other files is skipped (and the joblib files
+        served instead) rather than rewritten, since every worker runs this.
+        Standalone artifacts (compressed forests) are served as they are.
+        With MODEL_MMAP its arrays are read-only views of the file, backed
+        by the page cache and shared by every worker on a node.
+        """
+        artifact_path = self._artifact_path()
+        try:
+            manifest = read_manifest(artifact_path)
+            # Standalone artifacts (e.g. compressed forests) are not built from the joblib files
+            standalone = manifest is not None and manifest.get("standalone", False)
+            if manifest is None:
+                logger.warning(f"No model artifact at {artifact_path}")
+                return
+            if has_joblib and not standalone:
+                digest = file_digest(list(self._joblib_paths()))
+                if manifest["source_digest"] != digest:
+                    logger.warning(
+                        f"Artifact {artifact_path} was exported from other model files; "
+                        f"serving the joblib files (run scripts/export_model.py to refresh it)"
+                    )
+                    return
+            
+            compiled, scaler, manifest = load_model(
+                artifact_path,
+                mmap_mode="r" if settings.MODEL_MMAP else None,
+                knn_index=settings.KNN_INDEX
+            )
+            if manifest["kind"] != self.model_name:
+                raise ArtifactError(f"Artifact holds a {manifest['kind']} model")
+            if manifest["feature_names"] != FEATURE_NAMES:
+                raise ArtifactError("Artifact feature order does not match FEATURE_NAMES")
+            self.compiled_model, self.scaler, self.manifest = compiled, scaler, manifest
+            if standalone:
+                # The joblib forest is a different model; score every batch with this one
+                self._model_path = None
+            logger.info(
+                f"Loaded {self.model_name} artifact from {artifact_path} "
+                f"(checksum {manifest['checksum'][:12]})"
+            )
+        except Exception as e:
+            logger.warning(f"Model artifact unavailable, loading joblib files: {str(e)}")
+    
+    @property
+    def model(self):
+        """
+        The sklearn forest.
+        
+        When an exported artifact is served, the estimator is only unpickled
+        on first use (batches above COMPILED_FOREST_MAX_ROWS), so workers
+        that never need it do not hold a private copy. None if only the
+        artifact is deployed.
+        """
+        if self._model is None and self._model_path is not None:
+            with self._model_lock:
+                if self._model is None:
+                    self._load_sklearn_model()
+        return self._model
+    
+    @model.setter
+    def model(self, model):
+        self._model = model
+        self._model_bytes = _estimate_nbytes(model) if model is not None else 0
+    
+    def _load_sklearn_model(self):
+        """Unpickle the fitted estimator from the model path."""
+        self.model = _joblib_load(self._model_path)
+        logger.info(f"{type(self._model).__name__} model loaded from {self._model_path}")
+    
+    @property
+    def scaler(self):
+        """The fitted scaler (ScalerStatistics when served from an artifact)."""
+        return self._scaler
+    
+    @scaler.setter
+    def scaler(self, scaler):
+        self._scaler = scaler
+        try:
+            self._scaler_stats = scaler_statistics(scaler)
+        except ArtifactError:
+            # Other transformers are applied through their own transform()
+            self._scaler_stats = None
+    
+    @property
+    def sklearn_loaded(self) -> bool:
+        """Whether the sklearn estimator is held in memory."""
+        return self._model is not None
+    
+    def memory_footprint(self) -> Dict[str, int]:
+        """
+        Approximate bytes held for this model.
+        
+        ``private_bytes`` is memory of this process alone; ``mapped_bytes``
+        is backed by memory-mapped artifact files and shared with every
+        other worker mapping them.
+        """
+        private = self._model_bytes
+        mapped = 0
+        if self.scaler is not None:
+            private += _estimate_nbytes(self.scaler)
+        if self.compiled_model is not None:
+            mapped += self.compiled_model.mapped_nbytes
+            private += self.compiled_model.nbytes - mapped
+        return {"private_bytes": private, "mapped_bytes": mapped}
+    
+    @property
+    def classes(self) -> np.ndarray:
+        """Class labels, without forcing the sklearn forest to load."""
+        if self.compiled_model is not None:
+            return self.compiled_model.classes_
+        return self.model.classes_
+    
+    def _compile_model(self):
+        """Build the NumPy evaluator in memory, with the scaler folded in."""
+        self.compiled_model = None
+        try:
+            mean, scale = scaler_statistics(self.scaler)
+            if self.model_name == "knn":
+                knn = CompiledKNN.from_sklearn(self.model, index=settings.KNN_INDEX)
+                self.compiled_model = knn.fold_scaler(mean, scale)
+                logger.info(
+                    f"Packed {len(self.compiled_model.train)} KNN training rows "
+                    f"({settings.KNN_INDEX} search)"
+                )
+                return
+            self.compiled_model = CompiledForest.from_sklearn(self.model).fold_scaler(mean, scale)
+            logger.info(
+                f"Compiled {self.compiled_model.n_trees} trees "
+                f"({self.compiled_model.n_nodes} nodes) into flat arrays"
+            )
+        except Exception as e:
+            logger.warning(f"Falling back to sklearn inference: {str(e)}")
+    
+    def scale(self, X: np.ndarray) -> np.ndarray:
+        """
+        Standardize a raw feature matrix for the sklearn estimator.
+        
+        Applies the fitted StandardScaler statistics directly, which is the
+        same arithmetic as scaler.transform without its per-call validation.
+        """
+        if self._scaler_stats is None:
+            return self.scaler.transform(X)
+        mean, scale = self._scaler_stats
+        return (X - mean) / scale
+    
+    def to_matrix(self, patients: Sequence[PatientData]) -> np.ndarray:
+        """Module-level to_matrix, timed as this model's stage."""
+        start = self.instrumentation.start()
+        X = to_matrix(patients)
+        self.instrumentation.observe(self.model_name, "to_matrix", len(patients), start)
+        return X
+    
     def preprocess_input(self, patient_data: PatientData) -> np.ndarray:
         """Convert patient data to model input format."""
-        data = np.array([[
-            patient_data.age,
-            patient_data.sex,
-            patient_data.cp,
-            patient_data.trestbps,
-            patient_data.chol,
-            patient_data.fbs,
-            patient_data.restecg,
-            patient_data.thalach,
-            patient_data.exang,
-            patient_data.oldpeak,
-            patient_data.slope,
-            patient_data.ca,
-            patient_data.thal
-        ]])
-        return self.scaler.transform(data)
+        return self.scale(self.to_matrix([patient_data]))
     
-    def predict(self, patient_data: PatientData) -> Dict:
+    def predict_matrix(self, X: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
         """
-        Predict heart disease risk for a patient.
+        Score a raw (unscaled) feature matrix.
+        
+        With the prediction cache enabled, all rows are looked up in one
+        pass and only the misses go through the model.
         
         Returns:
-            Dictionary with prediction, probability, and risk level
+            Tuple of (predicted classes, positive-class probabilities)
         """
-        # Preprocess input
-        X = self.preprocess_input(patient_data)
+        if len(X) == 0:
+            return np.empty(0, dtype=self.classes.dtype), np.empty(0)
+        if self.cache is None:
+            return self._score_matrix(X)
         
-        # Make prediction
-        prediction = int(self.model.predict(X)[0])
-        probability = float(self.model.predict_proba(X)[0][1])
+        start = self.instrumentation.start()
+        X = self.cache.canonicalize(X)
+        keys = self.cache.keys(X)
+        cached = self.cache.get_many(keys)
+        self.instrumentation.observe(self.model_name, "cache_lookup", len(X), start)
+        missing = [i for i, entry in enumerate(cached) if entry is None]
+        if len(missing) == len(cached):
+            predictions, probabilities = self._score_matrix(X)
+            self.cache.put_many(keys, predictions, probabilities)
+            return predictions, probabilities
         
-        # Determine risk level
-        risk_level = self._get_risk_level(probability)
+        predictions = np.empty(len(X), dtype=self.classes.dtype)
+        probabilities = np.empty(len(X))
+        for i, entry in enumerate(cached):
+            if entry is not None:
+                predictions[i], probabilities[i] = entry
+        if missing:
+            miss_predictions, miss_probabilities = self._score_matrix(X[missing])
+            predictions[missing] = miss_predictions
+            probabilities[missing] = miss_probabilities
+            self.cache.put_many([keys[i] for i in missing], miss_predictions, miss_probabilities)
+        return predictions, probabilities
+    
+    def warm_up(self, X: np.ndarray):
+        """Score X past the result cache, without recording it in the latency window."""
+        self._score_matrix(X, record=False)
+    
+    def _score_matrix(self, X: np.ndarray, record: bool = True) -> Tuple[np.ndarray, np.ndarray]:
+        """Score a raw feature matrix in a single model pass."""
+        start = time.perf_counter()
+        # The compiled forest loses to sklearn on large batches; compiled KNN does not
+        if self.compiled_model is not None and (
+            self.model_name == "knn"
+            or len(X) <= settings.COMPILED_FOREST_MAX_ROWS
+            or self._model_path is None
+        ):
+            # The scaler is folded into compiled models
+            model = self.compiled_model
+        else:
+            model = self.model
+            stage_start = self.instrumentation.start()
+            X = self.scale(X)
+            self.instrumentation.observe(self.model_name, "scale", len(X), stage_start)
+        stage_start = self.instrumentation.start()
+        proba = model.predict_proba(X)
+        self.instrumentation.observe(self.model_name, "predict_proba", len(X), stage_start)
         
-        return {
-            "prediction": prediction,
-            "probability": round(probability, 2),
-            "risk_level": risk_level
-        }
+        # Same tie-breaking as model.predict: argmax picks the first class
+        predictions = model.classes_.take(np.argmax(proba, axis=1))
+        if record:
+            self.latency.observe(time.perf_counter() - start)
+        return predictions, proba[:, 1]
+    
+    def format_results(
+        self, predictions: np.ndarray, probabilities: np.ndarray
+    ) -> List[Dict]:
+        """Module-level format_results, timed as this model's stage."""
+        start = self.instrumentation.start()
+        results = format_results(predictions, probabilities)
+        self.instrumentation.observe(self.model_name, "format", len(results), start)
+        return results
+    
+    def predict(self, patient_data: PatientData) -> Dict:
+        """
+        Predict heart disease risk for a patient.
+        
+        Returns:
+            Dictionary with prediction, probability, and risk level
+        """
+        return self.predict_batch([patient_data])[0]
     
     def predict_batch(self, patients: List[PatientData]) -> List[Dict]:
-        """Predict for multiple patients."""
-        return [self.predict(patient) for patient in patients]
+        """Predict for multiple patients with one vectorized model pass."""
+        if not patients:
+            return []
+        predictions, probabilities = self.predict_matrix(self.to_matrix(patients))
+        return self.format_results(predictions, probabilities)
     
     def _get_risk_level(self, probability: float) -> str:
         """Determine risk level based on probability."""
@@ -103,22 +448,10 @@ class PredictionService:
         else:
             return "Very High"
     
+    def _get_risk_levels(self, probabilities: np.ndarray) -> np.ndarray:
+        """Vectorized _get_risk_level over an array of probabilities."""
+        return RISK_LEVELS[risk_level_codes(probabilities)]
+    
     def get_feature_names(self) -> List[str]:
         """Get list of feature names."""
-        return [
-            "age", "sex", "cp", "trestbps", "chol", "fbs",
-            "restecg", "thalach", "exang", "oldpeak",
-            "slope", "ca", "thal"
-        ]
-
-
-# Singleton instance
-_prediction_service: PredictionService = None
-
-
-def get_prediction_service() -> PredictionService:
-    """Get or create prediction service instance."""
-    global _prediction_service
-    if _prediction_service is None:
-        _prediction_service = PredictionService()
-    return _prediction_service
+        return list(FEATURE_NAMES)
@@ -0,0 +1,168 @@
+"""Registry of servable models, loaded lazily and kept warm."""
+
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from app.core.config import get_settings
+from app.core.logging import get_logger
+from app.core.metrics import MODEL_VERSION
+from app.services.cascade import CascadeService
+from app.services.prediction import MODEL_NAMES, PredictionService
+
+settings = get_settings()
+logger = get_logger(__name__)
+
+
+def model_version(service: PredictionService) -> Tuple[str, str]:
+    """(version, artifact checksum) of a service, empty when unknown."""
+    manifest = getattr(service, "manifest", {})
+    return manifest.get("metadata", {}).get("version") or "", manifest.get("checksum") or ""
+
+
+class ModelRegistry:
+    """
+    One prediction service per model, created on first use.
+
+    Each model is loaded the first time a request asks for it and then
+    kept for the life of the process, so clients that never select a
+    model pay nothing for it. No selection (None) always means the default
+    model. ``auto`` must be asked for: it is served by a registered
+    ``auto`` model (the cascade, with CASCADE_ENABLED) when there is one,
+    and by the default model otherwise.
+
+    ``swap`` replaces a live service; callers that already hold the old
+    one finish with it. ``dependencies`` names the models a model is built
+    from (the cascade wraps the forest), so reloads can rebuild them too.
+    """
+
+    def __init__(
+        self,
+        factories: Dict[str, Callable[[], PredictionService]],
+        default_model: str = "random_forest",
+        dependencies: Optional[Dict[str, Sequence[str]]] = None
+    ):
+        """Initialize the registry; ``factories`` build a new service per call."""
+        if default_model not in factories:
+            raise ValueError(f"Default model {default_model} is not registered")
+        self._factories = dict(factories)
+        self.default_model = default_model
+        self._dependencies = {name: tuple(deps) for name, deps in (dependencies or {}).items()}
+        self._services: Dict[str, PredictionService] = {}
+        self._load_seconds: Dict[str, float] = {}
+        # Reentrant: a factory may get() the models it depends on
+        self._lock = threading.RLock()
+
+    @property
+    def names(self) -> List[str]:
+        """Registered model names."""
+        return list(self._factories)
+
+    def resolve(self, model_type: Optional[str]) -> str:
+        """Map a requested model type to a registered model name."""
+        if model_type is None:
+            return self.default_model
+        if model_type == "auto" and "auto" not in self._factories:
+            return self.default_model
+        if model_type not in self._factories:
+            raise ValueError(f"Unknown model: {model_type}")
+        return model_type
+
+    def get(self, model_type: Optional[str] = None) -> PredictionService:
+        """Return the service for a model, loading it on first use."""
+        name = self.resolve(model_type)
+        service = self._services.get(name)
+        if service is not None:
+            return service
+        with self._lock:
+            if name not in self._services:
+                start = time.perf_counter()
+                self._services[name] = self._factories[name]()
+                self._load_seconds[name] = time.perf_counter() - start
+                MODEL_VERSION.labels(name, *model_version(self._services[name])).set(1)
+                logger.info(f"Model {name} ready in {self._load_seconds[name]:.3f}s")
+            return self._services[name]
+
+    def is_loaded(self, model_type: Optional[str]) -> bool:
+        """Whether a model's service has been created."""
+        return self.resolve(model_type) in self._services
+
+    def peek(self, model_type: Optional[str]) -> Optional[PredictionService]:
+        """The live service for a model, without loading it."""
+        return self._services.get(self.resolve(model_type))
+
+    def create(self, model_type: Optional[str]) -> PredictionService:
+        """Build a new service for a model without registering it."""
+        return self._factories[self.resolve(model_type)]()
+
+    def swap(self, model_type: Optional[str], service: PredictionService, load_seconds: float):
+        """Make service the live one for a model; returns the replaced service."""
+        name = self.resolve(model_type)
+        with self._lock:
+            previous = self._services.get(name)
+            self._services[name] = service
+            self._load_seconds[name] = load_seconds
+            if previous is not None:
+                try:
+                    MODEL_VERSION.remove(name, *model_version(previous))
+                except KeyError:
+                    pass
+            MODEL_VERSION.labels(name, *model_version(service)).set(1)
+        return previous
+
+    def dependents(self, model_type: Optional[str]) -> List[str]:
+        """Loaded models built from the given one."""
+        name = self.resolve(model_type)
+        return [
+            dependent for dependent, deps in self._dependencies.items()
+            if name in deps and dependent in self._services
+        ]
+
+    def describe(self) -> Dict[str, Dict]:
+        """Load state, memory footprint and observed latency of every model."""
+        info = {}
+        for name in self._factories:
+            service = self._services.get(name)
+            if service is None:
+                info[name] = {"loaded": False}
+                continue
+            if service.compiled_model is None:
+                backend = "sklearn"
+            elif service.compiled_model.is_mapped:
+                backend = "compiled (memory-mapped)"
+            else:
+                backend = "compiled"
+            info[name] = {
+                "loaded": service.models_loaded,
+                "backend": backend,
+                "sklearn_loaded": service.sklearn_loaded,
+                "version": service.manifest.get("metadata", {}).get("version"),
+                "checksum": service.manifest.get("checksum"),
+                "load_seconds": round(self._load_seconds[name], 3),
+                "memory": service.memory_footprint(),
+                "latency": service.latency.summary()
+            }
+        return info
+
+
+# Singleton instance
+_model_registry: ModelRegistry = None
+
+
+def get_model_registry() -> ModelRegistry:
+    """Get or create the model registry instance."""
+    global _model_registry
+    if _model_registry is None:
+        factories = {name: (lambda name=name: PredictionService(name)) for name in MODEL_NAMES}
+        dependencies = {}
+        if settings.CASCADE_ENABLED:
+            factories["auto"] = lambda: CascadeService(
+                get_model_registry().get("random_forest"),
+                fast_trees=settings.CASCADE_FAST_TREES,
+                margin=settings.CASCADE_MARGIN
+            )
+            dependencies["auto"] = ("random_forest",)
+        _model_registry = ModelRegistry(
+            factories, default_model=settings.DEFAULT_MODEL, dependencies=dependencies
+        )
+    return _model_registry
@@ -0,0 +1,216 @@
+"""Hot model reload with canary checks and atomic swap."""
+
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import get_settings
+from app.core.logging import get_logger
+from app.core.metrics import MODEL_RELOAD_DURATION, MODEL_RELOADS
+from app.models.schemas import feature_constraints
+from app.services.executor import get_inference_executor
+from app.services.prediction import FEATURE_NAMES, PredictionService, risk_level_codes
+from app.services.registry import ModelRegistry, get_model_registry, model_version
+
+settings = get_settings()
+logger = get_logger(__name__)
+
+
+class ReloadError(RuntimeError):
+    """A reloaded model failed to load or failed its canary check; the live one is kept."""
+
+
+def canary_matrix(n_rows: int = 256, seed: int = 0) -> np.ndarray:
+    """
+    A fixed set of valid patients, drawn from the PatientData bounds.
+
+    The seed is fixed, so every replica checks the same rows.
+    """
+    rng = np.random.default_rng(seed)
+    columns = []
+    for name, constraint in feature_constraints(FEATURE_NAMES).items():
+        if constraint["allowed"] is not None:
+            columns.append(rng.choice(constraint["allowed"], n_rows))
+        elif constraint["integer"]:
+            values = rng.integers(constraint["ge"], constraint["le"] + 1, n_rows)
+            columns.append(values.astype(float))
+        else:
+            columns.append(np.round(rng.uniform(constraint["ge"], constraint["le"], n_rows), 1))
+    return np.column_stack(columns)
+
+
+def _fingerprint(paths) -> Tuple:
+    """Size and mtime of each path; missing files count as (0, 0)."""
+    stamps = []
+    for path in paths:
+        try:
+            stat = path.stat()
+            stamps.append((str(path), stat.st_size, stat.st_mtime_ns))
+        except OSError:
+            stamps.append((str(path), 0, 0))
+    return tuple(stamps)
+
+
+class ModelReloader:
+    """
+    Load a new copy of a model beside the live one and swap it in.
+
+    The new service is built off the request path, warmed and checked on a
+    canary set: it must score every row with valid probabilities, and at
+    most ``max_changed`` of the rows may change risk level compared with
+    the live model. Only then is it swapped into the registry; requests
+    that already hold the old service finish on it. Models built from the
+    reloaded one (the cascade) are rebuilt the same way.
+
+    ``watch`` polls the files of every loaded model and reloads a model
+    once its files changed and then stayed unchanged for one poll, so a
+    copy in progress is not picked up halfway.
+    """
+
+    def __init__(
+        self,
+        registry: ModelRegistry,
+        canary: np.ndarray,
+        max_changed: float = 0.25,
+        on_swap: Optional[Callable[[], None]] = None
+    ):
+        """Initialize the reloader; ``on_swap`` runs after every successful reload."""
+        self.registry = registry
+        self.canary = canary
+        self.max_changed = max_changed
+        self.on_swap = on_swap
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._fingerprints: Dict[str, Tuple] = {}
+        self._pending: Dict[str, Tuple] = {}
+
+    def reload(self, model_type: Optional[str] = None) -> List[Dict]:
+        """Reload a model and its dependents; returns what was swapped in."""
+        name = self.registry.resolve(model_type)
+        swapped = []
+        try:
+            with self._lock:
+                swapped.append(self._reload_one(name))
+                for dependent in self.registry.dependents(name):
+                    swapped.append(self._reload_one(dependent))
+        finally:
+            if swapped and self.on_swap is not None:
+                self.on_swap()
+        return swapped
+
+    def _reload_one(self, name: str) -> Dict:
+        """Build, warm and check one model, then swap it in."""
+        start = time.perf_counter()
+        try:
+            service = self.registry.create(name)
+            if not service.models_loaded:
+                raise ReloadError(f"Model {name} failed to load")
+            self.check(name, service, self.registry.peek(name))
+        except Exception as e:
+            MODEL_RELOADS.labels(model=name, outcome="failure").inc()
+            logger.error(f"Reload of {name} rejected, keeping the live model: {str(e)}")
+            if isinstance(e, ReloadError):
+                raise
+            raise ReloadError(f"Model {name} failed to load: {str(e)}") from e
+
+        seconds = time.perf_counter() - start
+        self.registry.swap(name, service, seconds)
+        self._fingerprints[name] = _fingerprint(service.source_paths())
+        MODEL_RELOADS.labels(model=name, outcome="success").inc()
+        MODEL_RELOAD_DURATION.labels(model=name).observe(seconds)
+        version, checksum = model_version(service)
+        logger.info(f"Reloaded {name} in {seconds:.3f}s (version {version or 'unknown'})")
+        return {
+            "model": name, "version": version, "checksum": checksum, "seconds": round(seconds, 3)
+        }
+
+    def check(self, name: str, service: PredictionService, live: Optional[PredictionService]):
+        """Score the canary set with the new model (warming it up) and validate the result."""
+        # Past the caches and latency windows, which the canary rows would skew
+        predictions, probabilities = service._score_matrix(self.canary, record=False)
+        service._score_matrix(self.canary[:1], record=False)
+        malformed = len(probabilities) != len(self.canary)
+        if malformed or not np.isin(predictions, service.classes).all():
+            raise ReloadError(f"Model {name} returned malformed canary predictions")
+        in_range = (probabilities >= 0) & (probabilities <= 1)
+        if not (np.isfinite(probabilities) & in_range).all():
+            raise ReloadError(f"Model {name} returned invalid canary probabilities")
+        if live is None:
+            return
+        _, live_probabilities = live._score_matrix(self.canary, record=False)
+        changed = np.mean(risk_level_codes(probabilities) != risk_level_codes(live_probabilities))
+        if changed > self.max_changed:
+            raise ReloadError(
+                f"Model {name} changes the risk level of {changed:.0%} of canary rows "
+                f"(limit {self.max_changed:.0%})"
+            )
+
+    def poll(self) -> List[Dict]:
+        """Reload every loaded model whose files changed and have since settled."""
+        swapped = []
+        for name in self.registry.names:
+            service = self.registry.peek(name)
+            if service is None or not service.source_paths():
+                continue
+            current = _fingerprint(service.source_paths())
+            known = self._fingerprints.setdefault(name, current)
+            if current == known:
+                continue
+            pending, self._pending[name] = self._pending.get(name), current
+            if pending != current:
+                continue
+            try:
+                swapped.extend(self.reload(name))
+            except ReloadError:
+                # Do not retry the same files on every poll
+                self._fingerprints[name] = current
+        return swapped
+
+    def watch(self, interval: float):
+        """Start polling the model files in a background thread."""
+        if self._thread is not None:
+            return
+        for name in self.registry.names:
+            service = self.registry.peek(name)
+            if service is not None:
+                self._fingerprints[name] = _fingerprint(service.source_paths())
+
+        def loop():
+            while not self._stop.wait(interval):
+                try:
+                    self.poll()
+                except Exception as e:
+                    logger.error(f"Model file watch failed: {str(e)}", exc_info=True)
+
+        self._thread = threading.Thread(target=loop, name="model-reload", daemon=True)
+        self._thread.start()
+        logger.info(f"Watching model files every {interval}s")
+
+    def stop(self):
+        """Stop the background watch."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+
+# Singleton instance
+_model_reloader: ModelReloader = None
+
+
+def get_model_reloader() -> ModelReloader:
+    """Get or create the model reloader instance."""
+    global _model_reloader
+    if _model_reloader is None:
+        executor = get_inference_executor()
+        _model_reloader = ModelReloader(
+            get_model_registry(),
+            canary_matrix(settings.MODEL_RELOAD_CANARY_SIZE),
+            max_changed=settings.MODEL_RELOAD_MAX_CHANGED,
+            # Process workers hold their own model copies
+            on_swap=executor.recycle if executor.mode == "process" else None
+        )
+    return _model_reloader
@@ -0,0 +1,141 @@
+"""Startup pipeline: load and warm the models before reporting ready."""
+
+import asyncio
+import time
+from typing import Dict, List, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import get_settings
+from app.core.logging import get_logger
+from app.models.schemas import PatientData, feature_constraints
+from app.services.executor import get_inference_executor
+from app.services.prediction import FEATURE_NAMES
+from app.services.registry import ModelRegistry, get_model_registry
+from app.services.reload import canary_matrix
+
+settings = get_settings()
+logger = get_logger(__name__)
+
+
+def warmup_patients(n_rows: int) -> List[PatientData]:
+    """Valid patients from the canary set, typed as the API would parse them."""
+    integer = [constraint["integer"] for constraint in feature_constraints(FEATURE_NAMES).values()]
+    return [
+        PatientData(**{
+            name: int(value) if is_int else float(value)
+            for name, value, is_int in zip(FEATURE_NAMES, row, integer)
+        })
+        for row in canary_matrix(max(1, n_rows))
+    ]
+
+
+class StartupPipeline:
+    """
+    Bring a worker from imported to ready.
+
+    Each model in ``models`` is loaded once through the registry (off the
+    event loop), then a warmup batch and a single row are scored on the
+    executor that serves /predict, so first-call costs are paid before
+    traffic arrives. Warmup rows skip the prediction cache and are not
+    counted in the latency reported by /model/info. The stage and the time
+    spent in each step are kept for /ready and logged.
+    """
+
+    def __init__(
+        self,
+        registry: ModelRegistry,
+        models: List[str],
+        warmup_rows: int = 64,
+        warmup: bool = True
+    ):
+        """Initialize the pipeline; nothing runs until ``start``."""
+        self.registry = registry
+        self.models = models
+        self.warmup_rows = warmup_rows
+        self.warmup = warmup
+        self.stage = "starting"
+        self.error: Optional[str] = None
+        self.timings: Dict[str, float] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def ready(self) -> bool:
+        """Whether every model is loaded and warm."""
+        return self.stage == "ready"
+
+    def start(self) -> asyncio.Task:
+        """Run the pipeline in the background on the running event loop."""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self.run())
+        return self._task
+
+    async def run(self):
+        """Load, then warm up, every configured model."""
+        try:
+            self.stage = "loading"
+            for name in self.models:
+                start = time.perf_counter()
+                service = await run_in_threadpool(self.registry.get, name)
+                if not service.models_loaded:
+                    raise RuntimeError(f"Model {name} failed to load")
+                self.timings[f"load_{name}"] = time.perf_counter() - start
+
+            if self.warmup:
+                self.stage = "warming"
+                patients = warmup_patients(self.warmup_rows)
+                executor = get_inference_executor()
+                for name in self.models:
+                    start = time.perf_counter()
+                    X = self.registry.get(name).to_matrix(patients)
+                    await executor.warm_up(X, name)
+                    await executor.warm_up(X[:1], name)
+                    self.timings[f"warmup_{name}"] = time.perf_counter() - start
+        except Exception as e:
+            self.stage = "failed"
+            self.error = str(e)
+            logger.error(f"Startup failed: {str(e)}", exc_info=True)
+            return
+
+        self.stage = "ready"
+        logger.info(
+            "Ready to serve: " + ", ".join(
+                f"{step} {seconds:.3f}s" for step, seconds in self.timings.items()
+            )
+        )
+
+    async def stop(self):
+        """Cancel the pipeline if it is still running."""
+        task, self._task = self._task, None
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    def describe(self) -> Dict:
+        """Stage, error and step timings, for /ready."""
+        return {
+            "ready": self.ready,
+            "stage": self.stage,
+            "error": self.error,
+            "timings": {step: round(seconds, 3) for step, seconds in self.timings.items()}
+        }
+
+
+# Singleton instance
+_startup_pipeline: StartupPipeline = None
+
+
+def get_startup_pipeline() -> StartupPipeline:
+    """Get or create the startup pipeline instance."""
+    global _startup_pipeline
+    if _startup_pipeline is None:
+        _startup_pipeline = StartupPipeline(
+            get_model_registry(),
+            settings.WARMUP_MODELS or [settings.DEFAULT_MODEL],
+            warmup_rows=settings.WARMUP_ROWS,
+            warmup=settings.WARMUP_ENABLED
+        )
+    return _startup_pipeline
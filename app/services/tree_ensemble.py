@@ -0,0 +1,397 @@
+"""Flat-array evaluator for fitted tree ensembles."""
+
+from typing import Dict
+
+import numpy as np
+
+
+class CompiledForest:
+    """
+    Random Forest compiled into packed NumPy node arrays.
+
+    All trees share one set of node arrays (``feature``, ``threshold``,
+    ``left``, ``right``, ``value``). Leaves point back to themselves with
+    an infinite threshold, so every tree can be walked for a fixed
+    ``max_depth`` steps without checking for termination. Split nodes are
+    numbered grouped by feature, with leaves last, which lets small batches
+    evaluate every split with one ``np.repeat`` and one comparison.
+
+    Exposes ``predict_proba`` and ``classes_`` like the sklearn estimator
+    it was built from, so it can be used in its place. A forest with
+    ``folded`` set has its input scaler folded into the thresholds and
+    takes raw feature vectors. ``to_arrays`` and ``from_arrays`` move the
+    arrays in and out of a model artifact (see app.services.artifact).
+    """
+
+    # Largest rows * nodes product evaluated with the all-splits strategy;
+    # above it the level-by-level walk touches less memory
+    DENSE_WORK_LIMIT = 1 << 18
+
+    # Arrays stored in model artifacts
+    ARRAYS = ("feature", "threshold", "left", "right", "value", "roots", "classes_")
+
+    # Evaluation tables rebuilt from the node arrays at load time
+    TABLES = ("_group_sizes", "_delta", "_left32", "_children2", "_feature2", "_threshold2")
+
+    def __init__(
+        self,
+        feature: np.ndarray,
+        threshold: np.ndarray,
+        left: np.ndarray,
+        right: np.ndarray,
+        value: np.ndarray,
+        roots: np.ndarray,
+        max_depth: int,
+        classes: np.ndarray,
+        n_features: int,
+        folded: bool = False
+    ):
+        """Wrap already packed node arrays (nodes grouped by split feature)."""
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.max_depth = int(max_depth)
+        self.classes_ = classes
+        self.n_features = int(n_features)
+        self.folded = bool(folded)
+        self.n_trees = len(roots)
+        self.n_nodes = len(feature)
+
+        # Nodes per split feature, plus a trailing group for the leaves
+        is_leaf = np.isinf(threshold)
+        self._group_sizes = np.bincount(
+            np.where(is_leaf, self.n_features, feature), minlength=self.n_features + 1
+        )
+        self._delta = (right - left).astype(np.int32)
+        self._left32 = left.astype(np.int32)
+
+        # Level walk: indices are kept doubled so the branch is a plain add
+        children = np.empty(2 * self.n_nodes, dtype=np.intp)
+        children[0::2] = 2 * left
+        children[1::2] = 2 * right
+        self._children2 = children
+        self._feature2 = np.repeat(feature, 2)
+        self._threshold2 = np.repeat(threshold, 2)
+
+    @classmethod
+    def from_sklearn(cls, forest) -> "CompiledForest":
+        """Pack the fitted estimators of a sklearn forest classifier."""
+        trees = [estimator.tree_ for estimator in forest.estimators_]
+        if not trees:
+            raise ValueError("Forest has no fitted estimators")
+
+        counts = np.array([tree.node_count for tree in trees])
+        offsets = np.concatenate([[0], np.cumsum(counts)[:-1]])
+        n_nodes = int(counts.sum())
+        n_features = int(forest.n_features_in_)
+
+        feature = np.concatenate([tree.feature for tree in trees]).astype(np.intp)
+        threshold = np.concatenate([tree.threshold for tree in trees])
+        pairs = list(zip(trees, offsets))
+        left = np.concatenate([tree.children_left + offset for tree, offset in pairs])
+        right = np.concatenate([tree.children_right + offset for tree, offset in pairs])
+        value = np.concatenate([tree.value[:, 0, :] for tree in trees])
+
+        # Leaves loop back to themselves and never branch right
+        nodes = np.arange(n_nodes)
+        is_leaf = np.concatenate([tree.children_left == -1 for tree in trees])
+        left = np.where(is_leaf, nodes, left)
+        right = np.where(is_leaf, nodes, right)
+        threshold = np.where(is_leaf, np.inf, threshold)
+        feature = np.where(is_leaf, 0, feature)
+
+        totals = value.sum(axis=1, keepdims=True)
+        value = value / np.where(totals == 0, 1, totals)
+
+        # Renumber nodes so splits are grouped by feature and leaves come last
+        order = np.argsort(np.where(is_leaf, n_features, feature), kind="stable")
+        new_index = np.empty(n_nodes, dtype=np.intp)
+        new_index[order] = nodes
+
+        return cls(
+            feature=feature[order],
+            threshold=threshold[order],
+            left=new_index[left[order]],
+            right=new_index[right[order]],
+            value=value[order],
+            roots=new_index[offsets],
+            max_depth=max(tree.max_depth for tree in trees),
+            classes=np.asarray(forest.classes_),
+            n_features=n_features
+        )
+
+    def prefix(self, n_trees: int) -> "CompiledForest":
+        """
+        A forest of only the first ``n_trees`` trees.
+
+        Trees of a random forest are identically distributed, so a prefix
+        is an unbiased, cheaper estimate of the full forest.
+        """
+        n_trees = min(max(1, int(n_trees)), self.n_trees)
+        return self.select_trees(np.arange(n_trees))
+
+    def select_trees(self, trees: np.ndarray) -> "CompiledForest":
+        """A forest of the given trees (indices into ``roots``), in that order."""
+        return self._pack(
+            self.feature, self.threshold, self.left, self.right, self.value,
+            np.asarray(self.roots)[np.asarray(trees, dtype=np.intp)]
+        )
+
+    def node_depths(self) -> np.ndarray:
+        """Depth of every node below its tree's root (-1 for unreachable nodes)."""
+        depth = np.full(self.n_nodes, -1, dtype=np.intp)
+        frontier = np.asarray(self.roots)
+        level = 0
+        while frontier.size:
+            depth[frontier] = level
+            level += 1
+            children = np.unique(np.concatenate([self.left[frontier], self.right[frontier]]))
+            frontier = children[depth[children] < 0]
+        return depth
+
+    def cap_depth(self, max_depth: int) -> "CompiledForest":
+        """
+        A copy whose trees stop at ``max_depth``.
+
+        Splits at that depth become leaves holding their own class
+        distribution, which is the sample-weighted mix of the leaves below.
+        """
+        cut = (self.node_depths() == max_depth) & ~np.isinf(self.threshold)
+        return self._with_leaves(cut)
+
+    def merge_leaves(self, tolerance: float) -> "CompiledForest":
+        """
+        A copy where splits whose two children are leaves with class
+        probabilities within ``tolerance`` of each other become one leaf,
+        repeated until no such split is left.
+        """
+        forest = self
+        while True:
+            is_leaf = np.isinf(forest.threshold)
+            split = ~is_leaf
+            left, right = forest.left, forest.right
+            mergeable = split & is_leaf[left] & is_leaf[right]
+            close = np.abs(forest.value[left] - forest.value[right]).max(axis=1) <= tolerance
+            cut = mergeable & close
+            if not cut.any():
+                return forest
+            forest = forest._with_leaves(cut)
+
+    def _with_leaves(self, cut: np.ndarray) -> "CompiledForest":
+        """A copy with the ``cut`` split nodes turned into leaves."""
+        nodes = np.flatnonzero(cut)
+        feature = np.array(self.feature)
+        threshold = np.array(self.threshold, dtype=np.float64)
+        left = np.array(self.left)
+        right = np.array(self.right)
+        feature[nodes] = 0
+        threshold[nodes] = np.inf
+        left[nodes] = nodes
+        right[nodes] = nodes
+        return self._pack(feature, threshold, left, right, self.value, self.roots)
+
+    def _pack(
+        self,
+        feature: np.ndarray,
+        threshold: np.ndarray,
+        left: np.ndarray,
+        right: np.ndarray,
+        value: np.ndarray,
+        roots: np.ndarray
+    ) -> "CompiledForest":
+        """
+        Copy out the nodes reachable from ``roots``, regrouped by split
+        feature with leaves last, as a forest with this one's settings.
+        """
+        n_nodes = len(feature)
+        keep = np.zeros(n_nodes, dtype=bool)
+        frontier = np.asarray(roots)
+        depth = -1
+        while frontier.size:
+            keep[frontier] = True
+            depth += 1
+            children = np.unique(np.concatenate([left[frontier], right[frontier]]))
+            # Leaves point at themselves, so walks end once only leaves remain
+            frontier = children[~keep[children]]
+
+        nodes = np.flatnonzero(keep)
+        is_leaf = np.isinf(threshold[nodes])
+        nodes = nodes[np.argsort(np.where(is_leaf, self.n_features, feature[nodes]), kind="stable")]
+        new_index = np.full(n_nodes, -1, dtype=np.intp)
+        new_index[nodes] = np.arange(len(nodes))
+        return CompiledForest(
+            feature=np.asarray(feature[nodes]),
+            threshold=np.asarray(threshold[nodes]),
+            left=new_index[left[nodes]],
+            right=new_index[right[nodes]],
+            value=np.asarray(value[nodes]),
+            roots=new_index[roots],
+            max_depth=depth,
+            classes=np.array(self.classes_),
+            n_features=self.n_features,
+            folded=self.folded
+        )
+
+    def fold_scaler(self, mean: np.ndarray, scale: np.ndarray) -> "CompiledForest":
+        """
+        A copy that takes raw inputs, with ``(x - mean) / scale`` folded in.
+
+        sklearn sends a row left when ``float32((x - mean) / scale) <= t``.
+        That test is monotone in ``x``, so it equals ``x <= T`` for the
+        largest float64 ``T`` that still passes it; each split's ``T`` is
+        found by bisection, which keeps every decision identical to
+        scaling first, including inputs that land exactly on a split.
+        """
+        if self.folded:
+            raise ValueError("Forest already has a scaler folded in")
+        scale = np.asarray(scale, dtype=np.float64)
+        if (scale <= 0).any():
+            raise ValueError("Scaler scales must be positive")
+        mean = np.asarray(mean, dtype=np.float64)
+
+        split = np.flatnonzero(~np.isinf(self.threshold))
+        t = np.asarray(self.threshold[split])
+        m = mean[self.feature[split]]
+        s = scale[self.feature[split]]
+
+        def goes_left(x):
+            return ((x - m) / s).astype(np.float32) <= t
+
+        # Bracket the boundary, then halve until lo and hi are adjacent floats
+        approx = t * s + m
+        step = np.abs(approx) * 1e-6 + 1e-6
+        lo, hi = approx - step, approx + step
+        while not goes_left(lo).all() or goes_left(hi).any():
+            step *= 16
+            lo = np.where(goes_left(lo), lo, approx - step)
+            hi = np.where(goes_left(hi), approx + step, hi)
+        while True:
+            mid = lo + (hi - lo) / 2
+            open_ = (mid > lo) & (mid < hi)
+            if not open_.any():
+                break
+            left = goes_left(mid)
+            lo = np.where(open_ & left, mid, lo)
+            hi = np.where(open_ & ~left, mid, hi)
+
+        threshold = np.array(self.threshold, dtype=np.float64)
+        threshold[split] = lo
+        return CompiledForest(
+            feature=np.array(self.feature),
+            threshold=threshold,
+            left=np.array(self.left),
+            right=np.array(self.right),
+            value=np.array(self.value),
+            roots=np.array(self.roots),
+            max_depth=self.max_depth,
+            classes=np.array(self.classes_),
+            n_features=self.n_features,
+            folded=True
+        )
+
+    def params(self) -> Dict:
+        """Scalar settings stored alongside the arrays in a model artifact."""
+        return {"max_depth": self.max_depth, "n_features": self.n_features, "folded": self.folded}
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        """The node arrays, by name; the evaluation tables are rebuilt from them."""
+        return {name: getattr(self, name) for name in self.ARRAYS}
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray], params: Dict) -> "CompiledForest":
+        """Rebuild a forest from to_arrays() output, using the node arrays as given."""
+        return cls(
+            feature=arrays["feature"],
+            threshold=arrays["threshold"],
+            left=arrays["left"],
+            right=arrays["right"],
+            value=arrays["value"],
+            roots=arrays["roots"],
+            max_depth=params["max_depth"],
+            classes=arrays["classes_"],
+            n_features=params["n_features"],
+            folded=params["folded"]
+        )
+
+    @property
+    def nbytes(self) -> int:
+        """Total size of the node arrays and evaluation tables."""
+        return sum(getattr(self, name).nbytes for name in self.ARRAYS + self.TABLES)
+
+    @property
+    def mapped_nbytes(self) -> int:
+        """Size of the node arrays memory-mapped from a model artifact."""
+        if not self.is_mapped:
+            return 0
+        return sum(getattr(self, name).nbytes for name in self.ARRAYS)
+
+    @property
+    def is_mapped(self) -> bool:
+        """Whether the node arrays are memory-mapped from a model artifact."""
+        return isinstance(self.threshold, np.memmap)
+
+    def apply(self, X: np.ndarray) -> np.ndarray:
+        """Return the (n, n_trees) leaf node index each row reaches in each tree."""
+        if self.folded:
+            X = np.asarray(X, dtype=np.float64)
+        else:
+            # sklearn compares float32 inputs against float64 thresholds
+            X = np.asarray(X, dtype=np.float32).astype(np.float64)
+        if X.shape[0] * self.n_nodes <= self.DENSE_WORK_LIMIT:
+            return self._apply_dense(X)
+        return self._apply_levels(X)
+
+    def _apply_dense(self, X: np.ndarray) -> np.ndarray:
+        """Decide every split up front, then chase child pointers."""
+        n = X.shape[0]
+        X_ext = np.concatenate([X, np.zeros((n, 1))], axis=1)
+        go_right = np.repeat(X_ext, self._group_sizes, axis=1) > self.threshold
+
+        # Next node for every (row, node); int32 arithmetic is twice as fast,
+        # but gathers need native indices
+        successor = self._delta * go_right
+        successor += self._left32
+        row_offset = np.arange(n, dtype=np.intp)[:, None] * self.n_nodes
+        if n > 1:
+            successor += row_offset.astype(np.int32)
+        successor = successor.ravel().astype(np.intp)
+
+        node = (self.roots + row_offset).ravel()
+        for _ in range(self.max_depth):
+            node = successor[node]
+        return node.reshape(n, self.n_trees) - row_offset
+
+    def _apply_levels(self, X: np.ndarray) -> np.ndarray:
+        """Walk all trees for all rows together, one tree level per step."""
+        n = X.shape[0]
+        X_flat = X.ravel()
+        row_base = (np.arange(n, dtype=np.intp) * X.shape[1])[:, None]
+
+        node2 = np.repeat(2 * self.roots[None, :], n, axis=0)
+        feature = np.empty_like(node2)
+        values = np.empty(node2.shape)
+        threshold = np.empty(node2.shape)
+        go_right = np.empty(node2.shape, dtype=bool)
+        # Indices are valid by construction, so skip take's bounds checks
+        for _ in range(self.max_depth):
+            np.take(self._feature2, node2, out=feature, mode="clip")
+            feature += row_base
+            np.take(X_flat, feature, out=values, mode="clip")
+            np.take(self._threshold2, node2, out=threshold, mode="clip")
+            np.greater(values, threshold, out=go_right)
+            node2 += go_right
+            np.take(self._children2, node2, out=node2, mode="clip")
+        return node2 >> 1
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """Average the leaf class distributions of all trees."""
+        leaves = self.apply(X)
+        value = self.value.take(leaves.ravel(), axis=0).reshape(leaves.shape + (-1,))
+        return value.sum(axis=1) / self.n_trees
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """Predict class labels for X."""
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1))
@@ -0,0 +1,105 @@
+"""
+Compare batch request formats: bytes on the wire and server-side parse time.
+
+Usage:
+    python benchmarks/bench_batch_formats.py [--rows 10000]
+
+Formats:
+    rows      {"patients": [{...}, ...]} -> PatientData per row -> matrix
+    columnar  {"age": [...], ...}        -> matrix
+    binary    float32 (n, 13) matrix     -> matrix
+"""
+
+import argparse
+import json
+import sys
+import timeit
+import warnings
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from app.api.columnar import (  # noqa: E402
+    parse_binary_matrix,
+    parse_json_columns,
+    validate_feature_matrix,
+)
+from app.models.schemas import PatientData  # noqa: E402
+from app.services.prediction import FEATURE_NAMES, PredictionService  # noqa: E402
+
+
+# PatientData bounds for the continuous features
+VALID_RANGES = {
+    "age": (18, 100),
+    "trestbps": (90, 200),
+    "chol": (100, 600),
+    "thalach": (60, 220),
+    "oldpeak": (0, 6.2),
+}
+
+
+def load_cohort(n_rows: int) -> pd.DataFrame:
+    """Repeat data/raw/heart.csv up to n_rows, clipped to the API's valid ranges."""
+    data = pd.read_csv(ROOT / "data/raw/heart.csv")[FEATURE_NAMES]
+    for column, (low, high) in VALID_RANGES.items():
+        data[column] = data[column].clip(low, high)
+    repeats = -(-n_rows // len(data))
+    return pd.concat([data] * repeats, ignore_index=True).iloc[:n_rows]
+
+
+def records_column(records, name):
+    """One feature's values across all records."""
+    return [record[name] for record in records]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare batch request formats")
+    parser.add_argument("--rows", type=int, default=10000, help="Patients per request")
+    args = parser.parse_args()
+
+    warnings.simplefilter("ignore")
+    cohort = load_cohort(args.rows)
+    records = json.loads(cohort.to_json(orient="records"))
+    service = PredictionService()
+
+    rows_body = json.dumps({"patients": records}).encode()
+    columns = {name: records_column(records, name) for name in FEATURE_NAMES}
+    columnar_body = json.dumps(columns).encode()
+    binary_body = cohort.to_numpy(dtype="<f4").tobytes()
+    shape = f"{len(cohort)},{len(FEATURE_NAMES)}"
+
+    def parse_rows():
+        patients = [PatientData(**p) for p in json.loads(rows_body)["patients"]]
+        return service.to_matrix(patients)
+
+    def parse_columnar():
+        X = parse_json_columns(columnar_body)
+        validate_feature_matrix(X)
+        return X
+
+    def parse_binary():
+        X = parse_binary_matrix(binary_body, shape)
+        validate_feature_matrix(X)
+        return X
+
+    reference = parse_rows()
+    print(f"{args.rows} rows per request")
+    print(f"{'format':<10} {'bytes':>12} {'parse':>10} {'vs rows':>8}")
+    rows_time = None
+    for name, body, parse in [
+        ("rows", rows_body, parse_rows),
+        ("columnar", columnar_body, parse_columnar),
+        ("binary", binary_body, parse_binary),
+    ]:
+        assert np.allclose(parse(), reference)
+        seconds = min(timeit.repeat(parse, number=3, repeat=3)) / 3
+        rows_time = rows_time or seconds
+        print(f"{name:<10} {len(body):>12,} {seconds * 1e3:>8.1f}ms {rows_time / seconds:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Check the model_type=auto cascade against forest-only scoring.
+
+Usage:
+    python benchmarks/bench_cascade.py [--cohort data/raw/heart.csv]
+
+For a grid of fast-stage sizes and margins, reports the share of rows
+escalated to the full forest, agreement of predicted class and risk level
+with the full forest, the largest probability difference, and single-row
+latency of the cascade versus the full forest.
+"""
+
+import argparse
+import sys
+import timeit
+import warnings
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from app.services.cascade import CascadeService  # noqa: E402
+from app.services.prediction import (  # noqa: E402
+    FEATURE_NAMES,
+    PredictionService,
+    risk_level_codes,
+)
+
+FAST_TREES = [8, 16, 32]
+MARGINS = [0.05, 0.1, 0.15, 0.2]
+
+
+def time_per_row(predict, X: np.ndarray, repeat: int = 200) -> float:
+    """Best-of-5 mean seconds per single-row call, cycling through the cohort."""
+    rows = [X[i:i + 1] for i in range(min(repeat, len(X)))]
+    run = lambda: [predict(row) for row in rows]  # noqa: E731
+    return min(timeit.repeat(run, number=1, repeat=5)) / len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--cohort", type=Path, default=ROOT / "data/raw/heart.csv")
+    args = parser.parse_args()
+
+    warnings.simplefilter("ignore")
+    forest = PredictionService()
+    forest.cache = None
+    X = pd.read_csv(args.cohort)[FEATURE_NAMES].to_numpy(dtype=float)
+    full_predictions, full_probabilities = forest.predict_matrix(X)
+    full_levels = risk_level_codes(full_probabilities)
+    forest_s = time_per_row(forest.predict_matrix, X)
+
+    print(f"{len(X)} rows from {args.cohort.name}; full forest {forest_s * 1e6:.1f}us/row")
+    print(
+        f"{'trees':>5} {'margin':>6} {'escalated':>9} {'class':>8} {'risk':>8} "
+        f"{'max diff':>8} {'us/row':>7} {'speedup':>7}"
+    )
+    for fast_trees in FAST_TREES:
+        for margin in MARGINS:
+            cascade = CascadeService(forest, fast_trees=fast_trees, margin=margin)
+            predictions, probabilities = cascade.predict_matrix(X)
+            fast = cascade.compiled_model.predict_proba(X)[:, 1]
+            escalated = cascade.near_boundary(fast).mean()
+            cascade_s = time_per_row(cascade.predict_matrix, X)
+            print(
+                f"{fast_trees:>5} {margin:>6.2f} {escalated:>8.1%} "
+                f"{(predictions == full_predictions).mean():>7.2%} "
+                f"{(risk_level_codes(probabilities) == full_levels).mean():>7.2%} "
+                f"{np.abs(probabilities - full_probabilities).max():>8.3f} "
+                f"{cascade_s * 1e6:>7.1f} {forest_s / cascade_s:>6.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
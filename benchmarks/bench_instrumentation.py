@@ -0,0 +1,59 @@
+"""
+Measure the overhead of per-stage inference instrumentation.
+
+Usage:
+    python benchmarks/bench_instrumentation.py [--repeat 2000]
+
+Times PredictionService.predict_batch (cache off, so every call scores)
+with INFERENCE_METRICS_ENABLED on and off, for a single patient and for
+a 256-patient batch.
+"""
+
+import argparse
+import sys
+import timeit
+import warnings
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from app.core.config import get_settings  # noqa: E402
+from app.core.metrics import get_instrumentation  # noqa: E402
+from app.models.schemas import PatientData  # noqa: E402
+from app.services.prediction import FEATURE_NAMES, PredictionService  # noqa: E402
+from app.services.reload import canary_matrix  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure instrumentation overhead")
+    parser.add_argument("--repeat", type=int, default=2000, help="Calls per single-row timing")
+    args = parser.parse_args()
+
+    warnings.simplefilter("ignore")
+    get_settings().PREDICTION_CACHE_ENABLED = False
+    service = PredictionService()
+    patients = [
+        PatientData(**dict(zip(FEATURE_NAMES, row.tolist())))
+        for row in canary_matrix(256)
+    ]
+    instrumentation = get_instrumentation()
+
+    print(f"{'batch':>6} {'off':>10} {'on':>10} {'overhead':>10}")
+    for batch, number in [(patients[:1], args.repeat), (patients, max(1, args.repeat // 20))]:
+        timings = {False: float("inf"), True: float("inf")}
+        # Alternate on and off so drift in machine load affects both alike
+        for _ in range(9):
+            for enabled in (False, True):
+                instrumentation.enabled = enabled
+                seconds = timeit.timeit(lambda: service.predict_batch(batch), number=number)
+                timings[enabled] = min(timings[enabled], seconds / number)
+        overhead = timings[True] - timings[False]
+        print(
+            f"{len(batch):>6} {timings[False] * 1e6:>8.1f}us {timings[True] * 1e6:>8.1f}us "
+            f"{overhead * 1e6:>6.1f}us ({overhead / timings[False]:+.1%})"
+        )
+
+
+if __name__ == "__main__":
+    main()
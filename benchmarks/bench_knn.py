@@ -0,0 +1,71 @@
+"""
+Benchmark the compiled KNN evaluator against sklearn's kneighbors.
+
+Usage:
+    python benchmarks/bench_knn.py [--repeat 200]
+
+Reports per-call latency of the neighbor search for batch sizes from 1 to
+100k rows using the shipped KNN model, for sklearn and for the compiled
+evaluator with brute-force (BLAS) and KDTree search. Query rows are drawn
+from data/raw/heart.csv and scaled like API inputs.
+"""
+
+import argparse
+import sys
+import timeit
+import warnings
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from app.core.config import get_settings  # noqa: E402
+from app.services.neighbors import CompiledKNN  # noqa: E402
+from app.services.prediction import FEATURE_NAMES  # noqa: E402
+
+BATCH_SIZES = [1, 10, 100, 1000, 10000, 100000]
+
+
+def time_call(func, repeat: int) -> float:
+    """Best-of-5 mean seconds per call."""
+    number = max(1, repeat)
+    return min(timeit.repeat(func, number=number, repeat=5)) / number
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=200, help="Calls per timing run at batch size 1")
+    args = parser.parse_args()
+
+    warnings.simplefilter("ignore")
+    settings = get_settings()
+    knn = joblib.load(ROOT / settings.KNN_MODEL_PATH)
+    scaler = joblib.load(ROOT / settings.KNN_SCALER_PATH)
+    brute = CompiledKNN.from_sklearn(knn, index="brute")
+    kd_tree = CompiledKNN.from_sklearn(knn, index="kd_tree")
+
+    cohort = pd.read_csv(ROOT / "data/raw/heart.csv")[FEATURE_NAMES].to_numpy(dtype=float)
+    rng = np.random.default_rng(0)
+    queries = scaler.transform(cohort[rng.integers(len(cohort), size=max(BATCH_SIZES))])
+
+    print(f"training rows: {len(brute.train)}, k={brute.n_neighbors}")
+    print(f"{'rows':>7} {'sklearn':>12} {'brute':>12} {'kd_tree':>12} {'speedup':>8}")
+    for n_rows in BATCH_SIZES:
+        X = queries[:n_rows]
+        assert np.array_equal(brute.predict_proba(X), knn.predict_proba(X))
+        repeat = max(1, args.repeat // n_rows)
+        sklearn_s = time_call(lambda: knn.kneighbors(X), repeat)
+        brute_s = time_call(lambda: brute.kneighbors(X), repeat)
+        tree_s = time_call(lambda: kd_tree.kneighbors(X), repeat)
+        print(
+            f"{n_rows:>7} {sklearn_s * 1e6:>10.1f}us {brute_s * 1e6:>10.1f}us "
+            f"{tree_s * 1e6:>10.1f}us {sklearn_s / min(brute_s, tree_s):>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
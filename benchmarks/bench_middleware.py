@@ -0,0 +1,119 @@
+"""
+Compare request logging/metrics middleware: BaseHTTPMiddleware vs pure ASGI.
+
+Usage:
+    python benchmarks/bench_middleware.py [--requests 5000]
+
+Drives a small FastAPI app in-process (no server or sockets), so the
+numbers isolate the middleware's per-request cost. Routes:
+    /ping      a small JSON response
+    /stream    a 64-chunk streaming response
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+import warnings
+from pathlib import Path
+
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from app.core.metrics import REQUEST_COUNT, REQUEST_DURATION  # noqa: E402
+from app.core.middleware import RequestMetricsMiddleware  # noqa: E402
+
+
+def build_app(middleware: str) -> FastAPI:
+    """The benchmark app with the given middleware ("none", "base" or "asgi")."""
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping():
+        return {"status": "ok"}
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            for _ in range(64):
+                yield b"x" * 1024
+        return StreamingResponse(chunks())
+
+    if middleware == "asgi":
+        app.add_middleware(RequestMetricsMiddleware)
+    elif middleware == "base":
+        # The previous app/main.py middleware
+        @app.middleware("http")
+        async def log_requests(request: Request, call_next):
+            start_time = time.time()
+            response = await call_next(request)
+            duration = time.time() - start_time
+            REQUEST_COUNT.labels(
+                method=request.method, endpoint=request.url.path, status=response.status_code
+            ).inc()
+            REQUEST_DURATION.labels(
+                method=request.method, endpoint=request.url.path
+            ).observe(duration)
+            return response
+    return app
+
+
+async def request(app: FastAPI, path: str):
+    """Send one GET through the ASGI app and drain the response."""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": path, "raw_path": path.encode(),
+        "query_string": b"", "root_path": "", "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 50000), "server": ("bench", 80)
+    }
+    sent = False
+
+    async def receive():
+        nonlocal sent
+        if sent:
+            # Only reached by disconnect listeners once the response is done
+            await asyncio.sleep(3600)
+        sent = True
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    await app(scope, receive, send)
+
+
+async def throughput(app: FastAPI, path: str, n_requests: int) -> float:
+    """Sequential requests per second."""
+    for _ in range(100):
+        await request(app, path)
+    start = time.perf_counter()
+    for _ in range(n_requests):
+        await request(app, path)
+    return n_requests / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare request middleware throughput")
+    parser.add_argument("--requests", type=int, default=5000, help="Requests per measurement")
+    args = parser.parse_args()
+
+    warnings.simplefilter("ignore")
+    apps = {name: build_app(name) for name in ("none", "base", "asgi")}
+
+    print(f"{'route':<8} {'no middleware':>14} {'BaseHTTP':>10} {'pure ASGI':>10} {'speedup':>8}")
+    for path in ("/ping", "/stream"):
+        rates = {
+            name: max(asyncio.run(throughput(app, path, args.requests)) for _ in range(3))
+            for name, app in apps.items()
+        }
+        print(
+            f"{path:<8} {rates['none']:>10,.0f}/s {rates['base']:>8,.0f}/s "
+            f"{rates['asgi']:>8,.0f}/s {rates['asgi'] / rates['base']:>7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
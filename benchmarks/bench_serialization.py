@@ -0,0 +1,71 @@
+"""
+Compare /predict/batch response serialization from the model's output arrays.
+
+Usage:
+    python benchmarks/bench_serialization.py [--rows 10000]
+
+Paths:
+    dicts    format_results, a timestamp per row, then FastAPI's
+             jsonable_encoder and JSONResponse
+    direct   PredictionJSONResponse.batch: arrays straight to JSON bytes
+"""
+
+import argparse
+import json
+import sys
+import timeit
+import warnings
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from app.api.serialization import PredictionJSONResponse  # noqa: E402
+from app.services.prediction import PredictionService  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare prediction response serialization")
+    parser.add_argument("--rows", type=int, default=10000, help="Patients per response")
+    args = parser.parse_args()
+
+    warnings.simplefilter("ignore")
+    rng = np.random.default_rng(0)
+    probabilities = rng.uniform(0, 1, args.rows)
+    predictions = (probabilities >= 0.5).astype(np.int64)
+    service = PredictionService()
+
+    def dicts():
+        results = service.format_results(predictions, probabilities)
+        for result in results:
+            result["timestamp"] = datetime.utcnow().isoformat() + "Z"
+        content = {"predictions": results, "count": len(results), "model_used": "random_forest"}
+        return JSONResponse(content=jsonable_encoder(content)).body
+
+    def direct():
+        return PredictionJSONResponse.batch(predictions, probabilities, "random_forest").body
+
+    reference = json.loads(dicts())
+    for row in reference["predictions"]:
+        del row["timestamp"]
+    result = json.loads(direct())
+    for row in result["predictions"]:
+        del row["timestamp"]
+    assert result == reference
+
+    print(f"{args.rows} rows per response")
+    print(f"{'path':<8} {'bytes':>12} {'serialize':>10} {'speedup':>8}")
+    baseline = None
+    for name, serialize in [("dicts", dicts), ("direct", direct)]:
+        seconds = min(timeit.repeat(serialize, number=5, repeat=5)) / 5
+        baseline = baseline or seconds
+        print(f"{name:<8} {len(serialize()):>12,} {seconds * 1e3:>8.2f}ms {baseline / seconds:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Benchmark the compiled tree-ensemble evaluator against sklearn.
+
+Usage:
+    python benchmarks/bench_tree_ensemble.py [--repeat 200]
+
+Reports per-call latency of predict_proba for a range of batch sizes using
+the shipped Random Forest model.
+"""
+
+import argparse
+import sys
+import timeit
+import warnings
+from pathlib import Path
+
+import joblib
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from app.core.config import get_settings  # noqa: E402
+from app.services.tree_ensemble import CompiledForest  # noqa: E402
+
+BATCH_SIZES = [1, 10, 100, 1000, 10000]
+
+
+def time_call(func, repeat: int) -> float:
+    """Best-of-5 mean seconds per call."""
+    number = max(1, repeat)
+    return min(timeit.repeat(func, number=number, repeat=5)) / number
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=200, help="Calls per timing run at batch size 1")
+    args = parser.parse_args()
+
+    warnings.simplefilter("ignore")
+    settings = get_settings()
+    forest = joblib.load(ROOT / settings.FOREST_MODEL_PATH)
+    compiled = CompiledForest.from_sklearn(forest)
+    rng = np.random.default_rng(0)
+
+    print(f"{'rows':>6} {'sklearn':>12} {'compiled':>12} {'speedup':>8}")
+    for n_rows in BATCH_SIZES:
+        X = rng.normal(size=(n_rows, forest.n_features_in_))
+        assert np.allclose(compiled.predict_proba(X), forest.predict_proba(X))
+        repeat = max(1, args.repeat // n_rows)
+        sklearn_s = time_call(lambda: forest.predict_proba(X), max(1, repeat // 10))
+        compiled_s = time_call(lambda: compiled.predict_proba(X), repeat)
+        print(
+            f"{n_rows:>6} {sklearn_s * 1e6:>10.1f}us {compiled_s * 1e6:>10.1f}us "
+            f"{sklearn_s / compiled_s:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
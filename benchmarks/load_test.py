@@ -0,0 +1,348 @@
+"""
+Replay or synthesize prediction traffic and report throughput and latency percentiles.
+
+Usage:
+    # Write a synthetic trace: 5000 requests, 10% of them 50-patient batches
+    python benchmarks/load_test.py synthesize trace.jsonl --requests 5000 --batch-share 0.1
+
+    # Replay it against the app in-process at 200 requests/s (open loop)
+    python benchmarks/load_test.py run trace.jsonl --rate 200 --output report.json
+
+    # ... or against a running server, closed loop with 32 concurrent clients
+    python benchmarks/load_test.py run trace.jsonl --url http://127.0.0.1:8000 --concurrency 32
+
+    # Compare two reports (e.g. INFERENCE_POOL_MODE=thread vs process)
+    python benchmarks/load_test.py compare before.json after.json
+
+Trace format: one JSON object per line, e.g.
+    {"method": "POST", "path": "/api/v1/predict", "body": {...}, "at": 0.25}
+``at`` (seconds from the start) is optional; with --timing trace requests
+are sent at those offsets.
+
+Arrivals: with --rate, requests are sent on a Poisson schedule whatever the
+responses do (open loop), and latency is measured from the scheduled send
+time, so a stalled server shows up as queueing delay. Without it,
+--concurrency clients each send the next request when the previous one
+completes (closed loop). --timing trace replays the recorded offsets.
+
+In-process runs drive the ASGI app on this event loop (no sockets), so the
+load generator's own work shares the CPU with the app; use --url with
+uvicorn for numbers that carry over to a pod. httpx's per-request log
+lines are muted either way, as in-process they would go through the app's
+log queue; the app's own request logs are kept, as a server writes them.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import sys
+import time
+import warnings
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from app.core.config import get_settings  # noqa: E402
+from app.models.schemas import feature_constraints  # noqa: E402
+from app.services.prediction import FEATURE_NAMES  # noqa: E402
+
+settings = get_settings()
+
+PERCENTILES = (50, 95, 99, 99.9)
+SINGLE_PATH = "/api/v1/predict"
+BATCH_PATH = "/api/v1/predict/batch"
+DEFAULT_DATA = ROOT / "data/raw/heart.csv"
+# Rows read from --data; a trace draws from these with replacement
+MAX_PATIENTS = 100_000
+
+
+def load_patients(path: Path = DEFAULT_DATA) -> List[Dict]:
+    """Rows of a patient CSV as valid request bodies (clipped to the API's bounds)."""
+    data = pd.read_csv(path, nrows=MAX_PATIENTS)[FEATURE_NAMES]
+    patients = []
+    constraints = feature_constraints(FEATURE_NAMES)
+    for name, constraint in constraints.items():
+        if constraint["allowed"] is not None:
+            data = data[data[name].isin(constraint["allowed"])]
+        else:
+            data[name] = data[name].clip(constraint["ge"], constraint["le"])
+    for row in data.itertuples(index=False):
+        patients.append({
+            name: int(value) if constraints[name]["integer"] else float(value)
+            for name, value in zip(FEATURE_NAMES, row)
+        })
+    return patients
+
+
+def synthesize(
+    n_requests: int,
+    batch_share: float,
+    batch_size: int,
+    rate: float,
+    seed: int = 0,
+    data: Path = DEFAULT_DATA
+) -> List[Dict]:
+    """A mixed single/batch trace with Poisson arrival offsets at ``rate`` requests/s."""
+    rng = np.random.default_rng(seed)
+    patients = load_patients(data)
+    offsets = np.cumsum(rng.exponential(1 / rate, n_requests))
+    trace = []
+    for at in offsets.tolist():
+        if rng.random() < batch_share:
+            rows = rng.integers(0, len(patients), batch_size)
+            body = {"patients": [patients[i] for i in rows.tolist()]}
+            trace.append({"method": "POST", "path": BATCH_PATH, "body": body, "at": round(at, 6)})
+        else:
+            body = patients[int(rng.integers(0, len(patients)))]
+            trace.append({"method": "POST", "path": SINGLE_PATH, "body": body, "at": round(at, 6)})
+    return trace
+
+
+def read_trace(path: Path) -> List[Dict]:
+    """Load a JSONL trace, skipping blank lines."""
+    with open(path) as handle:
+        return [json.loads(line) for line in handle if line.strip()]
+
+
+def kind_of(entry: Dict) -> str:
+    """Report bucket of a trace entry: single, batch or the path itself."""
+    if entry["path"].split("?")[0] == SINGLE_PATH:
+        return "single"
+    if entry["path"].split("?")[0] == BATCH_PATH:
+        return "batch"
+    return entry["path"]
+
+
+class Recorder:
+    """Latency, status and row counts per request kind."""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {}
+        self.statuses: Dict[str, Dict[str, int]] = {}
+        self.rows: Dict[str, int] = {}
+
+    def record(self, kind: str, latency: float, status: str, rows: int):
+        self.latencies.setdefault(kind, []).append(latency)
+        counts = self.statuses.setdefault(kind, {})
+        counts[status] = counts.get(status, 0) + 1
+        self.rows[kind] = self.rows.get(kind, 0) + rows
+
+    def summary(self, elapsed: float) -> Dict:
+        """Throughput, error rate and latency percentiles per kind and overall."""
+        kinds = {kind: self._summarize([kind], elapsed) for kind in self.latencies}
+        return {"overall": self._summarize(list(self.latencies), elapsed), "by_kind": kinds}
+
+    def _summarize(self, kinds: List[str], elapsed: float) -> Dict:
+        latencies = np.concatenate([self.latencies[kind] for kind in kinds]) if kinds else np.empty(0)
+        statuses: Dict[str, int] = {}
+        for kind in kinds:
+            for status, count in self.statuses[kind].items():
+                statuses[status] = statuses.get(status, 0) + count
+        n = len(latencies)
+        errors = sum(count for status, count in statuses.items() if not status.startswith("2"))
+        summary = {
+            "requests": n,
+            "rows": sum(self.rows[kind] for kind in kinds),
+            "throughput_rps": round(n / elapsed, 2) if elapsed else 0.0,
+            "error_rate": round(errors / n, 5) if n else 0.0,
+            "statuses": dict(sorted(statuses.items())),
+        }
+        if n:
+            values = np.percentile(latencies, PERCENTILES) * 1e3
+            for percentile, value in zip(PERCENTILES, values.tolist()):
+                summary[f"p{percentile:g}_ms"] = round(value, 3)
+            summary["max_ms"] = round(float(latencies.max()) * 1e3, 3)
+        return summary
+
+
+async def send(client: httpx.AsyncClient, entry: Dict, recorder: Recorder, start: float, timeout: float):
+    """Send one trace entry; latency runs from ``start`` (the intended send time)."""
+    kind = kind_of(entry)
+    rows = len(entry["body"].get("patients", ())) if kind == "batch" else 1
+    try:
+        response = await client.request(
+            entry.get("method", "POST"), entry["path"], json=entry.get("body"), timeout=timeout
+        )
+        status = str(response.status_code)
+    except httpx.TimeoutException:
+        status = "timeout"
+    except httpx.HTTPError as e:
+        status = type(e).__name__
+    recorder.record(kind, time.perf_counter() - start, status, rows)
+
+
+async def run_open_loop(
+    client: httpx.AsyncClient, trace: List[Dict], offsets: np.ndarray, timeout: float
+) -> Recorder:
+    """Send each request at its offset, without waiting for earlier responses."""
+    recorder = Recorder()
+    tasks = []
+    origin = time.perf_counter()
+    for entry, offset in zip(trace, offsets.tolist()):
+        scheduled = origin + offset
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.ensure_future(send(client, entry, recorder, scheduled, timeout)))
+    await asyncio.gather(*tasks)
+    return recorder
+
+
+async def run_closed_loop(
+    client: httpx.AsyncClient, trace: List[Dict], concurrency: int, timeout: float
+) -> Recorder:
+    """``concurrency`` clients, each sending its next request when the last completes."""
+    recorder = Recorder()
+    entries = iter(trace)
+
+    async def worker():
+        for entry in entries:
+            await send(client, entry, recorder, time.perf_counter(), timeout)
+
+    await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+    return recorder
+
+
+async def run(args) -> Dict:
+    """Warm up, replay the trace and build the report."""
+    trace = read_trace(args.trace)
+    if args.limit:
+        trace = trace[:args.limit]
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, limits=httpx.Limits(max_connections=None))
+        target = args.url
+    else:
+        from app.main import app
+        from app.services.startup import get_startup_pipeline
+
+        # Lifespan does not run in-process; load and warm the models the same way
+        await get_startup_pipeline().run()
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://load-test")
+        target = "in-process"
+
+    # The client's INFO line per request is load generator work, not the app's
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    async with client:
+        for entry in trace[:args.warmup]:
+            await client.request(entry.get("method", "POST"), entry["path"], json=entry.get("body"))
+
+        if args.rate or args.timing == "trace":
+            if args.timing == "trace":
+                offsets = np.array([entry.get("at", 0.0) for entry in trace]) / args.speed
+                mode = f"open loop, trace timing x{args.speed}"
+            else:
+                rng = np.random.default_rng(args.seed)
+                offsets = np.cumsum(rng.exponential(1 / args.rate, len(trace)))
+                mode = f"open loop, {args.rate} req/s"
+            started = time.perf_counter()
+            recorder = await run_open_loop(client, trace, offsets, args.timeout)
+        else:
+            mode = f"closed loop, {args.concurrency} clients"
+            started = time.perf_counter()
+            recorder = await run_closed_loop(client, trace, args.concurrency, args.timeout)
+        elapsed = time.perf_counter() - started
+
+    report = {
+        "label": args.label or target,
+        "target": target,
+        "mode": mode,
+        "trace": str(args.trace),
+        "duration_s": round(elapsed, 3),
+        "environment": {"python": platform.python_version(), "machine": platform.machine()},
+        **recorder.summary(elapsed)
+    }
+    if target == "in-process":
+        report["settings"] = {
+            name: getattr(settings, name)
+            for name in (
+                "INFERENCE_POOL_MODE", "INFERENCE_POOL_SIZE", "MICRO_BATCH_ENABLED",
+                "MICRO_BATCH_MAX_WAIT_MS", "PREDICTION_CACHE_ENABLED", "FOREST_BACKEND"
+            )
+        }
+    return report
+
+
+def print_report(report: Dict):
+    """Human-readable summary of a report."""
+    print(f"{report['label']} ({report['mode']}), {report['duration_s']}s")
+    columns = ["requests", "throughput_rps", "error_rate"] + [f"p{p:g}_ms" for p in PERCENTILES]
+    print(f"{'kind':<10} " + " ".join(f"{column:>14}" for column in columns))
+    for kind, summary in [("overall", report["overall"]), *report["by_kind"].items()]:
+        print(f"{kind:<10} " + " ".join(f"{summary.get(column, '-'):>14}" for column in columns))
+    errors = {status: n for status, n in report["overall"]["statuses"].items() if not status.startswith("2")}
+    if errors:
+        print(f"errors: {errors}")
+
+
+def compare(before: Dict, after: Dict):
+    """Side-by-side overall metrics of two reports."""
+    columns = ["throughput_rps", "error_rate"] + [f"p{p:g}_ms" for p in PERCENTILES] + ["max_ms"]
+    print(f"{'metric':<16} {before['label'][:16]:>16} {after['label'][:16]:>16} {'change':>9}")
+    for column in columns:
+        old, new = before["overall"].get(column), after["overall"].get(column)
+        change = f"{new / old - 1:+.1%}" if old and new is not None else "-"
+        print(f"{column:<16} {str(old):>16} {str(new):>16} {change:>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay prediction traffic and report latency")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    make = commands.add_parser("synthesize", help="Write a trace built from patient rows")
+    make.add_argument("output", type=Path, help="Trace file to write (JSONL)")
+    make.add_argument("--requests", type=int, default=2000, help="Requests in the trace")
+    make.add_argument("--batch-share", type=float, default=0.1, help="Share of batch requests")
+    make.add_argument("--batch-size", type=int, default=50, help="Patients per batch request")
+    make.add_argument("--rate", type=float, default=100.0, help="Arrival rate for the 'at' offsets")
+    make.add_argument("--seed", type=int, default=0)
+    make.add_argument("--data", type=Path, default=DEFAULT_DATA,
+                      help="Patient CSV, e.g. from scripts/synthetic_data.py")
+
+    replay = commands.add_parser("run", help="Replay a trace and report")
+    replay.add_argument("trace", type=Path, help="Trace file (JSONL)")
+    replay.add_argument("--url", help="Server base URL; default drives the app in-process")
+    replay.add_argument("--rate", type=float, help="Open-loop Poisson arrival rate (requests/s)")
+    replay.add_argument("--timing", choices=["rate", "trace"], default="rate",
+                        help="'trace' replays the trace's own 'at' offsets")
+    replay.add_argument("--speed", type=float, default=1.0, help="Speed-up for --timing trace")
+    replay.add_argument("--concurrency", type=int, default=16, help="Closed-loop clients")
+    replay.add_argument("--limit", type=int, help="Only replay the first N requests")
+    replay.add_argument("--warmup", type=int, default=50, help="Unrecorded requests sent first")
+    replay.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout (s)")
+    replay.add_argument("--label", help="Name for this run in reports")
+    replay.add_argument("--output", type=Path, help="Write the report here (JSON)")
+    replay.add_argument("--seed", type=int, default=0)
+
+    diff = commands.add_parser("compare", help="Compare two reports")
+    diff.add_argument("before", type=Path)
+    diff.add_argument("after", type=Path)
+
+    args = parser.parse_args()
+    warnings.simplefilter("ignore")
+
+    if args.command == "synthesize":
+        trace = synthesize(args.requests, args.batch_share, args.batch_size, args.rate, args.seed, args.data)
+        with open(args.output, "w") as handle:
+            for entry in trace:
+                handle.write(json.dumps(entry) + "\n")
+        print(f"Wrote {len(trace)} requests to {args.output}")
+    elif args.command == "run":
+        settings.LOG_REQUEST_SAMPLE_RATE = 0.0
+        report = asyncio.run(run(args))
+        print_report(report)
+        if args.output:
+            args.output.write_text(json.dumps(report, indent=2) + "\n")
+    else:
+        compare(json.loads(args.before.read_text()), json.loads(args.after.read_text()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""
+Micro-benchmark suite for the prediction hot path, with baseline comparison.
+
+Usage:
+    python benchmarks/suite.py                       # run and compare with the baseline
+    python benchmarks/suite.py --output results.json # also save the results
+    python benchmarks/suite.py --update-baseline     # store this run as the baseline
+    python benchmarks/suite.py --filter predict_batch --threshold 0.5
+
+Cases:
+    validate_patient             PatientData from a request dict
+    preprocess_input             one patient to a scaled feature row
+    predict                      PredictionService.predict, one patient
+    predict_batch[N]             PredictionService.predict_batch, N = 1 ... 10k
+    endpoint_predict             POST /api/v1/predict through the ASGI app
+    endpoint_predict_batch[100]  POST /api/v1/predict/batch with 100 patients
+
+The prediction cache is disabled so every call scores. Endpoint calls go
+through an in-process httpx ASGI client (no sockets) with the configured
+micro-batching. Each case is timed in several rounds, and the fastest
+round's time per call is compared with the baseline. The exit status is 1
+when a case is slower than baseline by more than --threshold. Baselines
+only compare on the same machine; refresh with --update-baseline after an
+intended change.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import sys
+import time
+import warnings
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import httpx
+import numpy as np
+import sklearn
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from app.core.config import get_settings  # noqa: E402
+
+settings = get_settings()
+# Score every call, and keep per-request log lines out of the timings
+settings.PREDICTION_CACHE_ENABLED = False
+settings.LOG_REQUEST_SAMPLE_RATE = 0.0
+
+from app.main import app  # noqa: E402
+from app.models.schemas import PatientData  # noqa: E402
+from app.services.prediction import FEATURE_NAMES, PredictionService  # noqa: E402
+from app.services.reload import canary_matrix  # noqa: E402
+
+BASELINE_PATH = ROOT / "benchmarks" / "baseline.json"
+BATCH_SIZES = (1, 10, 100, 1000, 10000)
+
+
+def make_requests(n_rows: int) -> List[Dict]:
+    """Valid patient dicts, typed as a JSON client would send them."""
+    integer = {name for name, value in PatientData.model_fields.items() if value.annotation is not float}
+    return [
+        {name: int(value) if name in integer else float(value) for name, value in zip(FEATURE_NAMES, row)}
+        for row in canary_matrix(n_rows)
+    ]
+
+
+def time_call(func: Callable[[], object], rounds: int, min_seconds: float) -> Dict[str, float]:
+    """Seconds per call: calibrate a loop count, then time ``rounds`` loops."""
+    func()
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_seconds:
+            break
+        number *= 2 if elapsed == 0 else max(2, min(10, int(min_seconds / elapsed) + 1))
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        samples.append((time.perf_counter() - start) / number)
+    return {
+        "best_us": round(min(samples) * 1e6, 2),
+        "median_us": round(float(np.median(samples)) * 1e6, 2),
+        "calls": number
+    }
+
+
+def build_cases() -> Dict[str, Callable[[], object]]:
+    """Every benchmark case, keyed by name."""
+    service = PredictionService()
+    service.cache = None
+    requests = make_requests(max(BATCH_SIZES))
+    patients = [PatientData(**request) for request in requests]
+
+    cases: Dict[str, Callable[[], object]] = {
+        "validate_patient": lambda: PatientData(**requests[0]),
+        "preprocess_input": lambda: service.preprocess_input(patients[0]),
+        "predict": lambda: service.predict(patients[0]),
+    }
+    for n_rows in BATCH_SIZES:
+        cases[f"predict_batch[{n_rows}]"] = lambda n_rows=n_rows: service.predict_batch(patients[:n_rows])
+
+    loop = asyncio.new_event_loop()
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench")
+
+    def post(path: str, body: Dict) -> Callable[[], object]:
+        def call():
+            response = loop.run_until_complete(client.post(path, json=body))
+            if response.status_code != 200:
+                raise RuntimeError(f"{path} returned {response.status_code}: {response.text}")
+        return call
+
+    cases["endpoint_predict"] = post("/api/v1/predict", requests[0])
+    cases["endpoint_predict_batch[100]"] = post("/api/v1/predict/batch", {"patients": requests[:100]})
+    return cases
+
+
+def environment() -> Dict[str, str]:
+    """What the numbers were measured on."""
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "sklearn": sklearn.__version__,
+        "machine": platform.machine(),
+        "processor": platform.processor() or "unknown",
+        "cpus": str(os.cpu_count()),
+        "forest_backend": settings.FOREST_BACKEND,
+        "knn_backend": settings.KNN_BACKEND,
+        "micro_batch": str(settings.MICRO_BATCH_ENABLED),
+    }
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], threshold: float) -> List[str]:
+    """Print each case against the baseline; returns the cases that regressed."""
+    regressions = []
+    print(f"{'case':<30} {'best':>12} {'median':>12} {'baseline':>12} {'change':>8}")
+    for name, result in results.items():
+        reference: Optional[Dict] = baseline.get(name)
+        line = f"{name:<30} {result['best_us']:>10.1f}us {result['median_us']:>10.1f}us"
+        if reference is None:
+            print(f"{line} {'-':>12} {'new':>8}")
+            continue
+        change = result["best_us"] / reference["best_us"] - 1
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{line} {reference['best_us']:>10.1f}us {change:>+7.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the prediction hot path")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH, help="Baseline results file")
+    parser.add_argument("--output", type=Path, help="Write this run's results here (JSON)")
+    parser.add_argument("--update-baseline", action="store_true", help="Store this run as the baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed slowdown (0.25 = 25%%)")
+    parser.add_argument("--filter", default="", help="Only run cases whose name contains this")
+    parser.add_argument("--rounds", type=int, default=7, help="Timed rounds per case")
+    parser.add_argument("--min-seconds", type=float, default=0.1, help="Minimum duration of a round")
+    args = parser.parse_args()
+
+    warnings.simplefilter("ignore")
+    logging.getLogger().setLevel(logging.WARNING)
+    cases = {name: case for name, case in build_cases().items() if args.filter in name}
+    results = {name: time_call(case, args.rounds, args.min_seconds) for name, case in cases.items()}
+    report = {"environment": environment(), "results": results}
+
+    baseline = {}
+    if args.baseline.exists():
+        stored = json.loads(args.baseline.read_text())
+        baseline = stored["results"]
+        if stored["environment"] != report["environment"]:
+            print("Warning: baseline was measured in a different environment", file=sys.stderr)
+    regressions = compare(results, baseline, args.threshold)
+
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+    if args.update_baseline:
+        merged = dict(report, results=dict(baseline, **results))
+        args.baseline.write_text(json.dumps(merged, indent=2) + "\n")
+        print(f"Baseline written to {args.baseline}")
+    elif regressions:
+        print(f"{len(regressions)} case(s) slower than baseline by more than {args.threshold:.0%}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,330 @@
+"""
+Compress the serving forest to a latency, size or accuracy budget.
+
+Usage:
+    python scripts/compress_forest.py OUTPUT.artifact
+        [--forest models/heart_disease_model_forest.artifact]
+        [--max-latency-us 60] [--max-bytes 200000]
+        [--max-accuracy-loss 0.01] [--min-agreement 0.99]
+        [--distill] [--data data/raw/heart.csv] [--report compression.json]
+
+Candidates are built from the forest's compiled artifact:
+
+    trees     tree subsets of growing size, picked greedily so their average
+              stays closest to the full forest's probabilities
+    depth     trees cut at a maximum depth (splits become leaves)
+    merge     sibling leaves whose class probabilities are within a
+              tolerance merged into their parent
+    distill   (--distill) small forests trained on the full forest's own
+              probabilities (soft labels)
+
+Trees are picked and students trained on calibration rows, drawn by
+resampling each column of --data independently. Every candidate is scored
+on the --data rows themselves. The report has its accuracy on the file's
+labels (``label`` or ``target``), its agreement with the full forest on
+risk levels, the largest probability change, single-row latency (median,
+us), batch cost per row and artifact size.
+
+The chosen candidate meets every given budget. With a latency or size
+budget, the one closest to the full forest is chosen: most risk levels
+kept, then the smallest probability change, then accuracy, then size. With
+only accuracy budgets, the fastest one is chosen. Agreement comes first
+because labels can disagree with what the forest was trained on; the
+shipped forest learned the synthetic label rule, not heart.csv's
+``target``. The result is written as a standalone artifact, which
+PredictionService serves as it is: point FOREST_ARTIFACT_PATH at it. The
+hot reload's canary check still applies.
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+import warnings
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from app.core.config import get_settings  # noqa: E402
+from app.services.artifact import ScalerStatistics, export_compiled_forest, load_model  # noqa: E402
+from app.services.prediction import FEATURE_NAMES, risk_level_codes  # noqa: E402
+from app.services.tree_ensemble import CompiledForest  # noqa: E402
+
+settings = get_settings()
+
+TREE_COUNTS = (5, 10, 20, 30, 50, 75)
+DEPTH_CAPS = (None, 12, 10, 8, 6, 4)
+MERGE_TOLERANCES = (0.0, 0.05, 0.1, 0.2)
+STUDENT_TREES = (5, 10, 20)
+STUDENT_DEPTHS = (4, 6, 8)
+
+
+def load_evaluation(path: Path) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """Raw feature rows of a CSV and its labels (``label`` or ``target``), if any."""
+    data = pd.read_csv(path)
+    label_column = next((name for name in ("label", "target") if name in data.columns), None)
+    columns = FEATURE_NAMES + ([label_column] if label_column else [])
+    data = data[columns].apply(pd.to_numeric, errors="coerce").dropna()
+    labels = data[label_column].to_numpy(dtype=np.int64) if label_column else None
+    return data[FEATURE_NAMES].to_numpy(dtype=np.float64), labels
+
+
+def calibration_rows(X: np.ndarray, n_rows: int, seed: int = 0) -> np.ndarray:
+    """Rows whose columns are resampled independently from X, covering combinations X lacks."""
+    rng = np.random.default_rng(seed)
+    return np.column_stack([rng.choice(X[:, j], n_rows) for j in range(X.shape[1])])
+
+
+def tree_order(forest: CompiledForest, X: np.ndarray) -> np.ndarray:
+    """
+    Trees in greedy order: each next tree is the one that brings the
+    running average closest (squared error) to the full forest on X.
+    """
+    leaves = forest.apply(X)
+    # Positive-class probability of every tree on every row: (n_trees, n_rows)
+    per_tree = forest.value[leaves, 1].T
+    target = per_tree.mean(axis=0)
+    chosen: List[int] = []
+    remaining = np.ones(forest.n_trees, dtype=bool)
+    total = np.zeros(len(X))
+    for k in range(1, forest.n_trees + 1):
+        error = (((total + per_tree) / k - target) ** 2).sum(axis=1)
+        error[~remaining] = np.inf
+        best = int(np.argmin(error))
+        chosen.append(best)
+        remaining[best] = False
+        total += per_tree[best]
+    return np.array(chosen)
+
+
+def distill(
+    forest: CompiledForest,
+    mean: np.ndarray,
+    scale: np.ndarray,
+    X: np.ndarray,
+    n_trees: int,
+    max_depth: int
+) -> CompiledForest:
+    """
+    Train a small forest on the full forest's probabilities over X.
+
+    Each row is given twice, once per class, weighted by the teacher's
+    probability of that class, so the student's leaves estimate those
+    probabilities. It is trained on scaled rows like the teacher, and the
+    scaler is folded in afterwards.
+    """
+    from sklearn.ensemble import RandomForestClassifier
+
+    proba = forest.predict_proba(X)
+    X_scaled = (X - mean) / scale
+    student = RandomForestClassifier(
+        n_estimators=n_trees, max_depth=max_depth, random_state=0, n_jobs=-1
+    )
+    student.fit(
+        np.vstack([X_scaled, X_scaled]),
+        np.concatenate([np.full(len(X), forest.classes_[0]), np.full(len(X), forest.classes_[1])]),
+        sample_weight=np.concatenate([proba[:, 0], proba[:, 1]])
+    )
+    return CompiledForest.from_sklearn(student).fold_scaler(mean, scale)
+
+
+def candidates(
+    forest: CompiledForest,
+    mean: np.ndarray,
+    scale: np.ndarray,
+    X_calibration: np.ndarray,
+    with_distill: bool
+) -> List[Tuple[Dict, CompiledForest]]:
+    """(description, forest) for every compressed variant, the original first."""
+    found = [({"method": "original", "trees": forest.n_trees}, forest)]
+    order = tree_order(forest, X_calibration)
+    counts = sorted({n for n in TREE_COUNTS if n < forest.n_trees} | {forest.n_trees})
+    for n_trees in counts:
+        subset = forest.select_trees(order[:n_trees])
+        for depth in DEPTH_CAPS:
+            if depth is not None and depth >= subset.max_depth:
+                continue
+            capped = subset if depth is None else subset.cap_depth(depth)
+            for tolerance in MERGE_TOLERANCES:
+                if depth is None and n_trees == forest.n_trees and tolerance == 0:
+                    continue
+                merged = capped.merge_leaves(tolerance) if tolerance else capped
+                if tolerance and merged.n_nodes == capped.n_nodes:
+                    # Nothing merged (e.g. pure leaves); same as the tolerance-0 candidate
+                    continue
+                found.append((
+                    {
+                        "method": "prune", "trees": n_trees, "max_depth": depth,
+                        "merge_tolerance": tolerance
+                    },
+                    merged
+                ))
+    if with_distill:
+        for n_trees in STUDENT_TREES:
+            for depth in STUDENT_DEPTHS:
+                student = distill(forest, mean, scale, X_calibration, n_trees, depth)
+                found.append(({"method": "distill", "trees": n_trees, "max_depth": depth}, student))
+    return found
+
+
+def measure(
+    compressed: CompiledForest,
+    reference: np.ndarray,
+    X: np.ndarray,
+    labels: Optional[np.ndarray],
+    artifact_bytes: int,
+    repeats: int = 200
+) -> Dict:
+    """Accuracy, agreement with the full forest, latency and size of one candidate."""
+    proba = compressed.predict_proba(X)[:, 1]
+    result = {
+        "n_nodes": compressed.n_nodes,
+        "depth": compressed.max_depth,
+        "agreement": round(
+            float((risk_level_codes(proba) == risk_level_codes(reference)).mean()), 4
+        ),
+        "max_probability_change": round(float(np.abs(proba - reference).max()), 4),
+        "accuracy": None if labels is None else round(float(((proba > 0.5) == labels).mean()), 4),
+        "artifact_bytes": artifact_bytes,
+    }
+    rows = X[np.arange(repeats) % len(X)]
+    for row in rows[:20]:
+        compressed.predict_proba(row[None, :])
+    timings = []
+    for row in rows:
+        start = time.perf_counter()
+        compressed.predict_proba(row[None, :])
+        timings.append(time.perf_counter() - start)
+    batch = X[np.arange(256) % len(X)]
+    start = time.perf_counter()
+    for _ in range(5):
+        compressed.predict_proba(batch)
+    result["latency_us"] = round(float(np.median(timings)) * 1e6, 2)
+    result["batch_us_per_row"] = round((time.perf_counter() - start) / (5 * len(batch)) * 1e6, 3)
+    return result
+
+
+def choose(
+    results: List[Dict],
+    max_latency_us: Optional[float] = None,
+    max_bytes: Optional[int] = None,
+    max_accuracy_loss: Optional[float] = None,
+    min_agreement: Optional[float] = None
+) -> Optional[int]:
+    """Index of the candidate to keep (see the module docstring), or None if none fits."""
+    baseline = results[0].get("accuracy")
+
+    def feasible(result: Dict) -> bool:
+        if max_latency_us is not None and result["latency_us"] > max_latency_us:
+            return False
+        if max_bytes is not None and result["artifact_bytes"] > max_bytes:
+            return False
+        if max_accuracy_loss is not None and baseline is not None:
+            if baseline - result["accuracy"] > max_accuracy_loss:
+                return False
+        return min_agreement is None or result["agreement"] >= min_agreement
+
+    eligible = [i for i, result in enumerate(results) if feasible(result)]
+    if not eligible:
+        return None
+    if max_latency_us is None and max_bytes is None:
+        return min(eligible, key=lambda i: (results[i]["latency_us"], results[i]["artifact_bytes"]))
+    return min(eligible, key=lambda i: (
+        -results[i]["agreement"],
+        results[i]["max_probability_change"],
+        -(results[i]["accuracy"] or 0),
+        results[i]["artifact_bytes"]
+    ))
+
+
+def compress(
+    forest_path: Path,
+    data_path: Path,
+    calibration_size: int = 20000,
+    with_distill: bool = False,
+    workdir: Optional[Path] = None
+) -> Tuple[List[Dict], List[CompiledForest], ScalerStatistics, Dict]:
+    """Build and measure every candidate; returns (results, forests, scaler, source manifest)."""
+    forest, scaler, manifest = load_model(forest_path, mmap_mode=None)
+    if manifest["kind"] != "random_forest":
+        raise SystemExit(f"{forest_path} holds a {manifest['kind']} model, not a forest")
+    X, labels = load_evaluation(data_path)
+    X_calibration = calibration_rows(X, calibration_size)
+    reference = forest.predict_proba(X)[:, 1]
+
+    results, forests = [], []
+    with tempfile.TemporaryDirectory(dir=workdir) as tmp:
+        found = candidates(forest, scaler.mean_, scaler.scale_, X_calibration, with_distill)
+        for description, compressed in found:
+            path = Path(tmp) / "candidate.artifact"
+            export_compiled_forest(compressed, scaler, path, FEATURE_NAMES)
+            description.update(measure(compressed, reference, X, labels, path.stat().st_size))
+            results.append(description)
+            forests.append(compressed)
+    return results, forests, scaler, manifest
+
+
+def print_results(results: List[Dict], chosen: Optional[int]):
+    """One line per candidate; the chosen one is marked with *."""
+    print(f"{'':2}{'method':<9} {'trees':>5} {'depth':>5} {'merge':>5} {'nodes':>7} "
+          f"{'accuracy':>8} {'agree':>6} {'max_dp':>6} {'us':>7} {'us/row':>7} {'kb':>7}")
+    for i, r in enumerate(results):
+        accuracy = "-" if r["accuracy"] is None else f"{r['accuracy']:.4f}"
+        merge = r.get("merge_tolerance")
+        print(
+            f"{'*' if i == chosen else '':2}{r['method']:<9} {r['trees']:>5} {r['depth']:>5} "
+            f"{'-' if merge is None else merge:>5} {r['n_nodes']:>7} {accuracy:>8} "
+            f"{r['agreement']:>6.3f} {r['max_probability_change']:>6.3f} "
+            f"{r['latency_us']:>7.1f} {r['batch_us_per_row']:>7.2f} "
+            f"{r['artifact_bytes'] / 1024:>7.1f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compress the serving forest to a budget")
+    parser.add_argument("output", type=Path, help="Artifact file to write")
+    parser.add_argument("--forest", type=Path, default=Path(settings.FOREST_ARTIFACT_PATH),
+                        help="Forest artifact to compress")
+    parser.add_argument("--data", type=Path, default=ROOT / "data/raw/heart.csv",
+                        help="Evaluation CSV")
+    parser.add_argument("--max-latency-us", type=float, help="Max single-row latency (median, us)")
+    parser.add_argument("--max-bytes", type=int, help="Max artifact size")
+    parser.add_argument("--max-accuracy-loss", type=float,
+                        help="Max accuracy drop on the data's labels")
+    parser.add_argument("--min-agreement", type=float,
+                        help="Min share of rows with the same risk level")
+    parser.add_argument("--distill", action="store_true", help="Also train small student forests")
+    parser.add_argument("--calibration-rows", type=int, default=20000,
+                        help="Rows for tree picking and distillation")
+    parser.add_argument("--report", type=Path, help="Write every candidate's results here (JSON)")
+    args = parser.parse_args()
+
+    warnings.simplefilter("ignore")
+    results, forests, scaler, manifest = compress(
+        args.forest, args.data, args.calibration_rows, args.distill
+    )
+    chosen = choose(
+        results, args.max_latency_us, args.max_bytes, args.max_accuracy_loss, args.min_agreement
+    )
+    print_results(results, chosen)
+    if args.report:
+        report = {"candidates": results, "chosen": chosen}
+        args.report.write_text(json.dumps(report, indent=2) + "\n")
+    if chosen is None:
+        raise SystemExit("No candidate meets the budget")
+
+    # The source's metadata (version, training accuracy) is kept; the
+    # compression results are added alongside
+    metadata = dict(manifest.get("metadata", {}), compression=results[chosen])
+    export_compiled_forest(forests[chosen], scaler, args.output, FEATURE_NAMES, metadata=metadata)
+    print(f"Wrote {args.output} ({results[chosen]['artifact_bytes']} bytes)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Export a trained model and its scaler as a pickle-free model artifact.
+
+Usage:
+    python scripts/export_model.py MODEL.joblib SCALER.joblib OUTPUT.artifact \
+        [--version 1.0.0] [--trained-date 2024-01-15] [--accuracy 0.85] [--if-stale]
+
+The artifact holds the compiled model with the scaler folded in, the
+feature order, the given metadata (shown by /model/info) and a checksum.
+It records a digest of the joblib files, so the service knows it is
+current and never needs to unpickle them; the service does not write
+artifacts itself. Metadata not given is kept from the artifact being
+replaced. With --if-stale, an artifact already exported from these files
+(or a standalone one, such as a compressed forest) is left as it is.
+"""
+
+import argparse
+import sys
+import warnings
+from pathlib import Path
+from typing import Optional, Sequence
+
+import joblib
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from app.services.artifact import export_model, file_digest, read_manifest  # noqa: E402
+from app.services.prediction import FEATURE_NAMES  # noqa: E402
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    parser = argparse.ArgumentParser(description="Export a model as a pickle-free artifact")
+    parser.add_argument("model", type=Path, help="Fitted forest or KNN (.joblib)")
+    parser.add_argument("scaler", type=Path, help="Fitted StandardScaler (.joblib)")
+    parser.add_argument("output", type=Path, help="Artifact file to write")
+    parser.add_argument("--version", help="Model version")
+    parser.add_argument("--trained-date", help="Training date (YYYY-MM-DD)")
+    parser.add_argument("--accuracy", type=float, help="Held-out accuracy")
+    parser.add_argument("--if-stale", action="store_true",
+                        help="Only export when the artifact was not exported from these files")
+    args = parser.parse_args(argv)
+
+    previous = read_manifest(args.output) or {}
+    digest = file_digest([args.model, args.scaler])
+    if args.if_stale and (previous.get("standalone") or previous.get("source_digest") == digest):
+        print(f"{args.output} is up to date")
+        return
+
+    warnings.simplefilter("ignore")
+    metadata = dict(previous.get("metadata", {}))
+    metadata.update(
+        (key, value)
+        for key, value in (
+            ("version", args.version),
+            ("trained_date", args.trained_date),
+            ("accuracy", args.accuracy)
+        )
+        if value is not None
+    )
+    checksum = export_model(
+        joblib.load(args.model),
+        joblib.load(args.scaler),
+        args.output,
+        FEATURE_NAMES,
+        source_digest=digest,
+        metadata=metadata
+    )
+    print(f"Wrote {args.output} (sha256 {checksum})")
+
+
+if __name__ == "__main__":
+    main()
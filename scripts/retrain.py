@@ -0,0 +1,288 @@
+"""
+Update the serving models with new labelled data, without refitting from scratch.
+
+Usage:
+    python scripts/retrain.py NEW.csv [MORE.csv ...] [--family random_forest knn]
+        [--chunk-size 50000] [--min-chunk-rows 25000] [--trees-per-chunk 10]
+        [--max-trees 200] [--max-reference-rows N] [--eval HOLDOUT.csv] [--version 1.1.0]
+
+The current models are read from the paths in the settings, updated with
+the new rows only, and written back (joblib model, scaler and artifact;
+a running service picks them up with its hot reload).
+
+    random_forest  Each chunk of new rows grows the forest by
+                   --trees-per-chunk trees fitted on that chunk only
+                   (a warm start); the existing trees are kept. Chunks
+                   under --min-chunk-rows (such as the end of a file) are
+                   merged into a neighbour first. Past --max-trees, the
+                   oldest trees are dropped.
+    knn            New rows are appended to the reference set. With
+                   --max-reference-rows, the oldest rows are dropped.
+
+New files are read in chunks of --chunk-size rows, so the work grows with
+the new data, not the history (the KNN still copies its reference set
+once per run). The scaler is not refitted: the trees and the stored KNN
+rows were built on its scale. When the feature distribution drifts,
+retrain from scratch with scripts/train.py. Without --version, the patch
+number of the current version is bumped.
+"""
+
+import argparse
+import sys
+import time
+import warnings
+from datetime import date
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import accuracy_score
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from app.services.artifact import read_manifest  # noqa: E402
+from app.services.prediction import FEATURE_NAMES  # noqa: E402
+from train import OUTPUT_PATHS, label_frame, load_labelled, save_model  # noqa: E402
+
+# Label rule for new data without a label column, as each model was trained
+DEFAULT_LABEL_RULES = {"random_forest": "forest", "knn": "knn"}
+
+
+def read_labelled_chunks(
+    paths: Sequence[Path], chunk_size: int, label_rule: str
+) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """Yield (raw features, labels) for up to chunk_size complete rows at a time."""
+    for path in paths:
+        for chunk in pd.read_csv(path, chunksize=chunk_size):
+            data, _ = label_frame(chunk, label_rule)
+            if len(data):
+                X = data[FEATURE_NAMES].to_numpy(dtype=np.float64)
+                yield X, data["label"].to_numpy(dtype=np.int64)
+
+
+def next_version(version: Optional[str]) -> str:
+    """The version with its patch number bumped (1.0.0 -> 1.0.1)."""
+    parts = (version or "").split(".")
+    if not all(part.isdigit() for part in parts):
+        raise ValueError(f"Cannot bump model version {version!r}; pass --version")
+    return ".".join(parts[:-1] + [str(int(parts[-1]) + 1)])
+
+
+def grow_forest(
+    forest, X: np.ndarray, y: np.ndarray, n_trees: int, max_trees: int, jobs: int = -1,
+    seed_key: Sequence[int] = ()
+):
+    """
+    A forest holding the trees of ``forest`` plus n_trees new trees fitted
+    on (X, y), with the oldest trees dropped beyond max_trees. X is scaled.
+    With a seeded forest, the new trees' seed is derived from its seed and
+    ``seed_key``, which must differ between updates.
+
+    This is a warm start done by hand: the new trees come from a fresh
+    forest with the same hyperparameters, so it also works for models
+    pickled by an older scikit-learn, whose warm-start state may not load.
+    """
+    params = {
+        name: getattr(forest, name)
+        for name in RandomForestClassifier().get_params()
+        if hasattr(forest, name)
+    }
+    if params.get("random_state") is not None:
+        # A different seed per update, so new trees do not repeat old ones
+        seeds = np.random.SeedSequence([params["random_state"], *seed_key])
+        params["random_state"] = int(seeds.generate_state(1)[0])
+    params.update(n_estimators=n_trees, n_jobs=jobs, warm_start=False)
+    grown = RandomForestClassifier(**params).fit(X, y)
+    if not np.array_equal(grown.classes_, forest.classes_):
+        raise ValueError("New trees must see every class of the forest")
+    # The oldest trees come first
+    grown.estimators_ = (list(forest.estimators_) + grown.estimators_)[-max_trees:]
+    grown.set_params(n_estimators=len(grown.estimators_), n_jobs=None)
+    return grown
+
+
+def append_reference(knn, X: np.ndarray, y: np.ndarray, max_rows: Optional[int] = None):
+    """Append scaled rows to a fitted KNN's reference set, keeping the newest max_rows."""
+    reference = np.vstack([knn._fit_X, X])
+    labels = np.concatenate([knn.classes_[knn._y], y])
+    if max_rows is not None and len(reference) > max_rows:
+        reference, labels = reference[-max_rows:], labels[-max_rows:]
+    return knn.fit(reference, labels)
+
+
+def _grow(forest, scaler, group, n_trees: int, max_trees: int, jobs: int, seed_key: Sequence[int]):
+    """grow_forest on the rows of a group of (raw features, labels) chunks."""
+    X = scaler.transform(np.vstack([features for features, _ in group]))
+    y = np.concatenate([labels for _, labels in group])
+    return grow_forest(forest, X, y, n_trees, max_trees, jobs, seed_key)
+
+
+def update_forest(
+    forest,
+    scaler,
+    chunks: Iterator[Tuple[np.ndarray, np.ndarray]],
+    trees_per_chunk: int,
+    max_trees: int,
+    jobs: int,
+    min_rows: int = 0,
+    update: int = 0
+):
+    """
+    Grow the forest chunk by chunk; returns the new forest and the rows used.
+
+    Every warm-started tree must see all of the forest's classes, and each
+    group of trees gets the same weight in the vote, so a chunk holding one
+    class or fewer than min_rows rows is merged with the next one. The
+    group is fitted once the following chunk is read, so a short last
+    chunk joins the group before it. ``update`` numbers this run, for the
+    seeds of the new trees.
+    """
+    def group_ready(group) -> bool:
+        labels = np.concatenate([y for _, y in group])
+        return len(labels) >= min_rows and np.isin(forest.classes_, labels).all()
+
+    ready: List[Tuple[np.ndarray, np.ndarray]] = []
+    pending: List[Tuple[np.ndarray, np.ndarray]] = []
+    rows = groups = 0
+    for X, y in chunks:
+        pending.append((X, y))
+        if not group_ready(pending):
+            continue
+        if ready:
+            forest = _grow(
+                forest, scaler, ready, trees_per_chunk, max_trees, jobs, (update, groups)
+            )
+            rows += sum(len(y) for _, y in ready)
+            groups += 1
+        ready, pending = pending, []
+    ready += pending
+    if ready and np.isin(forest.classes_, np.concatenate([y for _, y in ready])).all():
+        forest = _grow(forest, scaler, ready, trees_per_chunk, max_trees, jobs, (update, groups))
+        rows += sum(len(y) for _, y in ready)
+    elif ready:
+        skipped = sum(len(y) for _, y in ready)
+        print(f"Skipped the last {skipped} rows: they do not cover every class")
+    return forest, rows
+
+
+def update_knn(
+    knn, scaler, chunks: Iterator[Tuple[np.ndarray, np.ndarray]], max_rows: Optional[int]
+) -> int:
+    """Scale the new rows chunk by chunk and append them in one refit; returns the rows added."""
+    scaled, labels = [], []
+    for X, y in chunks:
+        scaled.append(scaler.transform(X))
+        labels.append(y)
+    if not scaled:
+        return 0
+    append_reference(knn, np.vstack(scaled), np.concatenate(labels), max_rows)
+    return sum(len(y) for y in labels)
+
+
+def retrain(
+    family: str,
+    paths: Sequence[Path],
+    chunk_size: int = 50_000,
+    min_chunk_rows: Optional[int] = None,
+    label_rule: Optional[str] = None,
+    trees_per_chunk: int = 10,
+    max_trees: int = 200,
+    max_reference_rows: Optional[int] = None,
+    eval_path: Optional[Path] = None,
+    version: Optional[str] = None,
+    jobs: int = -1
+) -> Dict:
+    """
+    Update one family's serving model with the rows in paths and save it; returns a summary.
+
+    Chunks under min_chunk_rows rows (default: half of chunk_size) are
+    merged into a neighbour before trees are fitted on them.
+    """
+    model_path, scaler_path, artifact_path = (ROOT / path for path in OUTPUT_PATHS[family])
+    start = time.perf_counter()
+    previous = (read_manifest(artifact_path) or {}).get("metadata", {})
+    updates = previous.get("incremental_updates", 0) + 1
+    # Checked before any work, so a missing version fails fast
+    version = version or next_version(previous.get("version"))
+    model = joblib.load(model_path)
+    scaler = joblib.load(scaler_path)
+    chunks = read_labelled_chunks(paths, chunk_size, label_rule or DEFAULT_LABEL_RULES[family])
+
+    if family == "random_forest":
+        if min_chunk_rows is None:
+            min_chunk_rows = chunk_size // 2
+        model, rows = update_forest(
+            model, scaler, chunks, trees_per_chunk, max_trees, jobs, min_chunk_rows, updates
+        )
+        size = {"trees": len(model.estimators_)}
+    else:
+        rows = update_knn(model, scaler, chunks, max_reference_rows)
+        size = {"reference_rows": int(len(model._fit_X))}
+
+    metadata = {
+        "version": version,
+        "trained_date": date.today().isoformat(),
+        "params": previous.get("params"),
+        "incremental_updates": updates,
+    }
+    if eval_path is not None:
+        holdout = load_labelled(eval_path, label_rule or DEFAULT_LABEL_RULES[family])
+        X_holdout = holdout[FEATURE_NAMES].to_numpy(dtype=np.float64)
+        predictions = model.predict(scaler.transform(X_holdout))
+        metadata["accuracy"] = round(float(accuracy_score(holdout["label"], predictions)), 4)
+    save_model(
+        family, model, scaler, {key: value for key, value in metadata.items() if value is not None}
+    )
+    return dict(
+        family=family, version=version, rows_added=rows,
+        seconds=round(time.perf_counter() - start, 2), accuracy=metadata.get("accuracy"), **size
+    )
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    parser = argparse.ArgumentParser(description="Update the serving models with new labelled data")
+    parser.add_argument("data", type=Path, nargs="+", help="New labelled CSV files")
+    parser.add_argument("--family", nargs="+", choices=list(OUTPUT_PATHS),
+                        default=list(OUTPUT_PATHS), help="Models to update")
+    parser.add_argument("--chunk-size", type=int, default=50_000,
+                        help="Rows read (and trees grown) per chunk")
+    parser.add_argument("--min-chunk-rows", type=int,
+                        help="Smaller chunks are merged before growing trees "
+                             "(default: half of --chunk-size)")
+    parser.add_argument("--label-rule", choices=["forest", "knn"],
+                        help="Labels for data without a label column (default: the model's own)")
+    parser.add_argument("--trees-per-chunk", type=int, default=10, help="Trees added per chunk")
+    parser.add_argument("--max-trees", type=int, default=200,
+                        help="Forest size cap; oldest trees go first")
+    parser.add_argument("--max-reference-rows", type=int,
+                        help="KNN reference set cap; oldest rows go first")
+    parser.add_argument("--eval", type=Path, help="Labelled CSV to measure accuracy on")
+    parser.add_argument("--version", help="Model version (default: bump the current patch number)")
+    parser.add_argument("--jobs", type=int, default=-1, help="Parallel jobs for tree fitting")
+    args = parser.parse_args(argv)
+
+    warnings.simplefilter("ignore")
+    for family in args.family:
+        summary = retrain(
+            family,
+            args.data,
+            chunk_size=args.chunk_size,
+            min_chunk_rows=args.min_chunk_rows,
+            label_rule=args.label_rule,
+            trees_per_chunk=args.trees_per_chunk,
+            max_trees=args.max_trees,
+            max_reference_rows=args.max_reference_rows,
+            eval_path=args.eval,
+            version=args.version,
+            jobs=args.jobs
+        )
+        print(", ".join(f"{key}={value}" for key, value in summary.items()))
+
+
+if __name__ == "__main__":
+    main()
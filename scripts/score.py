@@ -0,0 +1,257 @@
+"""
+Score a CSV cohort offline with the serving model, using every core.
+
+Usage:
+    python scripts/score.py INPUT.csv OUTPUT.csv [--chunk-size 100000] [--workers N]
+
+The input needs the 13 feature columns (extra columns such as ``label`` or
+``target`` are ignored). It is read in chunks, chunks are scored in parallel
+worker processes, and results are written in input order as
+
+    row,prediction,probability,risk_level
+
+where ``row`` is the 0-based data row of the input. Rows with a missing or
+non-numeric feature get empty prediction fields.
+
+After every written chunk the progress is saved to ``OUTPUT.csv.ckpt``.
+If the run is interrupted, start the same command again to resume from
+the last complete chunk; pass ``--restart`` to start over instead. Run from
+the repository root so the model paths in the settings resolve.
+"""
+
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+import time
+import warnings
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Optional, TextIO, Tuple
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from app.services.prediction import (  # noqa: E402
+    FEATURE_NAMES,
+    RISK_LEVELS,
+    PredictionService,
+    risk_level_codes,
+)
+
+OUTPUT_COLUMNS = ["row", "prediction", "probability", "risk_level"]
+
+# Per worker process
+_service: Optional[PredictionService] = None
+
+
+def _init_worker():
+    """Load the model and scaler once per worker process."""
+    global _service
+    warnings.simplefilter("ignore")
+    _service = PredictionService()
+    if not _service.models_loaded:
+        raise RuntimeError("Model files not found; run from the repository root")
+    # Every row is scored once, so the result cache would only cost time
+    _service.cache = None
+
+
+def _score_chunk(X: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Score the complete rows of a feature matrix; returns (valid, predictions, probabilities)."""
+    valid = np.isfinite(X).all(axis=1)
+    predictions, probabilities = _service.predict_matrix(X[valid])
+    return valid, predictions, probabilities
+
+
+def render_chunk(
+    first_row: int,
+    valid: np.ndarray,
+    predictions: np.ndarray,
+    probabilities: np.ndarray
+) -> str:
+    """Format one scored chunk as CSV lines, with the API's rounding and risk bands."""
+    n = len(valid)
+    prediction = np.full(n, "", dtype=object)
+    probability = np.full(n, "", dtype=object)
+    risk_level = np.full(n, "", dtype=object)
+    prediction[valid] = predictions.astype(int).astype(str)
+    probability[valid] = np.char.mod("%.2f", np.round(probabilities, 2))
+    risk_level[valid] = RISK_LEVELS[risk_level_codes(probabilities)]
+    frame = pd.DataFrame({
+        "row": np.arange(first_row, first_row + n),
+        "prediction": prediction,
+        "probability": probability,
+        "risk_level": risk_level
+    })
+    return frame.to_csv(header=False, index=False)
+
+
+def load_checkpoint(path: Path, fingerprint: Dict) -> Optional[Dict]:
+    """Return the saved progress if it belongs to this input and chunk size."""
+    if not path.exists():
+        return None
+    state = json.loads(path.read_text())
+    if state.get("fingerprint") != fingerprint:
+        raise SystemExit(
+            f"{path} was written for a different input or chunk size; "
+            "pass --restart to start over"
+        )
+    return state
+
+
+def save_checkpoint(path: Path, state: Dict):
+    """Atomically replace the checkpoint file."""
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(state))
+    os.replace(tmp, path)
+
+
+def read_chunks(input_path: Path, chunk_size: int, skip_lines: int):
+    """
+    Yield (feature matrix, input lines consumed) for up to chunk_size lines
+    at a time, starting skip_lines lines after the header.
+
+    Blank lines are dropped, as pandas would, but still counted as
+    consumed, so progress saved in lines resumes at the right place.
+    """
+    with open(input_path, newline="") as handle:
+        header = handle.readline()
+        columns = [name.strip() for name in next(csv.reader([header]))]
+        missing = [name for name in FEATURE_NAMES if name not in columns]
+        if missing:
+            raise SystemExit(f"Input is missing feature columns: {', '.join(missing)}")
+        # Skip already scored lines one by one rather than through pandas,
+        # which would materialize the set of row numbers to skip
+        for _ in islice(handle, skip_lines):
+            pass
+
+        while True:
+            lines = list(islice(handle, chunk_size))
+            if not lines:
+                return
+            data = "".join(line for line in lines if line.strip())
+            if data:
+                chunk = pd.read_csv(
+                    io.StringIO(data), names=columns, header=None, usecols=FEATURE_NAMES
+                )
+                frame = chunk[FEATURE_NAMES].apply(pd.to_numeric, errors="coerce")
+                X = frame.to_numpy(dtype=np.float64)
+            else:
+                X = np.empty((0, len(FEATURE_NAMES)))
+            yield X, len(lines)
+
+
+def score_file(
+    input_path: Path,
+    output_path: Path,
+    chunk_size: int = 100000,
+    workers: int = 1,
+    restart: bool = False,
+    progress: Optional[TextIO] = sys.stderr
+) -> int:
+    """Score input_path into output_path; returns the number of rows written."""
+    checkpoint_path = output_path.with_name(output_path.name + ".ckpt")
+    stat = input_path.stat()
+    fingerprint = {
+        "input": str(input_path.resolve()),
+        "size": stat.st_size,
+        "mtime": stat.st_mtime,
+        "chunk_size": chunk_size
+    }
+    state = None if restart else load_checkpoint(checkpoint_path, fingerprint)
+
+    if state is None:
+        state = {"fingerprint": fingerprint, "rows": 0, "lines": 0, "output_bytes": 0}
+        output = open(output_path, "w", newline="")
+        output.write(",".join(OUTPUT_COLUMNS) + "\n")
+        output.flush()
+        state["output_bytes"] = output.tell()
+        save_checkpoint(checkpoint_path, state)
+    else:
+        # Drop anything written after the last checkpoint
+        output = open(output_path, "r+", newline="")
+        output.truncate(state["output_bytes"])
+        output.seek(state["output_bytes"])
+        if progress:
+            print(f"Resuming after {state['rows']:,} rows", file=progress)
+
+    start_rows = state["rows"]
+    # Rows are numbered without blank lines; input lines are counted with them
+    start_lines = state.get("lines", start_rows)
+    started = time.perf_counter()
+    # Bound the chunks held in memory: queued, in flight and awaiting writing
+    max_in_flight = 2 * workers
+    in_flight: "deque[Tuple[int, int, Future]]" = deque()
+    next_row, next_line = start_rows, start_lines
+
+    def write_next():
+        first_row, lines_end, future = in_flight.popleft()
+        valid, predictions, probabilities = future.result()
+        output.write(render_chunk(first_row, valid, predictions, probabilities))
+        output.flush()
+        os.fsync(output.fileno())
+        state["rows"] = first_row + len(valid)
+        state["lines"] = lines_end
+        state["output_bytes"] = output.tell()
+        save_checkpoint(checkpoint_path, state)
+        if progress:
+            done = state["rows"] - start_rows
+            elapsed = time.perf_counter() - started
+            print(
+                f"{state['rows']:,} rows scored ({done / elapsed:,.0f} rows/sec)",
+                file=progress
+            )
+
+    with output, ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        for X, n_lines in read_chunks(input_path, chunk_size, start_lines):
+            next_line += n_lines
+            in_flight.append((next_row, next_line, pool.submit(_score_chunk, X)))
+            next_row += len(X)
+            if len(in_flight) >= max_in_flight:
+                write_next()
+        while in_flight:
+            write_next()
+
+    if progress:
+        elapsed = time.perf_counter() - started
+        done = state["rows"] - start_rows
+        print(
+            f"Done: {state['rows']:,} rows in {output_path} "
+            f"({done:,} this run, {elapsed:.1f}s)",
+            file=progress
+        )
+    return state["rows"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score a CSV cohort with the serving model")
+    parser.add_argument("input", type=Path, help="CSV with the 13 feature columns")
+    parser.add_argument("output", type=Path, help="CSV to write predictions to")
+    parser.add_argument("--chunk-size", type=int, default=100000, help="Rows per chunk")
+    parser.add_argument(
+        "--workers", type=int, default=os.cpu_count() or 1, help="Scoring processes"
+    )
+    parser.add_argument(
+        "--restart", action="store_true", help="Ignore an existing checkpoint"
+    )
+    args = parser.parse_args()
+
+    warnings.simplefilter("ignore")
+    score_file(
+        args.input,
+        args.output,
+        chunk_size=max(1, args.chunk_size),
+        workers=max(1, args.workers),
+        restart=args.restart
+    )
+
+
+if __name__ == "__main__":
+    main()
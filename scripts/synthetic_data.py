@@ -0,0 +1,214 @@
+"""
+Generate synthetic heart-disease datasets, vectorized and in chunks.
+
+Usage:
+    python scripts/synthetic_data.py OUTPUT.csv [--rows 1000000] [--profile forest|knn]
+        [--seed 42] [--chunk-size 1000000]
+
+Writes the 13 feature columns and ``label`` with the distributions and
+labelling rules of the training scripts' ``generate_data``:
+
+    forest  banded, weighted age, trestbps, chol and thalach;
+            label = chol > 240 or thalach < 100
+    knn     uniform age, trestbps, chol and thalach;
+            label = chol > 240 or thalach < 100 or oldpeak > 2.5
+
+Each column is drawn for a whole chunk at once from a seeded NumPy
+generator, and the chunk is rendered to CSV bytes with table lookups, so
+memory depends on the chunk size only. The same seed and chunk size give
+the same file.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from app.services.prediction import FEATURE_NAMES  # noqa: E402
+
+COLUMNS = FEATURE_NAMES + ["label"]
+PROFILES = ("forest", "knn")
+
+# oldpeak is drawn as tenths (one decimal, like round(uniform(0, 6.2), 1))
+OLDPEAK_MAX = 6.2
+OLDPEAK_SCALE = 10
+
+
+def _bands(*bands: Tuple[int, int, int]) -> np.ndarray:
+    """
+    Sampling table for ``(start, stop, weight)`` integer bands.
+
+    Mirrors the ``random.choices`` populations the scripts built: bands are
+    ``range(start, stop)``, each value is repeated ``weight`` times, and a
+    value in two overlapping bands counts twice. A uniform index into the
+    table draws from the weighted distribution.
+    """
+    return np.concatenate(
+        [np.repeat(np.arange(start, stop), weight) for start, stop, weight in bands]
+    )
+
+
+def _uniform(low: int, high: int) -> np.ndarray:
+    """Every integer from low to high inclusive, equally likely."""
+    return np.arange(low, high + 1)
+
+
+_CATEGORICAL = {
+    "sex": _uniform(0, 1),
+    "cp": _uniform(0, 3),
+    "fbs": _uniform(0, 1),
+    "restecg": _uniform(0, 2),
+    "exang": _uniform(0, 1),
+    "slope": _uniform(0, 2),
+    "ca": _uniform(0, 4),
+    "thal": _uniform(0, 3),
+}
+
+DISTRIBUTIONS: Dict[str, Dict[str, np.ndarray]] = {
+    "forest": dict(
+        _CATEGORICAL,
+        age=_bands((18, 31, 1), (30, 76, 4), (76, 101, 2)),
+        trestbps=_bands((90, 101, 1), (100, 131, 3), (131, 141, 2), (141, 201, 2)),
+        chol=_bands((100, 201, 3), (201, 241, 2), (241, 401, 1)),
+        thalach=_bands((60, 101, 2), (100, 171, 3), (171, 221, 1)),
+    ),
+    "knn": dict(
+        _CATEGORICAL,
+        age=_uniform(18, 100),
+        trestbps=_uniform(90, 200),
+        chol=_uniform(100, 400),
+        thalach=_uniform(60, 220),
+    ),
+}
+
+
+def draw_columns(
+    n_rows: int, rng: np.random.Generator, profile: str = "forest"
+) -> Dict[str, np.ndarray]:
+    """
+    Draw n_rows samples as integer columns keyed by COLUMNS.
+
+    oldpeak is returned in tenths; divide by OLDPEAK_SCALE for the value.
+    """
+    if profile not in DISTRIBUTIONS:
+        raise ValueError(f"Unknown profile: {profile}")
+    distributions = DISTRIBUTIONS[profile]
+    columns = {}
+    for name in FEATURE_NAMES:
+        if name == "oldpeak":
+            tenths = rng.uniform(0, OLDPEAK_MAX, n_rows) * OLDPEAK_SCALE
+            columns[name] = np.rint(tenths).astype(np.int16)
+        else:
+            table = distributions[name]
+            draws = rng.integers(0, len(table), n_rows, dtype=np.int32)
+            columns[name] = table.take(draws).astype(np.int16)
+
+    label = (columns["chol"] > 240) | (columns["thalach"] < 100)
+    if profile == "knn":
+        label |= columns["oldpeak"] > 2.5 * OLDPEAK_SCALE
+    columns["label"] = label.astype(np.int16)
+    return columns
+
+
+def generate_frame(
+    n_rows: int, profile: str = "forest", seed: Optional[int] = None
+) -> pd.DataFrame:
+    """A synthetic dataset as a DataFrame, with the columns the training scripts expect."""
+    columns = draw_columns(n_rows, np.random.default_rng(seed), profile)
+    frame = pd.DataFrame(columns, columns=COLUMNS)
+    frame["oldpeak"] = frame["oldpeak"] / OLDPEAK_SCALE
+    return frame
+
+
+def _text_table(values: np.ndarray, decimals: int, separator: str) -> Tuple[np.ndarray, int]:
+    """
+    Zero-padded byte rows for every value from min to max, each followed by
+    the separator; returns the table and the value of its first row.
+    """
+    low, high = int(values.min()), int(values.max())
+    if decimals:
+        texts = [f"{v / 10 ** decimals:.{decimals}f}{separator}" for v in range(low, high + 1)]
+    else:
+        texts = [f"{v}{separator}" for v in range(low, high + 1)]
+    table = np.zeros((len(texts), max(len(text) for text in texts)), dtype=np.uint8)
+    for i, text in enumerate(texts):
+        table[i, :len(text)] = np.frombuffer(text.encode(), dtype=np.uint8)
+    return table, low
+
+
+def encode_csv_rows(columns: Dict[str, np.ndarray]) -> bytes:
+    """
+    Render integer columns (from draw_columns) as CSV lines.
+
+    Each column's distinct values are formatted once; rows are gathered
+    into a fixed-width byte matrix, whose zero padding is then dropped.
+    """
+    tables = []
+    for i, name in enumerate(COLUMNS):
+        separator = "\n" if i == len(COLUMNS) - 1 else ","
+        decimals = 1 if name == "oldpeak" else 0
+        tables.append(_text_table(columns[name], decimals, separator))
+
+    n_rows = len(columns[COLUMNS[0]])
+    width = sum(table.shape[1] for table, _ in tables)
+    text = np.empty((n_rows, width), dtype=np.uint8)
+    offset = 0
+    for name, (table, low) in zip(COLUMNS, tables):
+        end = offset + table.shape[1]
+        text[:, offset:end] = table.take(columns[name] - low, axis=0)
+        offset = end
+    return text[text != 0].tobytes()
+
+
+def write_dataset(
+    output_path: Path,
+    n_rows: int,
+    profile: str = "forest",
+    seed: Optional[int] = 42,
+    chunk_size: int = 1_000_000
+) -> int:
+    """Write n_rows synthetic rows as CSV, one chunk at a time; returns the row count."""
+    if chunk_size < 1:
+        raise ValueError(f"chunk_size must be at least 1, got {chunk_size}")
+    rng = np.random.default_rng(seed)
+    written = 0
+    with open(output_path, "wb") as handle:
+        handle.write((",".join(COLUMNS) + "\n").encode())
+        while written < n_rows:
+            size = min(chunk_size, n_rows - written)
+            handle.write(encode_csv_rows(draw_columns(size, rng, profile)))
+            written += size
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic heart-disease dataset")
+    parser.add_argument("output", type=Path, help="CSV file to write")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Rows to generate")
+    parser.add_argument(
+        "--profile", choices=PROFILES, default="forest", help="Distributions and label rule"
+    )
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    parser.add_argument(
+        "--chunk-size", type=int, default=1_000_000, help="Rows generated per chunk"
+    )
+    args = parser.parse_args()
+    if args.chunk_size < 1:
+        parser.error("--chunk-size must be at least 1")
+
+    start = time.perf_counter()
+    rows = write_dataset(args.output, args.rows, args.profile, args.seed, args.chunk_size)
+    elapsed = time.perf_counter() - start
+    rate = rows / max(elapsed, 1e-9)
+    print(f"Wrote {rows} rows to {args.output} in {elapsed:.1f}s ({rate:,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
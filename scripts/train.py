@@ -0,0 +1,415 @@
+"""
+Train, tune and export the serving models.
+
+Usage:
+    python scripts/train.py [--data data/processed/heart_disease_input.csv]
+        [--family random_forest knn] [--cv 5] [--jobs -1]
+        [--latency-budget-ms 1.0] [--report models/training_report.json] [--no-export]
+
+Steps:
+    1. Load the CSV and label it (``label`` or ``target`` column, else the
+       --label-rule applied column-wise), split it and fit the scaler.
+       The split and scaled matrices are cached under data/cache, keyed by
+       the data file's digest and the split settings, so reruns skip this.
+    2. For each model family, run a cross-validated grid search over
+       PARAM_GRIDS on all cores.
+    3. Refit every candidate on the training split (in parallel), export it
+       as an artifact and record its held-out accuracy, artifact size and
+       the compiled model's latency for one row and per row in a batch.
+    4. Pick, per family, the most accurate candidate (by CV accuracy) whose
+       single-row p99 latency is within --latency-budget-ms, and write it
+       to the paths in the settings (joblib model, scaler and artifact).
+
+The report lists every candidate, so the accuracy/latency/size trade-off
+can be reviewed before deploying. Run from the repository root.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import time
+import warnings
+from datetime import date
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import joblib
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import accuracy_score
+from sklearn.model_selection import GridSearchCV, StratifiedKFold, train_test_split
+from sklearn.neighbors import KNeighborsClassifier
+from sklearn.preprocessing import StandardScaler
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from app.core.config import get_settings  # noqa: E402
+from app.services.artifact import export_model, file_digest, load_model  # noqa: E402
+from app.services.prediction import FEATURE_NAMES  # noqa: E402
+
+settings = get_settings()
+
+DEFAULT_DATA = ROOT / "data/processed/heart_disease_input.csv"
+CACHE_DIR = ROOT / "data/cache"
+# Bump when the cached arrays change meaning
+CACHE_VERSION = 1
+
+# Labels for data without a label column, as the old per-model scripts derived them
+LABEL_RULES = {
+    "forest": lambda frame: (frame["chol"] > 240) | (frame["thalach"] < 100),
+    "knn": lambda frame: (
+        (frame["chol"] > 240) | (frame["thalach"] < 100) | (frame["oldpeak"] > 2.5)
+    ),
+}
+
+ESTIMATORS = {
+    "random_forest": lambda: RandomForestClassifier(random_state=42),
+    "knn": lambda: KNeighborsClassifier(),
+}
+
+# The forest keeps at least CASCADE_FAST_TREES trees for the cascade's fast stage;
+# the KNN stays euclidean, the only metric the compiled model supports
+PARAM_GRIDS = {
+    "random_forest": {
+        "n_estimators": [50, 100, 200],
+        "max_depth": [None, 8, 16],
+        "min_samples_leaf": [1, 5],
+    },
+    "knn": {
+        "n_neighbors": [5, 11, 21, 41],
+        "weights": ["uniform", "distance"],
+    },
+}
+
+OUTPUT_PATHS = {
+    "random_forest": (
+        settings.FOREST_MODEL_PATH, settings.FOREST_SCALER_PATH, settings.FOREST_ARTIFACT_PATH
+    ),
+    "knn": (settings.KNN_MODEL_PATH, settings.KNN_SCALER_PATH, settings.KNN_ARTIFACT_PATH),
+}
+
+
+def label_frame(data: pd.DataFrame, label_rule: str) -> Tuple[pd.DataFrame, int]:
+    """
+    The feature columns plus ``label``, derived with label_rule if the data has none.
+
+    Rows with a missing or non-numeric feature or label are dropped; returns
+    the labelled frame and the number of dropped rows.
+    """
+    if "label" not in data.columns and "target" in data.columns:
+        data = data.rename(columns={"target": "label"})
+    columns = FEATURE_NAMES + (["label"] if "label" in data.columns else [])
+    data = data[columns].apply(pd.to_numeric, errors="coerce")
+    complete = data.notna().all(axis=1)
+    dropped = int((~complete).sum())
+    if dropped:
+        data = data[complete]
+    if "label" not in data.columns:
+        data = data.assign(label=LABEL_RULES[label_rule](data).astype(int))
+    return data, dropped
+
+
+def load_labelled(path: Path, label_rule: str) -> pd.DataFrame:
+    """A whole CSV, labelled by label_frame."""
+    data = pd.read_csv(path)
+    if "label" not in data.columns and "target" not in data.columns:
+        print(f"No label column in {path}; applying the {label_rule} label rule")
+    data, dropped = label_frame(data, label_rule)
+    if dropped:
+        print(f"Dropping {dropped} incomplete rows from {path}")
+    return data
+
+
+def prepare(
+    path: Path,
+    label_rule: str = "forest",
+    test_size: float = 0.2,
+    seed: int = 42,
+    cache_dir: Optional[Path] = CACHE_DIR
+) -> Dict[str, np.ndarray]:
+    """
+    Split and scale a dataset, reusing a cached result for the same inputs.
+
+    Returns raw and scaled train/test matrices, the labels and the scaler's
+    statistics (mean, scale, var, n_samples).
+    """
+    key_source = json.dumps(
+        [CACHE_VERSION, file_digest([path]), label_rule, test_size, seed], sort_keys=True
+    )
+    cache_file = None
+    if cache_dir is not None:
+        key = hashlib.sha256(key_source.encode()).hexdigest()[:16]
+        cache_file = Path(cache_dir) / f"split-{key}.npz"
+        if cache_file.exists():
+            with np.load(cache_file) as cached:
+                return dict(cached)
+
+    data = load_labelled(path, label_rule)
+    X = data[FEATURE_NAMES].to_numpy(dtype=np.float64)
+    y = data["label"].to_numpy(dtype=np.int64)
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=test_size, random_state=seed
+    )
+    scaler = StandardScaler().fit(X_train)
+    prepared = {
+        "X_train": X_train,
+        "X_test": X_test,
+        "y_train": y_train,
+        "y_test": y_test,
+        "X_train_scaled": scaler.transform(X_train),
+        "X_test_scaled": scaler.transform(X_test),
+        "mean": scaler.mean_,
+        "scale": scaler.scale_,
+        "var": scaler.var_,
+        "n_samples": np.asarray(scaler.n_samples_seen_),
+    }
+    if cache_file is not None:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        # Written under a temporary name so an interrupted run leaves no partial cache
+        tmp = cache_file.with_name(cache_file.stem + ".tmp.npz")
+        np.savez(tmp, **prepared)
+        os.replace(tmp, cache_file)
+    return prepared
+
+
+def rebuild_scaler(prepared: Dict[str, np.ndarray]) -> StandardScaler:
+    """The fitted StandardScaler, restored from the cached statistics."""
+    scaler = StandardScaler()
+    scaler.mean_ = prepared["mean"]
+    scaler.scale_ = prepared["scale"]
+    scaler.var_ = prepared["var"]
+    scaler.n_samples_seen_ = int(prepared["n_samples"])
+    scaler.n_features_in_ = len(prepared["mean"])
+    return scaler
+
+
+def search(family: str, prepared: Dict[str, np.ndarray], cv: int, jobs: int) -> List[Dict]:
+    """Cross-validate every grid point of a family; returns one entry per candidate."""
+    grid = GridSearchCV(
+        ESTIMATORS[family](),
+        PARAM_GRIDS[family],
+        cv=StratifiedKFold(n_splits=cv, shuffle=True, random_state=42),
+        scoring="accuracy",
+        n_jobs=jobs,
+        refit=False
+    )
+    grid.fit(prepared["X_train_scaled"], prepared["y_train"])
+    results = grid.cv_results_
+    return [
+        {
+            "family": family,
+            "params": params,
+            "cv_accuracy": round(float(mean), 4),
+            "cv_std": round(float(std), 4),
+            "fit_seconds": round(float(fit_time), 4),
+        }
+        for params, mean, std, fit_time in zip(
+            results["params"], results["mean_test_score"], results["std_test_score"],
+            results["mean_fit_time"]
+        )
+    ]
+
+
+def fit_candidate(
+    family: str, params: Dict, prepared: Dict[str, np.ndarray], artifact_path: Path
+):
+    """Fit one candidate on the training split and export it; returns (model, accuracy, size)."""
+    warnings.simplefilter("ignore")
+    model = ESTIMATORS[family]().set_params(**params)
+    model.fit(prepared["X_train_scaled"], prepared["y_train"])
+    accuracy = accuracy_score(prepared["y_test"], model.predict(prepared["X_test_scaled"]))
+    export_model(model, rebuild_scaler(prepared), artifact_path, FEATURE_NAMES)
+    return model, float(accuracy), artifact_path.stat().st_size
+
+
+def measure_latency(
+    artifact_path: Path, X: np.ndarray, repeats: int = 200, batch_size: int = 256
+) -> Dict:
+    """
+    Latency of the compiled model the service loads from this artifact.
+
+    Single rows are scored ``repeats`` times (p50 and p99 in ms); a batch of
+    ``batch_size`` rows gives the amortized cost per row (us). The folded
+    model takes raw rows, as the service passes them.
+    """
+    compiled, _, _ = load_model(artifact_path, mmap_mode=None)
+    rows = X[np.arange(repeats) % len(X)]
+    for row in rows[:20]:
+        compiled.predict_proba(row[None, :])
+    timings = []
+    for row in rows:
+        start = time.perf_counter()
+        compiled.predict_proba(row[None, :])
+        timings.append(time.perf_counter() - start)
+    batch = X[np.arange(batch_size) % len(X)]
+    start = time.perf_counter()
+    for _ in range(5):
+        compiled.predict_proba(batch)
+    per_row = (time.perf_counter() - start) / (5 * batch_size)
+    return {
+        "latency_p50_ms": round(float(np.percentile(timings, 50)) * 1e3, 4),
+        "latency_p99_ms": round(float(np.percentile(timings, 99)) * 1e3, 4),
+        "batch_us_per_row": round(per_row * 1e6, 3),
+    }
+
+
+def evaluate(
+    candidates: List[Dict], prepared: Dict[str, np.ndarray], jobs: int, workdir: Path
+) -> List:
+    """
+    Refit, export and time every candidate; fills in the candidate entries.
+
+    Fitting runs in parallel; latency is measured one candidate at a time
+    so the timings do not compete for cores. Returns the fitted models.
+    """
+    paths = [workdir / f"candidate-{i}.artifact" for i in range(len(candidates))]
+    fitted = Parallel(n_jobs=jobs)(
+        delayed(fit_candidate)(candidate["family"], candidate["params"], prepared, path)
+        for candidate, path in zip(candidates, paths)
+    )
+    models = []
+    for candidate, path, (model, accuracy, size) in zip(candidates, paths, fitted):
+        candidate["test_accuracy"] = round(accuracy, 4)
+        candidate["artifact_bytes"] = size
+        candidate.update(measure_latency(path, prepared["X_test"]))
+        models.append(model)
+    return models
+
+
+def choose(candidates: List[Dict], latency_budget_ms: Optional[float]) -> int:
+    """
+    Index of the most accurate candidate (CV accuracy, then lower p99 latency)
+    within the latency budget; the fastest one if none is within it.
+    """
+    order = sorted(
+        range(len(candidates)),
+        key=lambda i: (-candidates[i]["cv_accuracy"], candidates[i]["latency_p99_ms"])
+    )
+    for i in order:
+        if latency_budget_ms is None or candidates[i]["latency_p99_ms"] <= latency_budget_ms:
+            return i
+    fastest = min(range(len(candidates)), key=lambda i: candidates[i]["latency_p99_ms"])
+    print(f"No candidate meets the {latency_budget_ms}ms budget; using the fastest")
+    return fastest
+
+
+def save_model(family: str, model, scaler, metadata: Dict):
+    """Write a model, its scaler and its artifact to the serving paths of its family."""
+    model_path, scaler_path, artifact_path = (ROOT / path for path in OUTPUT_PATHS[family])
+    model_path.parent.mkdir(parents=True, exist_ok=True)
+    joblib.dump(model, model_path)
+    joblib.dump(scaler, scaler_path)
+    export_model(
+        model, scaler, artifact_path, FEATURE_NAMES,
+        source_digest=file_digest([model_path, scaler_path]),
+        metadata=metadata
+    )
+    print(f"Wrote {model_path}, {scaler_path} and {artifact_path}")
+
+
+def export_selected(
+    family: str, model, candidate: Dict, prepared: Dict[str, np.ndarray], version: str
+):
+    """Write the chosen model and its scaler, with the search results as metadata."""
+    save_model(family, model, rebuild_scaler(prepared), {
+        "version": version,
+        "trained_date": date.today().isoformat(),
+        "accuracy": candidate["test_accuracy"],
+        "params": candidate["params"],
+    })
+
+
+def train(
+    data_path: Path,
+    families: Sequence[str],
+    cv: int = 5,
+    jobs: int = -1,
+    latency_budget_ms: Optional[float] = None,
+    label_rule: str = "forest",
+    cache_dir: Optional[Path] = CACHE_DIR,
+    export: bool = True,
+    version: str = "1.0.0"
+) -> Dict:
+    """Run the whole pipeline; returns the report (every candidate, and the chosen ones)."""
+    start = time.perf_counter()
+    prepared = prepare(data_path, label_rule, cache_dir=cache_dir)
+    report = {
+        "data": str(data_path),
+        "train_rows": int(len(prepared["y_train"])),
+        "test_rows": int(len(prepared["y_test"])),
+        "latency_budget_ms": latency_budget_ms,
+        "candidates": [],
+        "selected": {},
+    }
+    with tempfile.TemporaryDirectory() as workdir:
+        for family in families:
+            candidates = search(family, prepared, cv, jobs)
+            models = evaluate(candidates, prepared, jobs, Path(workdir))
+            best = choose(candidates, latency_budget_ms)
+            report["candidates"].extend(candidates)
+            report["selected"][family] = candidates[best]
+            if export:
+                export_selected(family, models[best], candidates[best], prepared, version)
+    report["seconds"] = round(time.perf_counter() - start, 2)
+    return report
+
+
+def print_candidates(report: Dict):
+    """One line per candidate, chosen ones marked with *."""
+    selected = [json.dumps(c["params"], sort_keys=True) for c in report["selected"].values()]
+    print(f"{'':2}{'family':<14} {'cv_acc':>7} {'test_acc':>8} {'p50_ms':>8} {'p99_ms':>8} "
+          f"{'us/row':>8} {'size_kb':>9}  params")
+    for c in report["candidates"]:
+        mark = "*" if json.dumps(c["params"], sort_keys=True) in selected else " "
+        print(
+            f"{mark:2}{c['family']:<14} {c['cv_accuracy']:>7.4f} {c['test_accuracy']:>8.4f} "
+            f"{c['latency_p50_ms']:>8.3f} {c['latency_p99_ms']:>8.3f} "
+            f"{c['batch_us_per_row']:>8.2f} "
+            f"{c['artifact_bytes'] / 1024:>9.1f}  {c['params']}"
+        )
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    parser = argparse.ArgumentParser(description="Train, tune and export the serving models")
+    parser.add_argument("--data", type=Path, default=DEFAULT_DATA, help="Training CSV")
+    parser.add_argument("--family", nargs="+", choices=list(ESTIMATORS), default=list(ESTIMATORS),
+                        help="Model families to train")
+    parser.add_argument("--cv", type=int, default=5, help="Cross-validation folds")
+    parser.add_argument("--jobs", type=int, default=-1, help="Parallel jobs (-1 = all cores)")
+    parser.add_argument("--latency-budget-ms", type=float, help="Max single-row p99 latency")
+    parser.add_argument("--label-rule", choices=list(LABEL_RULES), default="forest",
+                        help="Labels for data without a label column")
+    parser.add_argument(
+        "--version", default="1.0.0", help="Model version recorded in the artifacts"
+    )
+    parser.add_argument("--report", type=Path, help="Write the report here (JSON)")
+    parser.add_argument("--no-cache", action="store_true", help="Do not read or write data/cache")
+    parser.add_argument("--no-export", action="store_true", help="Only report; leave models/ alone")
+    args = parser.parse_args(argv)
+
+    warnings.simplefilter("ignore")
+    report = train(
+        args.data,
+        args.family,
+        cv=args.cv,
+        jobs=args.jobs,
+        latency_budget_ms=args.latency_budget_ms,
+        label_rule=args.label_rule,
+        cache_dir=None if args.no_cache else CACHE_DIR,
+        export=not args.no_export,
+        version=args.version
+    )
+    print_candidates(report)
+    print(f"Trained in {report['seconds']}s")
+    if args.report:
+        args.report.write_text(json.dumps(report, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
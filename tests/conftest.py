@@ -1,7 +1,14 @@
 """Pytest configuration and fixtures."""
+import os
+import tempfile
+
 import pytest
 from fastapi.testclient import TestClient
-from app.main import app
+
+# Settings are read once, when app.main is first imported: keep test logs out of logs/
+os.environ.setdefault("LOG_FILE", os.path.join(tempfile.mkdtemp(prefix="heart-tests-"), "app.log"))
+
+from app.main import app  # noqa: E402
 
 
 @pytest.fixture
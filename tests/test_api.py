@@ -31,6 +31,26 @@ def test_model_info(client):
     assert "version" in data
     assert "features" in data
     assert len(data["features"]) == 13
+    assert data["version"] == "1.0.0"
+    assert len(data["checksum"]) == 64
+
+
+def test_model_info_reports_registry(client):
+    """Test that model info lists every servable model."""
+    response = client.get("/api/v1/model/info")
+    models = response.json()["models"]
+    assert set(models) == {"random_forest", "knn", "auto"}
+    assert "loaded" in models["knn"]
+
+
+def test_predict_with_selected_model(client, sample_valid_input):
+    """Test that model_type selects the model used for a prediction."""
+    response = client.post("/api/v1/predict?model_type=knn", json=sample_valid_input)
+    assert response.status_code == 200
+    assert response.json()["model_used"] == "knn"
+    
+    response = client.post("/api/v1/predict?model_type=svm", json=sample_valid_input)
+    assert response.status_code == 422
 
 
 def test_predict_valid_input(client, sample_valid_input):
@@ -0,0 +1,161 @@
+"""Test cases for pickle-free model artifacts."""
+import shutil
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.core.config import get_settings
+from app.services.artifact import (
+    ArtifactError,
+    export_compiled_forest,
+    export_model,
+    load_model,
+    read_manifest,
+)
+from app.services.neighbors import CompiledKNN
+from app.services.prediction import FEATURE_NAMES, PredictionService
+from app.services.tree_ensemble import CompiledForest
+
+settings = get_settings()
+
+
+@pytest.fixture(scope="module")
+def cohort():
+    """Raw feature matrix of the bundled dataset."""
+    return pd.read_csv("data/raw/heart.csv")[FEATURE_NAMES].to_numpy(dtype=float)
+
+
+@pytest.mark.parametrize("model_path, scaler_path", [
+    (settings.FOREST_MODEL_PATH, settings.FOREST_SCALER_PATH),
+    (settings.KNN_MODEL_PATH, settings.KNN_SCALER_PATH),
+])
+def test_export_round_trip_matches_sklearn(tmp_path, cohort, model_path, scaler_path):
+    """Test that an exported model scores raw inputs exactly like sklearn on scaled ones."""
+    model, scaler = joblib.load(model_path), joblib.load(scaler_path)
+    checksum = export_model(
+        model, scaler, tmp_path / "model.artifact", FEATURE_NAMES, metadata={"version": "2.0.0"}
+    )
+    compiled, loaded_scaler, manifest = load_model(tmp_path / "model.artifact")
+    
+    assert isinstance(compiled, (CompiledForest, CompiledKNN))
+    assert compiled.folded
+    assert manifest["checksum"] == checksum
+    assert manifest["feature_names"] == FEATURE_NAMES
+    assert manifest["metadata"] == {"version": "2.0.0"}
+    np.testing.assert_array_equal(loaded_scaler.transform(cohort), scaler.transform(cohort))
+    np.testing.assert_array_equal(
+        compiled.predict_proba(cohort), model.predict_proba(scaler.transform(cohort))
+    )
+
+
+def test_forest_artifact_is_memory_mapped(tmp_path, cohort):
+    """Test that the node arrays are views of the mapped file and the tables are rebuilt."""
+    model = joblib.load(settings.FOREST_MODEL_PATH)
+    export_model(model, joblib.load(settings.FOREST_SCALER_PATH), tmp_path / "f.artifact", FEATURE_NAMES)
+    
+    compiled, _, _ = load_model(tmp_path / "f.artifact", mmap_mode="r")
+    in_memory, _, _ = load_model(tmp_path / "f.artifact", mmap_mode=None)
+    assert compiled.is_mapped
+    assert not isinstance(compiled._children2, np.memmap)
+    assert compiled.mapped_nbytes == sum(array.nbytes for array in compiled.to_arrays().values())
+    assert not in_memory.is_mapped
+    assert in_memory.mapped_nbytes == 0
+    np.testing.assert_array_equal(compiled.predict_proba(cohort), in_memory.predict_proba(cohort))
+
+
+
+def test_knn_artifact_is_memory_mapped(tmp_path, cohort):
+    """Test that the KNN training block stays mapped and the float32 copy is built lazily."""
+    model, scaler = joblib.load(settings.KNN_MODEL_PATH), joblib.load(settings.KNN_SCALER_PATH)
+    export_model(model, scaler, tmp_path / "knn.artifact", FEATURE_NAMES)
+    
+    compiled, _, _ = load_model(tmp_path / "knn.artifact", mmap_mode="r")
+    in_memory, _, _ = load_model(tmp_path / "knn.artifact", mmap_mode=None)
+    assert compiled.is_mapped
+    assert not in_memory.is_mapped
+    assert compiled.nbytes == compiled.train.nbytes + compiled.labels.nbytes
+    np.testing.assert_array_equal(compiled.predict_proba(cohort), in_memory.predict_proba(cohort))
+    assert compiled.nbytes > compiled.train.nbytes * 3 // 2
+    
+    kd_tree, _, _ = load_model(tmp_path / "knn.artifact", knn_index="kd_tree")
+    kd_tree.predict_proba(cohort)
+    assert kd_tree.nbytes == kd_tree.train.nbytes + kd_tree.labels.nbytes
+
+
+def test_corrupt_artifact_is_rejected(tmp_path):
+    """Test that a flipped data byte fails the checksum and foreign files have no manifest."""
+    path = tmp_path / "knn.artifact"
+    export_model(
+        joblib.load(settings.KNN_MODEL_PATH), joblib.load(settings.KNN_SCALER_PATH), path, FEATURE_NAMES
+    )
+    data = bytearray(path.read_bytes())
+    data[-1] ^= 0xFF
+    path.write_bytes(bytes(data))
+    
+    with pytest.raises(ArtifactError):
+        load_model(path)
+    assert read_manifest(settings.KNN_MODEL_PATH) is None
+
+
+def test_service_runs_from_artifact_alone(tmp_path, monkeypatch, cohort):
+    """Test that the service needs no pickles when only the artifact is deployed."""
+    monkeypatch.setattr(settings, "FOREST_MODEL_PATH", str(tmp_path / "missing.joblib"))
+    service = PredictionService()
+    service.cache = None
+    
+    assert service.models_loaded
+    assert service.model is None
+    assert service.manifest["metadata"]["version"]
+    reference = joblib.load("models/heart_disease_model_forest.joblib")
+    expected = reference.predict_proba(service.scale(cohort))[:, 1]
+    # Batches above COMPILED_FOREST_MAX_ROWS stay on the compiled forest
+    _, probabilities = service.predict_matrix(cohort)
+    np.testing.assert_array_equal(probabilities, expected)
+
+
+def test_standalone_forest_is_served_as_is(tmp_path, monkeypatch, cohort):
+    """Test that a compressed artifact is not rebuilt from the joblib files and scores every batch."""
+    compiled, scaler, _ = load_model(settings.FOREST_ARTIFACT_PATH, mmap_mode=None)
+    compressed = compiled.select_trees([0, 1, 2]).cap_depth(4)
+    path = tmp_path / "compressed.artifact"
+    export_compiled_forest(compressed, scaler, path, FEATURE_NAMES, metadata={"version": "1.0.0-small"})
+    monkeypatch.setattr(settings, "FOREST_ARTIFACT_PATH", str(path))
+    
+    service = PredictionService()
+    service.cache = None
+    
+    assert read_manifest(path)["standalone"]
+    assert service.compiled_model.n_trees == 3
+    assert service.model is None
+    assert service.manifest["metadata"]["version"] == "1.0.0-small"
+    _, probabilities = service.predict_matrix(cohort)
+    np.testing.assert_allclose(probabilities, compressed.predict_proba(cohort)[:, 1])
+    
+    # A forest that still expects scaled inputs cannot be served on its own
+    unfolded = CompiledForest.from_sklearn(joblib.load(settings.FOREST_MODEL_PATH))
+    with pytest.raises(ArtifactError):
+        export_compiled_forest(unfolded, scaler, path, FEATURE_NAMES)
+
+
+def test_stale_artifact_is_not_rewritten(tmp_path, monkeypatch, cohort):
+    """Test that an artifact exported from other files is skipped, not re-exported by the service."""
+    path = tmp_path / "forest.artifact"
+    shutil.copy(settings.FOREST_ARTIFACT_PATH, path)
+    scaler_path = tmp_path / "scaler.joblib"
+    # Same scaler, different file contents: the recorded digest no longer matches
+    joblib.dump(joblib.load(settings.FOREST_SCALER_PATH), scaler_path, compress=3)
+    monkeypatch.setattr(settings, "FOREST_ARTIFACT_PATH", str(path))
+    monkeypatch.setattr(settings, "FOREST_SCALER_PATH", str(scaler_path))
+    before = path.read_bytes()
+    
+    service = PredictionService()
+    service.cache = None
+    
+    assert path.read_bytes() == before
+    assert service.manifest == {}
+    assert service.compiled_model is not None
+    reference = joblib.load(settings.FOREST_MODEL_PATH)
+    _, probabilities = service.predict_matrix(cohort[:100])
+    np.testing.assert_array_equal(probabilities, reference.predict_proba(service.scale(cohort[:100]))[:, 1])
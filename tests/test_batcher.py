@@ -0,0 +1,133 @@
+"""Test cases for the micro-batching scheduler."""
+import asyncio
+import threading
+
+import pytest
+
+from app.models.schemas import PatientData
+from app.services.batcher import MicroBatcher
+from app.services.executor import InferenceExecutor
+
+
+class RecordingService:
+    """Stand-in service that records the batches it is asked to score."""
+    
+    def __init__(self, fail: bool = False):
+        self.batches = []
+        self.fail = fail
+    
+    def predict_batch(self, patients):
+        self.batches.append(len(patients))
+        if self.fail:
+            raise RuntimeError("model exploded")
+        return [{"age": patient.age} for patient in patients]
+
+
+def make_batcher(service, **kwargs) -> MicroBatcher:
+    """Build a batcher scoring through a one-thread executor."""
+    return MicroBatcher(InferenceExecutor(service, max_workers=1), **kwargs)
+
+
+def make_patient(age: int) -> PatientData:
+    """Build a valid patient with the given age."""
+    return PatientData(
+        age=age, sex=1, cp=2, trestbps=130, chol=250,
+        fbs=1, restecg=1, thalach=150, exang=0,
+        oldpeak=1.5, slope=2, ca=0, thal=2
+    )
+
+
+def test_concurrent_requests_share_one_batch():
+    """Test that requests arriving together are scored as one batch."""
+    service = RecordingService()
+    batcher = make_batcher(service, max_batch_size=64, max_wait_ms=50)
+    
+    async def run():
+        results = await asyncio.gather(*(batcher.submit(make_patient(age)) for age in range(20, 30)))
+        await batcher.stop()
+        return results
+    
+    results = asyncio.run(run())
+    assert [result["age"] for result in results] == list(range(20, 30))
+    assert service.batches == [10]
+
+
+def test_batches_capped_at_max_size():
+    """Test that a full queue is split into batches of at most max_batch_size."""
+    service = RecordingService()
+    batcher = make_batcher(service, max_batch_size=4, max_wait_ms=50)
+    
+    async def run():
+        results = await asyncio.gather(*(batcher.submit(make_patient(age)) for age in range(20, 30)))
+        await batcher.stop()
+        return results
+    
+    results = asyncio.run(run())
+    assert [result["age"] for result in results] == list(range(20, 30))
+    assert service.batches == [4, 4, 2]
+
+
+def test_batch_failure_reaches_every_caller():
+    """Test that a scoring error is raised to every request in the batch."""
+    batcher = make_batcher(RecordingService(fail=True), max_batch_size=8, max_wait_ms=5)
+    
+    async def run():
+        results = await asyncio.gather(
+            *(batcher.submit(make_patient(age)) for age in range(20, 23)),
+            return_exceptions=True
+        )
+        await batcher.stop()
+        return results
+    
+    results = asyncio.run(run())
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+def test_cancelled_request_is_not_scored():
+    """Test that a caller that goes away before its batch runs is skipped."""
+    service = RecordingService()
+    batcher = make_batcher(service, max_batch_size=8, max_wait_ms=20)
+    
+    async def run():
+        abandoned = asyncio.ensure_future(batcher.submit(make_patient(40)))
+        kept = asyncio.ensure_future(batcher.submit(make_patient(41)))
+        await asyncio.sleep(0)
+        abandoned.cancel()
+        result = await kept
+        await batcher.stop()
+        return result
+    
+    assert asyncio.run(run()) == {"age": 41}
+    assert service.batches == [1]
+
+
+def test_batches_run_on_every_pool_worker():
+    """Test that a new batch is dispatched while the previous one is still being scored."""
+    barrier = threading.Barrier(2, timeout=5)
+    
+    class PairedService(RecordingService):
+        def predict_batch(self, patients):
+            # Only returns once two batches are being scored at the same time
+            barrier.wait()
+            return super().predict_batch(patients)
+    
+    service = PairedService()
+    batcher = MicroBatcher(InferenceExecutor(service, max_workers=2), max_batch_size=1, max_wait_ms=0)
+    
+    async def run():
+        results = await asyncio.gather(*(batcher.submit(make_patient(age)) for age in (50, 51)))
+        await batcher.stop()
+        return results
+    
+    assert asyncio.run(run()) == [{"age": 50}, {"age": 51}]
+    assert service.batches == [1, 1]
+
+
+def test_metrics_expose_batcher_series(client, sample_valid_input):
+    """Test that batch-size and queue-depth series appear on /metrics."""
+    response = client.post("/api/v1/predict", json=sample_valid_input)
+    assert response.status_code == 200
+    
+    metrics = client.get("/metrics").text
+    assert "prediction_batch_size_bucket" in metrics
+    assert "prediction_batch_queue_depth" in metrics
@@ -0,0 +1,123 @@
+"""Test cases for the prediction result cache."""
+import numpy as np
+
+from app.services.cache import GridPredictionCache, PredictionCache
+from app.services.prediction import PredictionService
+
+
+def make_rows(n: int) -> np.ndarray:
+    """Build n distinct raw feature rows."""
+    rows = np.tile([55, 1, 2, 130, 250, 1, 1, 150, 0, 1.5, 2, 0, 2], (n, 1)).astype(float)
+    rows[:, 0] = np.arange(20, 20 + n)
+    return rows
+
+
+def test_cache_hit_after_put():
+    """Test that stored rows are returned and unknown rows miss."""
+    cache = PredictionCache(max_size=10)
+    X = cache.canonicalize(make_rows(3))
+    keys = cache.keys(X)
+    cache.put_many(keys[:2], np.array([0, 1]), np.array([0.1, 0.9]))
+    
+    assert cache.get_many(keys) == [(0, 0.1), (1, 0.9), None]
+
+
+def test_oldpeak_rounded_into_same_key():
+    """Test that oldpeak values equal at the cache precision share a key."""
+    cache = PredictionCache(oldpeak_decimals=1)
+    X = make_rows(2)
+    X[:, 0] = 40
+    X[0, 9], X[1, 9] = 1.5, 1.5000001
+    
+    keys = cache.keys(cache.canonicalize(X))
+    assert keys[0] == keys[1]
+
+
+def test_lru_eviction():
+    """Test that the least recently used entry is evicted first."""
+    cache = PredictionCache(max_size=2)
+    keys = cache.keys(cache.canonicalize(make_rows(3)))
+    cache.put_many(keys[:2], np.array([0, 0]), np.array([0.1, 0.2]))
+    cache.get_many([keys[0]])
+    cache.put_many(keys[2:], np.array([1]), np.array([0.8]))
+    
+    assert len(cache) == 2
+    assert cache.get_many(keys) == [(0, 0.1), None, (1, 0.8)]
+
+
+def test_entries_expire():
+    """Test that entries past their TTL are treated as misses."""
+    cache = PredictionCache(ttl_seconds=-1)
+    keys = cache.keys(cache.canonicalize(make_rows(1)))
+    cache.put_many(keys, np.array([1]), np.array([0.7]))
+    
+    assert cache.get_many(keys) == [None]
+    assert len(cache) == 0
+
+
+def test_service_only_scores_misses():
+    """Test that a batch sends only uncached rows to the model."""
+    service = PredictionService()
+    scored = []
+    score_matrix = service._score_matrix
+    
+    def spy(X):
+        scored.append(len(X))
+        return score_matrix(X)
+    
+    service._score_matrix = spy
+    X = make_rows(6)
+    first = service.predict_matrix(X[:4])
+    second = service.predict_matrix(X)
+    
+    assert scored == [4, 2]
+    np.testing.assert_array_equal(second[0][:4], first[0])
+    np.testing.assert_array_equal(second[1][:4], first[1])
+    np.testing.assert_allclose(second[1], score_matrix(X)[1])
+
+
+def test_reload_flushes_cache():
+    """Test that loading the model again empties the cache."""
+    service = PredictionService()
+    service.predict_matrix(make_rows(3))
+    assert len(service.cache) == 3
+    
+    service.load_models()
+    assert len(service.cache) == 0
+
+
+def test_cache_metrics_exposed(client, sample_valid_input):
+    """Test that cache counters appear on /metrics."""
+    client.post("/api/v1/predict", json=sample_valid_input)
+    client.post("/api/v1/predict", json=sample_valid_input)
+    
+    metrics = client.get("/metrics").text
+    assert "prediction_cache_hits_total" in metrics
+    assert "prediction_cache_misses_total" in metrics
+    assert "prediction_cache_entries" in metrics
+
+
+def test_grid_cache_keys_only_exact_grid_rows():
+    """Test that grid keys are unique per grid row and skip off-grid rows."""
+    cache = PredictionService("knn").cache
+    assert isinstance(cache, GridPredictionCache)
+    X = make_rows(4)
+    X[1, 9] = 1.6
+    X[2, 9] = 1.55
+    X[3, 0] = 150
+    
+    keys = cache.keys(cache.canonicalize(X))
+    assert keys[0] is not None and keys[1] is not None
+    assert keys[0] != keys[1]
+    assert keys[2] is None and keys[3] is None
+
+
+def test_grid_cache_serves_knn_predictions():
+    """Test that the KNN service answers repeated grid rows from its cache."""
+    service = PredictionService("knn")
+    X = make_rows(3)
+    first = service.predict_matrix(X)
+    
+    service._score_matrix = None
+    second = service.predict_matrix(X)
+    np.testing.assert_array_equal(second[1], first[1])
@@ -0,0 +1,64 @@
+"""Test cases for the model_type=auto cascade."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.cascade import CascadeService
+from app.services.prediction import FEATURE_NAMES, PredictionService, risk_level_codes
+
+
+@pytest.fixture(scope="module")
+def forest():
+    """Forest service without a result cache, so every row is really scored."""
+    service = PredictionService()
+    service.cache = None
+    return service
+
+
+def test_only_rows_near_a_boundary_escalate(forest):
+    """Test that the full forest only sees rows the fast stage is unsure about."""
+    cascade = CascadeService(forest, fast_trees=16, margin=0.15)
+    X = np.random.default_rng(0).normal(size=(300, 13)) * forest.scaler.scale_ + forest.scaler.mean_
+    fast = cascade.compiled_model.predict_proba(X)[:, 1]
+    escalated = []
+    
+    class Spy:
+        def __getattr__(self, name):
+            return getattr(forest, name)
+        
+        def predict_matrix(self, X_full):
+            escalated.append(len(X_full))
+            return forest.predict_matrix(X_full)
+    
+    cascade.forest = Spy()
+    predictions, probabilities = cascade.predict_matrix(X)
+    
+    near = cascade.near_boundary(fast)
+    assert escalated == [near.sum()]
+    np.testing.assert_array_equal(probabilities[~near], fast[~near])
+    np.testing.assert_allclose(probabilities[near], forest.predict_matrix(X[near])[1])
+
+
+def test_agrees_with_forest_on_heart_csv(forest):
+    """Test that the default cascade reproduces forest-only risk levels on the cohort."""
+    cascade = CascadeService(forest)
+    X = pd.read_csv("data/raw/heart.csv")[FEATURE_NAMES].to_numpy(dtype=float)
+    
+    predictions, probabilities = cascade.predict_matrix(X)
+    full_predictions, full_probabilities = forest.predict_matrix(X)
+    
+    np.testing.assert_array_equal(predictions, full_predictions)
+    np.testing.assert_array_equal(risk_level_codes(probabilities), risk_level_codes(full_probabilities))
+
+
+def test_auto_is_served_by_cascade(client, sample_valid_input):
+    """Test that only an explicit model_type=auto routes through the cascade."""
+    response = client.post("/api/v1/predict", json=sample_valid_input)
+    assert response.json()["model_used"] == "random_forest"
+    
+    response = client.post("/api/v1/predict?model_type=auto", json=sample_valid_input)
+    assert response.status_code == 200
+    assert response.json()["model_used"] == "auto"
+    
+    metrics = client.get("/metrics").text
+    assert 'cascade_rows_total{stage="fast"}' in metrics
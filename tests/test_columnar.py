@@ -0,0 +1,101 @@
+"""Test cases for the columnar and binary batch formats."""
+import json
+
+import numpy as np
+
+from app.api.columnar import parse_json_columns, validate_feature_matrix
+from app.services.prediction import FEATURE_NAMES
+
+
+def to_columns(rows):
+    """Turn a list of patient dicts into parallel feature arrays."""
+    return {name: [row[name] for row in rows] for name in FEATURE_NAMES}
+
+
+def make_rows(sample, n):
+    """Vary the sample patient's age over n rows."""
+    return [{**sample, "age": 30 + i} for i in range(n)]
+
+
+def test_json_columnar_matches_row_batch(client, sample_valid_input):
+    """Test that columnar results match the row-of-dicts batch endpoint."""
+    rows = make_rows(sample_valid_input, 5)
+    
+    columnar = client.post("/api/v1/predict/batch/columnar", json=to_columns(rows))
+    batch = client.post("/api/v1/predict/batch", json={"patients": rows})
+    
+    assert columnar.status_code == 200
+    data = columnar.json()
+    assert data["count"] == 5
+    expected = batch.json()["predictions"]
+    assert data["prediction"] == [p["prediction"] for p in expected]
+    assert data["probability"] == [p["probability"] for p in expected]
+    assert data["risk_level"] == [p["risk_level"] for p in expected]
+
+
+def test_binary_matrix_round_trip(client, sample_valid_input):
+    """Test the float32 request and response matrices."""
+    rows = make_rows(sample_valid_input, 4)
+    X = np.array([[row[name] for name in FEATURE_NAMES] for row in rows], dtype="<f4")
+    
+    response = client.post(
+        "/api/v1/predict/batch/columnar",
+        content=X.tobytes(),
+        headers={"Content-Type": "application/octet-stream", "X-Matrix-Shape": "4,13"}
+    )
+    
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/octet-stream"
+    assert response.headers["x-matrix-shape"] == "4,3"
+    out = np.frombuffer(response.content, dtype="<f4").reshape(4, 3)
+    
+    expected = client.post("/api/v1/predict/batch", json={"patients": rows}).json()["predictions"]
+    levels = response.headers["x-risk-levels"].split(",")
+    assert out[:, 0].astype(int).tolist() == [p["prediction"] for p in expected]
+    np.testing.assert_allclose(out[:, 1], [p["probability"] for p in expected], atol=0.005)
+    assert [levels[int(code)] for code in out[:, 2]] == [p["risk_level"] for p in expected]
+
+
+def test_binary_shape_mismatch_rejected(client):
+    """Test that a body that does not match the declared shape is a 400."""
+    response = client.post(
+        "/api/v1/predict/batch/columnar",
+        content=b"\x00" * 10,
+        headers={"Content-Type": "application/octet-stream", "X-Matrix-Shape": "1,13"}
+    )
+    assert response.status_code == 400
+
+
+def test_unequal_columns_rejected(client, sample_valid_input):
+    """Test that columns of different lengths are a 400."""
+    columns = to_columns(make_rows(sample_valid_input, 3))
+    columns["age"] = columns["age"][:2]
+    
+    response = client.post("/api/v1/predict/batch/columnar", json=columns)
+    assert response.status_code == 400
+
+
+def test_invalid_values_reported_by_row(client, sample_valid_input):
+    """Test that schema violations are a 422 naming the feature and row."""
+    columns = to_columns(make_rows(sample_valid_input, 3))
+    columns["sex"][1] = 3
+    columns["oldpeak"][2] = 9.0
+    
+    response = client.post("/api/v1/predict/batch/columnar", json=columns)
+    assert response.status_code == 422
+    locations = [error["loc"] for error in response.json()["detail"]]
+    assert ["body", "sex", 1] in locations
+    assert ["body", "oldpeak", 2] in locations
+
+
+def test_validation_mirrors_patient_schema(sample_valid_input, sample_invalid_input):
+    """Test that the vectorized rules accept and reject what PatientData does."""
+    valid = parse_json_columns(json.dumps(to_columns([sample_valid_input])).encode())
+    invalid = parse_json_columns(json.dumps(to_columns([sample_invalid_input])).encode())
+    
+    assert validate_feature_matrix(valid) == []
+    assert {error["loc"][1] for error in validate_feature_matrix(invalid)} == set(FEATURE_NAMES)
+    
+    fractional = valid.copy()
+    fractional[0, FEATURE_NAMES.index("age")] = 55.5
+    assert validate_feature_matrix(fractional)[0]["loc"] == ["body", "age", 0]
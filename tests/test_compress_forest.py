@@ -0,0 +1,59 @@
+"""Test cases for the forest compression tool."""
+import importlib.util
+import sys
+from pathlib import Path
+
+import numpy as np
+
+from app.core.config import get_settings
+from app.services.artifact import load_model
+
+ROOT = Path(__file__).resolve().parents[1]
+
+spec = importlib.util.spec_from_file_location("compress_forest", ROOT / "scripts" / "compress_forest.py")
+compress_forest = importlib.util.module_from_spec(spec)
+sys.modules["compress_forest"] = compress_forest
+spec.loader.exec_module(compress_forest)
+
+settings = get_settings()
+
+
+def test_tree_order_starts_with_closest_tree():
+    """Test that the greedy order is a permutation led by the tree closest to the forest."""
+    forest, _, _ = load_model(settings.FOREST_ARTIFACT_PATH, mmap_mode=None)
+    X, _ = compress_forest.load_evaluation(ROOT / "data/raw/heart.csv")
+    order = compress_forest.tree_order(forest, X[:200])
+
+    assert sorted(order.tolist()) == list(range(forest.n_trees))
+    target = forest.predict_proba(X[:200])[:, 1]
+    errors = [
+        ((forest.select_trees([i]).predict_proba(X[:200])[:, 1] - target) ** 2).sum()
+        for i in range(forest.n_trees)
+    ]
+    assert order[0] == int(np.argmin(errors))
+
+
+def test_choose_applies_budgets():
+    """Test that budgets filter candidates and the ranking depends on which are given."""
+    results = [
+        {"latency_us": 50, "artifact_bytes": 900, "accuracy": 0.90, "agreement": 1.0, "max_probability_change": 0},
+        {"latency_us": 30, "artifact_bytes": 400, "accuracy": 0.89, "agreement": 0.99, "max_probability_change": 0.1},
+        {"latency_us": 20, "artifact_bytes": 100, "accuracy": 0.85, "agreement": 0.95, "max_probability_change": 0.2},
+    ]
+    assert compress_forest.choose(results, max_latency_us=40) == 1
+    assert compress_forest.choose(results, max_bytes=150) == 2
+    assert compress_forest.choose(results, max_accuracy_loss=0.02) == 1
+    assert compress_forest.choose(results, min_agreement=0.999) == 0
+    assert compress_forest.choose(results, max_latency_us=10) is None
+
+
+def test_distilled_student_tracks_teacher():
+    """Test that a student trained on soft labels stays close to the forest."""
+    forest, scaler, _ = load_model(settings.FOREST_ARTIFACT_PATH, mmap_mode=None)
+    X, _ = compress_forest.load_evaluation(ROOT / "data/raw/heart.csv")
+    calibration = compress_forest.calibration_rows(X, 3000)
+    student = compress_forest.distill(forest, scaler.mean_, scaler.scale_, calibration, 5, 6)
+
+    assert student.folded and student.n_trees == 5
+    agreement = (student.predict(X) == forest.predict(X)).mean()
+    assert agreement > 0.9
@@ -0,0 +1,150 @@
+"""Test cases for the inference executor."""
+import asyncio
+import gc
+import threading
+import weakref
+
+import pytest
+
+from app.models.schemas import PatientData
+from app.services.executor import InferenceExecutor, InferenceOverloadedError
+from app.services.prediction import PredictionService
+from app.services.registry import ModelRegistry
+
+
+class BlockingService:
+    """Stand-in service whose predictions wait for a release signal."""
+    
+    def __init__(self):
+        self.release = threading.Event()
+        self.threads = []
+    
+    def predict_batch(self, patients):
+        self.threads.append(threading.current_thread().name)
+        self.release.wait(5)
+        return [{"prediction": 0} for _ in patients]
+
+
+def make_patient() -> PatientData:
+    """Build a valid patient."""
+    return PatientData(
+        age=55, sex=1, cp=2, trestbps=130, chol=250,
+        fbs=1, restecg=1, thalach=150, exang=0,
+        oldpeak=1.5, slope=2, ca=0, thal=2
+    )
+
+
+def test_inference_runs_off_the_event_loop():
+    """Test that the event loop keeps running while a prediction is in progress."""
+    service = BlockingService()
+    executor = InferenceExecutor(service, max_workers=1)
+    
+    async def run():
+        job = asyncio.ensure_future(executor.predict_batch([make_patient()]))
+        # The loop is free to run other work while the job blocks its thread
+        await asyncio.sleep(0.01)
+        assert not job.done()
+        service.release.set()
+        return await job
+    
+    assert asyncio.run(run()) == [{"prediction": 0}]
+    assert service.threads[0].startswith("inference")
+    executor.shutdown()
+
+
+def test_backlog_is_bounded():
+    """Test that jobs beyond workers plus queue are rejected."""
+    service = BlockingService()
+    executor = InferenceExecutor(service, max_workers=1, max_queue=1)
+    
+    async def run():
+        running = asyncio.ensure_future(executor.predict_batch([make_patient()]))
+        queued = asyncio.ensure_future(executor.predict_batch([make_patient()]))
+        await asyncio.sleep(0)
+        with pytest.raises(InferenceOverloadedError):
+            await executor.predict_batch([make_patient()])
+        service.release.set()
+        await asyncio.gather(running, queued)
+    
+    asyncio.run(run())
+    executor.shutdown()
+
+
+def test_cancelled_queued_job_never_runs():
+    """Test that cancelling a caller drops its job and frees its slot."""
+    service = BlockingService()
+    executor = InferenceExecutor(service, max_workers=1, max_queue=1)
+    
+    async def run():
+        running = asyncio.ensure_future(executor.predict_batch([make_patient()]))
+        queued = asyncio.ensure_future(executor.predict_batch([make_patient()]))
+        await asyncio.sleep(0)
+        queued.cancel()
+        # Let the cancellation reach the pool before the worker frees up
+        await asyncio.sleep(0)
+        service.release.set()
+        await running
+        with pytest.raises(asyncio.CancelledError):
+            await queued
+    
+    asyncio.run(run())
+    assert len(service.threads) == 1
+    assert executor._pending == 0
+    executor.shutdown()
+
+
+def test_process_mode_matches_in_process_scoring():
+    """Test that process workers produce the same predictions."""
+    service = PredictionService()
+    executor = InferenceExecutor(service, max_workers=1, mode="process")
+    patients = [make_patient(), make_patient()]
+    
+    try:
+        results = asyncio.run(executor.predict_batch(patients))
+    finally:
+        executor.shutdown()
+    assert results == service.predict_batch(patients)
+
+
+def test_process_mode_loads_nothing_on_the_loop():
+    """Test that process-mode batches never load a model in the calling process."""
+    loaded = []
+    
+    def load():
+        loaded.append(True)
+        return PredictionService()
+    
+    registry = ModelRegistry({"random_forest": load}, default_model="random_forest")
+    executor = InferenceExecutor(max_workers=1, mode="process", registry=registry)
+    patients = [make_patient(), make_patient()]
+    
+    try:
+        results = asyncio.run(executor.predict_batch(patients))
+    finally:
+        executor.shutdown()
+    assert loaded == []
+    assert results == PredictionService().predict_batch(patients)
+
+
+def test_unknown_mode_rejected():
+    """Test that only thread and process modes are accepted."""
+    with pytest.raises(ValueError):
+        InferenceExecutor(PredictionService(), mode="fiber")
+
+
+def test_replaced_model_is_released():
+    """Test that the executor holds no reference to a model once the registry swaps it out."""
+    registry = ModelRegistry({"random_forest": PredictionService}, default_model="random_forest")
+    executor = InferenceExecutor(max_workers=1, registry=registry)
+    patients = [make_patient()]
+    
+    try:
+        asyncio.run(executor.predict_batch(patients))
+        old = weakref.ref(registry.get())
+        registry.swap(None, PredictionService(), 0.0)
+        results = asyncio.run(executor.predict_batch(patients))
+    finally:
+        executor.shutdown()
+    gc.collect()
+    assert old() is None
+    assert results == registry.get().predict_batch(patients)
@@ -0,0 +1,38 @@
+"""Test cases for the artifact export script."""
+import importlib.util
+import shutil
+from pathlib import Path
+
+import joblib
+
+from app.core.config import get_settings
+from app.services.artifact import file_digest, read_manifest
+
+ROOT = Path(__file__).resolve().parents[1]
+
+spec = importlib.util.spec_from_file_location("export_model", ROOT / "scripts" / "export_model.py")
+export_model = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(export_model)
+
+settings = get_settings()
+
+
+def test_if_stale_refreshes_and_keeps_metadata(tmp_path):
+    """Test that --if-stale skips current artifacts and carries metadata into a refresh."""
+    output = tmp_path / "forest.artifact"
+    shutil.copy(settings.FOREST_ARTIFACT_PATH, output)
+    args = [settings.FOREST_MODEL_PATH, settings.FOREST_SCALER_PATH, str(output), "--if-stale"]
+    before = output.read_bytes()
+    
+    export_model.main(args)
+    assert output.read_bytes() == before
+    
+    scaler_path = tmp_path / "scaler.joblib"
+    joblib.dump(joblib.load(settings.FOREST_SCALER_PATH), scaler_path, compress=3)
+    args[1] = str(scaler_path)
+    export_model.main(args + ["--accuracy", "0.9"])
+    
+    manifest = read_manifest(output)
+    previous = read_manifest(settings.FOREST_ARTIFACT_PATH)["metadata"]
+    assert manifest["source_digest"] == file_digest([Path(settings.FOREST_MODEL_PATH), scaler_path])
+    assert manifest["metadata"] == dict(previous, accuracy=0.9)
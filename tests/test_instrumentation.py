@@ -0,0 +1,57 @@
+"""Test cases for per-stage inference instrumentation."""
+from prometheus_client import REGISTRY
+
+from app.core.metrics import InferenceInstrumentation, batch_size_bucket
+
+
+def stage_count(model: str, stage: str, batch_size: str) -> float:
+    """Observations recorded for one stage histogram series."""
+    return REGISTRY.get_sample_value(
+        "inference_stage_duration_seconds_count",
+        {"model": model, "stage": stage, "batch_size": batch_size}
+    ) or 0.0
+
+
+def prediction_count(model: str) -> float:
+    """Predictions counted for a model across all risk levels."""
+    return sum(
+        REGISTRY.get_sample_value(
+            "predictions_total", {"model_type": model, "risk_level": level}
+        ) or 0.0
+        for level in ("Low", "Moderate", "High", "Very High")
+    )
+
+
+def test_batch_size_buckets():
+    """Row counts map to coarse batch_size labels."""
+    assert [batch_size_bucket(n) for n in (1, 2, 16, 17, 1024, 1025)] == [
+        "1", "2-16", "2-16", "17-128", "129-1024", "1025+"
+    ]
+
+
+def test_disabled_instrumentation_records_nothing():
+    """A disabled instrumentation leaves the metrics untouched."""
+    instrumentation = InferenceInstrumentation(enabled=False)
+    before = stage_count("test_model", "predict_proba", "1")
+    instrumentation.observe("test_model", "predict_proba", 1, instrumentation.start())
+    instrumentation.count("test_model", ["Low"])
+    assert stage_count("test_model", "predict_proba", "1") == before
+    assert prediction_count("test_model") == 0
+
+
+def test_batch_request_records_stages_and_counts(client, sample_valid_input):
+    """A batch request records each stage and counts its predictions."""
+    # Scoring stages are skipped for cached rows, so only check the unconditional ones
+    stages = ("validate", "to_matrix", "serialize")
+    before = {stage: stage_count("random_forest", stage, "2-16") for stage in stages}
+    counted = prediction_count("random_forest")
+
+    response = client.post(
+        "/api/v1/predict/batch?model_type=random_forest",
+        json={"patients": [dict(sample_valid_input, age=30 + i) for i in range(3)]}
+    )
+    assert response.status_code == 200
+
+    for stage in stages:
+        assert stage_count("random_forest", stage, "2-16") == before[stage] + 1
+    assert prediction_count("random_forest") == counted + 3
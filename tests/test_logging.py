@@ -0,0 +1,61 @@
+"""Test cases for the queued logging pipeline."""
+import json
+import logging
+import queue
+
+from prometheus_client import REGISTRY
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from app.core.logging import DroppingQueueHandler, LogWriter
+from app.core.middleware import RequestMetricsMiddleware
+
+
+def make_record(message: str, level: int = logging.INFO) -> logging.LogRecord:
+    """A log record as a logger would create it."""
+    return logging.LogRecord("test", level, __file__, 1, message, None, None)
+
+
+def test_writer_batches_and_rotates(tmp_path):
+    """Queued records are written as JSON lines and the file rotates by size."""
+    records: queue.Queue = queue.Queue()
+    log_file = tmp_path / "app.log"
+    writer = LogWriter(records, str(log_file), max_bytes=2000, backup_count=2, batch_size=16)
+    writer.start()
+    for i in range(100):
+        records.put(make_record(f"message {i}"))
+    writer.stop()
+
+    assert (tmp_path / "app.log.1").exists() and (tmp_path / "app.log.2").exists()
+    assert not (tmp_path / "app.log.3").exists()
+    lines = log_file.read_text().splitlines()
+    assert json.loads(lines[-1])["message"] == "message 99"
+
+
+def test_full_queue_drops_and_counts():
+    """A full queue drops records instead of blocking the caller."""
+    handler = DroppingQueueHandler(queue.Queue(maxsize=1))
+    before = REGISTRY.get_sample_value("log_records_dropped_total") or 0.0
+    for i in range(3):
+        handler.handle(make_record(f"message {i}"))
+    assert REGISTRY.get_sample_value("log_records_dropped_total") == before + 2
+
+
+def test_request_logs_sampled_but_errors_always_logged(caplog):
+    """With sampling at zero only failed requests are logged."""
+    def ok(request):
+        return PlainTextResponse("ok")
+
+    app = Starlette(routes=[Route("/ok", ok)])
+    app.add_middleware(RequestMetricsMiddleware, sample_rate=0.0)
+    client = TestClient(app)
+    with caplog.at_level(logging.INFO, logger="app.core.middleware"):
+        client.get("/ok")
+        client.get("/missing")
+    messages = [
+        record.getMessage() for record in caplog.records if record.name == "app.core.middleware"
+    ]
+    assert not any("/ok" in message for message in messages)
+    assert any("/missing - Status: 404" in message for message in messages)
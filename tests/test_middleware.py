@@ -0,0 +1,54 @@
+"""Test cases for the request metrics middleware."""
+import json
+
+from prometheus_client import REGISTRY
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route, Router
+
+from app.core.middleware import UNMATCHED_ROUTE, route_template
+
+
+def request_count(method: str, endpoint: str, status: str) -> float:
+    """Requests recorded for one http_requests_total series."""
+    return REGISTRY.get_sample_value(
+        "http_requests_total", {"method": method, "endpoint": endpoint, "status": status}
+    ) or 0.0
+
+
+def test_requests_labelled_by_route_template(client):
+    """Requests are counted under the route template with their status."""
+    before = request_count("GET", "/health", "200")
+    assert client.get("/health").status_code == 200
+    assert request_count("GET", "/health", "200") == before + 1
+
+
+def test_unknown_paths_share_one_label(client):
+    """Paths matching no route do not create new series."""
+    before = request_count("GET", UNMATCHED_ROUTE, "404")
+    for path in ("/wp-login.php", "/.env", "/admin/config.php"):
+        assert client.get(path).status_code == 404
+    assert request_count("GET", UNMATCHED_ROUTE, "404") == before + 3
+    samples = [
+        sample.labels["endpoint"]
+        for metric in REGISTRY.collect() if metric.name == "http_requests"
+        for sample in metric.samples
+    ]
+    assert "/wp-login.php" not in samples
+
+
+def test_streamed_response_passes_through(client, sample_valid_input):
+    """Streaming responses still arrive intact and are counted once complete."""
+    before = request_count("POST", "/api/v1/predict/stream", "200")
+    body = "".join(json.dumps(sample_valid_input) + "\n" for _ in range(3))
+    response = client.post("/api/v1/predict/stream", content=body)
+    assert response.status_code == 200
+    assert len(response.text.splitlines()) == 3
+    assert request_count("POST", "/api/v1/predict/stream", "200") == before + 1
+
+
+def test_route_template_without_route_in_scope():
+    """Without a recorded route, the template is found by matching the router's routes."""
+    router = Router([Route("/patients/{patient_id}", PlainTextResponse("ok"))])
+    scope = {"type": "http", "method": "GET", "path": "/patients/42", "router": router}
+    assert route_template(scope) == "/patients/{patient_id}"
+    assert route_template(dict(scope, path="/nope")) == UNMATCHED_ROUTE
@@ -0,0 +1,58 @@
+"""Test cases for the compiled KNN evaluator."""
+import numpy as np
+import pytest
+from sklearn.neighbors import KNeighborsClassifier
+
+from app.services.neighbors import CompiledKNN
+from app.services.prediction import PredictionService
+
+
+@pytest.fixture(scope="module")
+def knn():
+    """Load the shipped KNN model."""
+    return PredictionService("knn").model
+
+
+@pytest.mark.parametrize("index", ["brute", "kd_tree"])
+def test_predict_proba_matches_sklearn(knn, index):
+    """Test parity with sklearn for both search strategies."""
+    compiled = CompiledKNN.from_sklearn(knn, index=index)
+    X = np.random.default_rng(0).normal(size=(500, 13))
+    
+    np.testing.assert_array_equal(compiled.predict_proba(X), knn.predict_proba(X))
+    distances, indices = compiled.kneighbors(X)
+    expected_distances, expected_indices = knn.kneighbors(X)
+    np.testing.assert_array_equal(indices, expected_indices)
+    np.testing.assert_allclose(distances, expected_distances, atol=1e-12)
+
+
+def test_blocks_give_same_neighbors(knn):
+    """Test that queries split across distance blocks are answered identically."""
+    compiled = CompiledKNN.from_sklearn(knn)
+    X = np.random.default_rng(1).normal(size=(100, 13))
+    expected = compiled.kneighbors(X)
+    
+    compiled.BLOCK_ELEMENTS = 7 * len(compiled.train)
+    for actual, wanted in zip(compiled.kneighbors(X), expected):
+        np.testing.assert_array_equal(actual, wanted)
+
+
+def test_distance_weights_and_exact_matches():
+    """Test distance weighting, including a query that coincides with a training row."""
+    rng = np.random.default_rng(2)
+    X_train = rng.normal(size=(60, 4))
+    y_train = (X_train[:, 0] > 0).astype(int)
+    knn = KNeighborsClassifier(n_neighbors=7, weights="distance").fit(X_train, y_train)
+    compiled = CompiledKNN.from_sklearn(knn)
+    
+    X = np.vstack([rng.normal(size=(20, 4)), X_train[:3]])
+    np.testing.assert_allclose(compiled.predict_proba(X), knn.predict_proba(X), atol=1e-12)
+
+
+def test_equal_distances_ordered_by_training_row():
+    """Test that tied neighbors are chosen deterministically."""
+    X_train = np.array([[1.0, 0.0], [0.0, 1.0], [-1.0, 0.0], [0.0, -1.0]])
+    compiled = CompiledKNN(X_train, labels=[0, 1, 0, 1], classes=np.array([0, 1]), n_neighbors=2)
+    
+    _, indices = compiled.kneighbors(np.zeros((1, 2)))
+    assert indices.tolist() == [[0, 1]]
@@ -87,3 +87,39 @@ def test_get_feature_names():
     assert "age" in features
     assert "sex" in features
     assert "cp" in features
+
+
+def test_predict_batch_matches_per_patient_predictions():
+    """Test that the vectorized batch path matches scoring patients one by one."""
+    service = PredictionService()
+    patient_data = [
+        PatientData(
+            age=age, sex=age % 2, cp=age % 4, trestbps=100 + age, chol=150 + 3 * age,
+            fbs=0, restecg=age % 3, thalach=200 - age, exang=age % 2,
+            oldpeak=(age % 7) * 0.8, slope=age % 3, ca=age % 5, thal=age % 4
+        )
+        for age in range(20, 80, 3)
+    ]
+    
+    batch_results = service.predict_batch(patient_data)
+    for patient, result in zip(patient_data, batch_results):
+        X = service.preprocess_input(patient)
+        probability = float(service.model.predict_proba(X)[0][1])
+        assert result["prediction"] == int(service.model.predict(X)[0])
+        assert result["probability"] == round(probability, 2)
+        assert result["risk_level"] == service._get_risk_level(probability)
+
+
+def test_predict_batch_empty():
+    """Test batch prediction with no patients."""
+    service = PredictionService()
+    assert service.predict_batch([]) == []
+
+
+def test_get_risk_levels_matches_scalar_bands():
+    """Test vectorized risk levels, including the band boundaries."""
+    service = PredictionService()
+    probabilities = np.array([0.0, 0.29, 0.3, 0.49, 0.5, 0.69, 0.7, 1.0])
+    
+    levels = service._get_risk_levels(probabilities)
+    assert list(levels) == [service._get_risk_level(p) for p in probabilities]
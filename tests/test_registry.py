@@ -0,0 +1,54 @@
+"""Test cases for the model registry."""
+import numpy as np
+import pytest
+
+from app.services.prediction import PredictionService
+from app.services.registry import ModelRegistry
+
+
+class CountingFactory:
+    """Factory that counts how often it builds a service."""
+    
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+        self.calls = 0
+    
+    def __call__(self):
+        self.calls += 1
+        return PredictionService(self.model_name)
+
+
+def test_models_load_lazily_and_once():
+    """Test that a model is only built on first use and then reused."""
+    knn = CountingFactory("knn")
+    registry = ModelRegistry({"random_forest": CountingFactory("random_forest"), "knn": knn})
+    
+    assert not registry.is_loaded("knn")
+    assert registry.describe()["knn"] == {"loaded": False}
+    service = registry.get("knn")
+    
+    assert registry.get("knn") is service
+    assert knn.calls == 1
+    assert registry.describe()["knn"]["loaded"] is True
+
+
+def test_auto_resolves_to_default_model():
+    """Test that auto and no selection both resolve to the default model."""
+    registry = ModelRegistry({"random_forest": lambda: None, "knn": lambda: None}, default_model="knn")
+    
+    assert registry.resolve("auto") == "knn"
+    assert registry.resolve(None) == "knn"
+    with pytest.raises(ValueError):
+        registry.resolve("svm")
+
+
+def test_knn_service_matches_sklearn():
+    """Test that the KNN service scores with the KNN model and scaler."""
+    service = PredictionService("knn")
+    X = np.random.default_rng(0).normal(size=(20, 13)) * 10 + 100
+    
+    predictions, probabilities = service.predict_matrix(X)
+    expected = service.model.predict_proba(service.scaler.transform(X))
+    np.testing.assert_allclose(probabilities, expected[:, 1])
+    assert service.latency.summary()["calls"] >= 1
+    assert service.memory_footprint()["private_bytes"] > 0
@@ -0,0 +1,127 @@
+"""Test cases for hot model reload."""
+import os
+import shutil
+
+import numpy as np
+import pytest
+from prometheus_client import REGISTRY
+
+from app.api.admin import PLACEHOLDER_API_KEY
+from app.core.config import get_settings
+from app.services.cascade import CascadeService
+from app.services.prediction import PredictionService
+from app.services.registry import ModelRegistry
+from app.services.reload import ModelReloader, ReloadError, canary_matrix
+
+settings = get_settings()
+
+
+def make_registry(forest_factory=PredictionService) -> ModelRegistry:
+    """Registry with a forest and a cascade built from it."""
+    registry = ModelRegistry(
+        {
+            "random_forest": forest_factory,
+            "auto": lambda: CascadeService(registry.get("random_forest"))
+        },
+        dependencies={"auto": ("random_forest",)}
+    )
+    return registry
+
+
+def test_reload_swaps_model_and_rebuilds_dependents():
+    """Test that a reload swaps in new services while old references keep working."""
+    registry = make_registry()
+    old_forest, old_cascade = registry.get("random_forest"), registry.get("auto")
+    canary = canary_matrix(64)
+    before = REGISTRY.get_sample_value(
+        "model_reload_duration_seconds_count", {"model": "random_forest"}
+    ) or 0
+    
+    swapped = ModelReloader(registry, canary).reload("random_forest")
+    
+    assert [entry["model"] for entry in swapped] == ["random_forest", "auto"]
+    assert registry.get("random_forest") is not old_forest
+    assert registry.get("auto").forest is registry.get("random_forest")
+    # Requests holding the old services finish on them
+    np.testing.assert_array_equal(
+        old_cascade.predict_matrix(canary)[1], registry.get("auto").predict_matrix(canary)[1]
+    )
+    assert REGISTRY.get_sample_value(
+        "model_reload_duration_seconds_count", {"model": "random_forest"}
+    ) == before + 1
+    version = {"model": "random_forest", "version": swapped[0]["version"], "checksum": swapped[0]["checksum"]}
+    assert REGISTRY.get_sample_value("model_version_info", version) == 1
+
+
+def test_canary_failure_keeps_live_model():
+    """Test that a model flipping most risk levels is rejected."""
+    broken = {"on": False}
+    
+    def factory():
+        service = PredictionService()
+        service.cache = None
+        if broken["on"]:
+            score = service._score_matrix
+            service._score_matrix = lambda X, record=True: (
+                lambda p: (p[0], 1 - p[1])
+            )(score(X, record))
+        return service
+    
+    registry = make_registry(factory)
+    live = registry.get("random_forest")
+    broken["on"] = True
+    
+    with pytest.raises(ReloadError):
+        ModelReloader(registry, canary_matrix(64)).reload("random_forest")
+    assert registry.get("random_forest") is live
+
+
+def test_canary_skips_caches_and_latency_windows():
+    """Test that canary rows are neither cached nor timed on the live or the new models."""
+    registry = make_registry()
+    live_forest, live_cascade = registry.get("random_forest"), registry.get("auto")
+    
+    ModelReloader(registry, canary_matrix(64)).reload("random_forest")
+    
+    for service in (live_forest, registry.get("random_forest")):
+        assert len(service.cache) == 0
+        assert service.latency.count == 0
+    assert live_cascade.latency.count == registry.get("auto").latency.count == 0
+
+
+def test_poll_reloads_once_files_settle(tmp_path, monkeypatch):
+    """Test that changed model files are reloaded after one unchanged poll."""
+    for key in ("FOREST_MODEL_PATH", "FOREST_SCALER_PATH", "FOREST_ARTIFACT_PATH"):
+        path = tmp_path / os.path.basename(getattr(settings, key))
+        shutil.copy(getattr(settings, key), path)
+        monkeypatch.setattr(settings, key, str(path))
+    registry = make_registry()
+    live = registry.get("random_forest")
+    reloader = ModelReloader(registry, canary_matrix(16))
+    
+    assert reloader.poll() == []
+    stat = os.stat(settings.FOREST_MODEL_PATH)
+    os.utime(settings.FOREST_MODEL_PATH, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert reloader.poll() == []
+    assert [entry["model"] for entry in reloader.poll()] == ["random_forest"]
+    assert registry.get("random_forest") is not live
+    assert reloader.poll() == []
+
+
+def test_admin_reload_is_disabled_without_api_key(client, monkeypatch):
+    """Test that the reload endpoint refuses every request while the key is unset or the default."""
+    for key in ("", PLACEHOLDER_API_KEY):
+        monkeypatch.setattr(settings, "API_KEY", key)
+        response = client.post("/api/v1/admin/reload", headers={"X-API-Key": key})
+        assert response.status_code == 503
+
+
+def test_admin_reload_requires_api_key(client, monkeypatch):
+    """Test that the reload endpoint needs the API key and reports the swap."""
+    monkeypatch.setattr(settings, "API_KEY", "test-admin-key")
+    response = client.post("/api/v1/admin/reload")
+    assert response.status_code == 401
+    
+    response = client.post("/api/v1/admin/reload", headers={"X-API-Key": "test-admin-key"})
+    assert response.status_code == 200
+    assert response.json()["reloaded"][0]["model"] == "random_forest"
@@ -0,0 +1,142 @@
+"""Test cases for incremental retraining."""
+import importlib.util
+import sys
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.neighbors import KNeighborsClassifier
+from sklearn.preprocessing import StandardScaler
+
+from app.services.artifact import load_model, read_manifest
+from app.services.prediction import FEATURE_NAMES
+
+ROOT = Path(__file__).resolve().parents[1]
+
+spec = importlib.util.spec_from_file_location("retrain", ROOT / "scripts" / "retrain.py")
+retrain = importlib.util.module_from_spec(spec)
+sys.modules["retrain"] = retrain
+spec.loader.exec_module(retrain)
+
+
+def make_rows(n: int, seed: int):
+    """Raw feature rows labelled by the forest rule."""
+    rng = np.random.default_rng(seed)
+    X = np.column_stack([rng.uniform(50, 250, n) for _ in FEATURE_NAMES])
+    X[:, FEATURE_NAMES.index("chol")] = rng.uniform(100, 400, n)
+    X[:, FEATURE_NAMES.index("thalach")] = rng.uniform(60, 220, n)
+    y = ((X[:, FEATURE_NAMES.index("chol")] > 240) | (X[:, FEATURE_NAMES.index("thalach")] < 100)).astype(int)
+    return X, y
+
+
+def test_grow_forest_keeps_old_trees_and_caps_size():
+    """Test that new trees are appended after the old ones and the oldest are dropped at the cap."""
+    X, y = make_rows(400, 0)
+    forest = RandomForestClassifier(n_estimators=5, random_state=0).fit(X, y)
+    old_trees = list(forest.estimators_)
+
+    grown = retrain.grow_forest(forest, *make_rows(200, 1), n_trees=3, max_trees=20, jobs=1)
+    assert grown.estimators_[:5] == old_trees
+    assert grown.n_estimators == len(grown.estimators_) == 8
+
+    capped = retrain.grow_forest(grown, *make_rows(200, 2), n_trees=4, max_trees=10, jobs=1)
+    assert len(capped.estimators_) == 10
+    assert old_trees[0] not in capped.estimators_
+    assert capped.predict_proba(X).shape == (len(X), 2)
+
+
+def test_grow_forest_seeds_differ_between_updates_at_the_cap():
+    """Test that a full forest still gets new seeds for each update."""
+    X, y = make_rows(400, 0)
+    forest = RandomForestClassifier(n_estimators=4, random_state=0).fit(X, y)
+    seeds = [
+        retrain.grow_forest(forest, X, y, n_trees=2, max_trees=4, jobs=1, seed_key=(update, 0)).random_state
+        for update in (1, 2)
+    ]
+    assert seeds[0] != seeds[1]
+
+
+def test_update_forest_carries_single_class_chunks():
+    """Test that a chunk missing a class is merged into the next chunk, or the one before at the end."""
+    X, y = make_rows(400, 0)
+    forest = RandomForestClassifier(n_estimators=4, random_state=0).fit(X, y)
+    X_new, y_new = make_rows(300, 3)
+    positive = y_new == 1
+    chunks = iter([
+        (X_new[positive][:50], y_new[positive][:50]),
+        (X_new[:100], y_new[:100]),
+        (X_new[positive][50:60], y_new[positive][50:60]),
+    ])
+
+    grown, rows = retrain.update_forest(forest, StandardScaler().fit(X), chunks, 2, 50, 1)
+    assert rows == 160
+    assert len(grown.estimators_) == 6
+
+
+def test_update_forest_merges_short_chunks():
+    """Test that a short last chunk joins the group before it instead of getting its own trees."""
+    X, y = make_rows(400, 0)
+    forest = RandomForestClassifier(n_estimators=4, random_state=0).fit(X, y)
+    X_new, y_new = make_rows(203, 5)
+    chunks = iter([(X_new[:100], y_new[:100]), (X_new[100:200], y_new[100:200]), (X_new[200:], y_new[200:])])
+
+    grown, rows = retrain.update_forest(forest, StandardScaler().fit(X), chunks, 2, 50, 1, min_rows=50)
+    assert rows == 203
+    assert len(grown.estimators_) == 8
+
+
+def test_next_version_bumps_patch():
+    """Test that the default version of an update bumps the patch number."""
+    assert retrain.next_version("1.0.0") == "1.0.1"
+    assert retrain.next_version("2.9") == "2.10"
+    with pytest.raises(ValueError):
+        retrain.next_version(None)
+
+
+def test_append_reference_keeps_newest_rows():
+    """Test that KNN rows are appended in order and the oldest dropped past the cap."""
+    X, y = make_rows(100, 0)
+    knn = KNeighborsClassifier(n_neighbors=3).fit(X, y)
+    X_new, y_new = make_rows(30, 1)
+
+    retrain.append_reference(knn, X_new, y_new, max_rows=110)
+    assert len(knn._fit_X) == 110
+    np.testing.assert_array_equal(knn._fit_X[-30:], X_new)
+    np.testing.assert_array_equal(knn._fit_X[:80], X[20:])
+    assert knn.classes_[knn._y][-30:].tolist() == y_new.tolist()
+
+
+def test_retrain_updates_serving_files(tmp_path, monkeypatch):
+    """Test that a retrain run writes a loadable artifact with the grown forest."""
+    X, y = make_rows(400, 0)
+    scaler = StandardScaler().fit(X)
+    forest = RandomForestClassifier(n_estimators=5, random_state=0).fit(scaler.transform(X), y)
+    paths = (tmp_path / "forest.joblib", tmp_path / "scaler.joblib", tmp_path / "forest.artifact")
+    joblib.dump(forest, paths[0])
+    joblib.dump(scaler, paths[1])
+    monkeypatch.setitem(retrain.OUTPUT_PATHS, "random_forest", tuple(str(path) for path in paths))
+
+    X_new, y_new = make_rows(250, 4)
+    new_data = pd.DataFrame(X_new, columns=FEATURE_NAMES).assign(label=y_new)
+    new_data.to_csv(tmp_path / "new.csv", index=False)
+
+    summary = retrain.retrain(
+        "random_forest", [tmp_path / "new.csv"], chunk_size=100, trees_per_chunk=2, jobs=1,
+        version="1.1.0"
+    )
+    assert summary["rows_added"] == 250
+    assert summary["trees"] == 11
+    assert summary["version"] == "1.1.0"
+
+    compiled, _, manifest = load_model(paths[2])
+    assert manifest["metadata"]["version"] == "1.1.0"
+    assert manifest["metadata"]["incremental_updates"] == 1
+    expected = joblib.load(paths[0]).predict_proba(scaler.transform(X_new))
+    np.testing.assert_allclose(compiled.predict_proba(X_new), expected, atol=1e-9)
+
+    summary = retrain.retrain("random_forest", [tmp_path / "new.csv"], chunk_size=100, jobs=1)
+    assert summary["version"] == "1.1.1"
+    assert read_manifest(paths[2])["metadata"]["incremental_updates"] == 2
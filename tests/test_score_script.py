@@ -0,0 +1,94 @@
+"""Test cases for the offline bulk-scoring script."""
+import importlib.util
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from app.services.prediction import FEATURE_NAMES, PredictionService
+
+ROOT = Path(__file__).resolve().parents[1]
+
+spec = importlib.util.spec_from_file_location("score", ROOT / "scripts" / "score.py")
+score = importlib.util.module_from_spec(spec)
+# Registered so the worker functions can be pickled by reference
+sys.modules["score"] = score
+spec.loader.exec_module(score)
+
+
+def make_cohort(path: Path, n: int = 50) -> pd.DataFrame:
+    """Write the first n rows of the processed dataset, with one incomplete row."""
+    data = pd.read_csv(ROOT / "data/processed/heart_disease_input.csv").head(n)
+    data.loc[3, "chol"] = None
+    data.to_csv(path, index=False)
+    return data
+
+
+def test_score_file_matches_service_in_order(tmp_path):
+    """Test that rows come back in input order with the service's predictions."""
+    data = make_cohort(tmp_path / "in.csv")
+    rows = score.score_file(
+        tmp_path / "in.csv", tmp_path / "out.csv", chunk_size=7, workers=2, progress=None
+    )
+
+    out = pd.read_csv(tmp_path / "out.csv")
+    assert rows == len(data)
+    assert out["row"].tolist() == list(range(len(data)))
+    assert out.loc[3, ["prediction", "probability", "risk_level"]].isna().all()
+
+    complete = data.drop(index=3)
+    predictions, probabilities = PredictionService().predict_matrix(
+        complete[FEATURE_NAMES].to_numpy(dtype=float)
+    )
+    scored = out.drop(index=3)
+    assert scored["prediction"].tolist() == predictions.tolist()
+    np.testing.assert_allclose(scored["probability"], np.round(probabilities, 2))
+
+
+def test_score_file_resumes_from_checkpoint(tmp_path):
+    """Test that an interrupted run resumes after the last checkpointed chunk."""
+    make_cohort(tmp_path / "in.csv")
+    output = tmp_path / "out.csv"
+    score.score_file(tmp_path / "in.csv", output, chunk_size=10, workers=1, progress=None)
+    complete = output.read_text()
+
+    # Simulate a crash after two chunks, with a partly written third chunk
+    checkpoint = tmp_path / "out.csv.ckpt"
+    state = json.loads(checkpoint.read_text())
+    lines = complete.splitlines(keepends=True)
+    state["rows"] = state["lines"] = 20
+    state["output_bytes"] = len("".join(lines[:21]).encode())
+    checkpoint.write_text(json.dumps(state))
+    output.write_text("".join(lines[:21]) + "20,1,0.")
+
+    rows = score.score_file(tmp_path / "in.csv", output, chunk_size=10, workers=1, progress=None)
+
+    assert rows == 50
+    assert output.read_text() == complete
+
+
+def test_resume_counts_blank_lines(tmp_path):
+    """Test that blank lines neither shift row numbers nor the resume offset."""
+    data = make_cohort(tmp_path / "plain.csv", n=30)
+    lines = (tmp_path / "plain.csv").read_text().splitlines(keepends=True)
+    # Blank lines after data rows 4 and 12, and a whitespace-only one after row 25
+    (tmp_path / "in.csv").write_text(
+        "".join(lines[:5] + ["\n"] + lines[5:13] + ["\n"] + lines[13:26] + ["  \n"] + lines[26:])
+    )
+    output = tmp_path / "out.csv"
+    score.score_file(tmp_path / "plain.csv", tmp_path / "plain_out.csv", chunk_size=10, progress=None)
+    score.score_file(tmp_path / "in.csv", output, chunk_size=10, workers=1, progress=None)
+    assert output.read_text() == (tmp_path / "plain_out.csv").read_text()
+
+    # Resume after the first chunk: 10 input lines, one of them blank
+    checkpoint = tmp_path / "out.csv.ckpt"
+    state = json.loads(checkpoint.read_text())
+    complete = output.read_text().splitlines(keepends=True)
+    state.update(rows=9, lines=10, output_bytes=len("".join(complete[:10]).encode()))
+    checkpoint.write_text(json.dumps(state))
+
+    rows = score.score_file(tmp_path / "in.csv", output, chunk_size=10, workers=1, progress=None)
+    assert rows == len(data)
+    assert output.read_text() == "".join(complete)
@@ -0,0 +1,38 @@
+"""Test cases for prediction response serialization."""
+import json
+
+import numpy as np
+
+from app.api.serialization import PredictionJSONResponse, encode_batch
+from app.services.prediction import PredictionService
+
+
+def test_encode_batch_matches_format_results():
+    """The encoded batch parses to the same rows format_results builds."""
+    rng = np.random.default_rng(0)
+    probabilities = np.concatenate([
+        rng.uniform(0, 1, 2000),
+        # Rounding and risk-band edges
+        [0.0, 1.0, 0.005, 0.295, 0.2999, 0.3, 0.4999, 0.5, 0.6951, 0.7, 0.125]
+    ])
+    predictions = (probabilities >= 0.5).astype(int)
+    expected = PredictionService().format_results(predictions, probabilities)
+
+    body = json.loads(encode_batch(predictions, probabilities, "knn", timestamp="T"))
+    assert body["count"] == len(expected)
+    assert body["model_used"] == "knn"
+    assert all(row.pop("timestamp") == "T" for row in body["predictions"])
+    assert body["predictions"] == expected
+
+
+def test_encode_empty_batch():
+    """An empty batch is still a valid response."""
+    body = json.loads(encode_batch(np.empty(0), np.empty(0), "random_forest"))
+    assert body == {"predictions": [], "count": 0, "model_used": "random_forest"}
+
+
+def test_response_renders_dicts_compactly():
+    """Dict content renders like JSONResponse."""
+    response = PredictionJSONResponse(content={"risk_level": "Low", "probability": 0.1})
+    assert response.body == b'{"risk_level":"Low","probability":0.1}'
+    assert response.headers["content-type"] == "application/json"
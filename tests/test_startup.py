@@ -0,0 +1,61 @@
+"""Tests for the startup pipeline and the readiness endpoint."""
+import asyncio
+import time
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.registry import get_model_registry
+from app.services.startup import StartupPipeline, get_startup_pipeline, warmup_patients
+
+
+def test_warmup_patients_are_valid():
+    """Warmup rows parse as PatientData, with integer fields typed as int."""
+    patients = warmup_patients(8)
+    assert len(patients) == 8
+    assert all(isinstance(patient.age, int) for patient in patients)
+
+
+def test_pipeline_loads_and_warms_models():
+    """The pipeline ends ready with a load and warmup timing per model."""
+    pipeline = StartupPipeline(get_model_registry(), ["random_forest", "auto"], warmup_rows=4)
+    assert not pipeline.ready
+    asyncio.run(pipeline.run())
+    info = pipeline.describe()
+    assert info["ready"] and info["stage"] == "ready"
+    assert {"load_random_forest", "load_auto", "warmup_random_forest", "warmup_auto"} <= set(info["timings"])
+
+
+def test_warmup_skips_cache_and_latency():
+    """Warmup rows are neither cached nor counted in the latency /model/info reports."""
+    forest = get_model_registry().get("random_forest")
+    forest.cache.clear()
+    calls = forest.latency.count
+    asyncio.run(StartupPipeline(get_model_registry(), ["random_forest"], warmup_rows=8).run())
+    assert len(forest.cache) == 0
+    assert forest.latency.count == calls
+
+
+def test_pipeline_reports_failure():
+    """An unknown model leaves the pipeline failed, not ready."""
+    pipeline = StartupPipeline(get_model_registry(), ["no_such_model"])
+    asyncio.run(pipeline.run())
+    assert pipeline.stage == "failed"
+    assert pipeline.error
+
+
+def test_ready_after_startup():
+    """/ready returns 503 until the lifespan pipeline has run, then 200."""
+    pipeline = get_startup_pipeline()
+    pipeline.stage = "starting"
+    assert TestClient(app).get("/ready").status_code == 503
+
+    with TestClient(app) as client:
+        assert client.get("/health").status_code == 200
+        deadline = time.monotonic() + 30
+        response = client.get("/ready")
+        while response.status_code != 200 and time.monotonic() < deadline:
+            time.sleep(0.05)
+            response = client.get("/ready")
+        assert response.status_code == 200
+        assert response.json()["stage"] == "ready"
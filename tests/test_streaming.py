@@ -0,0 +1,100 @@
+"""Test cases for the streaming NDJSON endpoint."""
+import asyncio
+import json
+
+from app.api.streaming import score_ndjson_stream
+from app.services.executor import InferenceExecutor
+
+
+class EchoService:
+    """Stand-in service that echoes each patient's age."""
+    
+    def predict_batch(self, patients):
+        return [{"age": patient.age, "risk_level": "Low"} for patient in patients]
+
+
+def ndjson(rows) -> bytes:
+    """Encode rows as newline-delimited JSON."""
+    return "".join(json.dumps(row) + "\n" for row in rows).encode()
+
+
+def collect(body_parts, chunk_size=2, max_line_bytes=4096):
+    """Run the stream scorer over body parts; returns (output chunks, parts read at first yield)."""
+    executor = InferenceExecutor(EchoService(), max_workers=1)
+    consumed = []
+    
+    async def body():
+        for part in body_parts:
+            consumed.append(part)
+            yield part
+    
+    async def run():
+        outputs, read_at_first_yield = [], None
+        async for chunk in score_ndjson_stream(body(), executor, chunk_size, max_line_bytes):
+            if read_at_first_yield is None:
+                read_at_first_yield = len(consumed)
+            outputs.append(chunk)
+        return outputs, read_at_first_yield
+    
+    try:
+        return asyncio.run(run())
+    finally:
+        executor.shutdown()
+
+
+def parse_output(chunks):
+    """Decode NDJSON output chunks into records."""
+    return [json.loads(line) for chunk in chunks for line in chunk.decode().splitlines()]
+
+
+def test_stream_endpoint_scores_and_reports_errors_inline(client, sample_valid_input):
+    """Test that bad lines get inline errors while good lines are scored."""
+    body = b"".join([
+        ndjson([sample_valid_input]),
+        b"\n",
+        b"{not json}\n",
+        ndjson([{**sample_valid_input, "age": 5}, sample_valid_input]),
+    ])
+    
+    response = client.post(
+        "/api/v1/predict/stream",
+        content=body,
+        headers={"Content-Type": "application/x-ndjson"}
+    )
+    
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert [record["line"] for record in records] == [1, 3, 4, 5]
+    assert records[0]["risk_level"] in ["Low", "Moderate", "High", "Very High"]
+    assert "error" in records[1]
+    assert records[2]["detail"][0]["loc"] == ["age"]
+    assert "prediction" in records[3]
+
+
+def test_lines_split_across_body_parts(sample_valid_input):
+    """Test that lines spanning several body parts are reassembled."""
+    body = ndjson([{**sample_valid_input, "age": age} for age in (30, 40, 50)])
+    parts = [body[i:i + 7] for i in range(0, len(body), 7)]
+    
+    outputs, _ = collect(parts, chunk_size=10)
+    assert [record["age"] for record in parse_output(outputs)] == [30, 40, 50]
+
+
+def test_results_stream_before_input_is_exhausted(sample_valid_input):
+    """Test that full chunks are answered before the rest of the body is read."""
+    parts = [ndjson([{**sample_valid_input, "age": 20 + i}]) for i in range(10)]
+    
+    outputs, read_at_first_yield = collect(parts, chunk_size=2)
+    assert read_at_first_yield == 2
+    assert len(outputs) == 5
+    assert [record["line"] for record in parse_output(outputs)] == list(range(1, 11))
+
+
+def test_oversized_line_reported_and_skipped(sample_valid_input):
+    """Test that an overlong line becomes one error and the stream continues."""
+    parts = [b'{"age": "' + b"9" * 300, b"9" * 300 + b'"}\n', ndjson([sample_valid_input])]
+    
+    records = parse_output(collect(parts, chunk_size=10, max_line_bytes=256)[0])
+    assert records[0] == {"line": 1, "error": "Line exceeds 256 bytes"}
+    assert records[1] == {"line": 2, "age": sample_valid_input["age"], "risk_level": "Low"}
@@ -0,0 +1,59 @@
+"""Test cases for the synthetic dataset generator."""
+import importlib.util
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+
+spec = importlib.util.spec_from_file_location("synthetic_data", ROOT / "scripts" / "synthetic_data.py")
+synthetic_data = importlib.util.module_from_spec(spec)
+sys.modules["synthetic_data"] = synthetic_data
+spec.loader.exec_module(synthetic_data)
+
+
+def test_generate_frame_follows_profile_rules():
+    """Test that values stay in the scripts' ranges and labels follow each profile's rule."""
+    forest = synthetic_data.generate_frame(20000, profile="forest", seed=1)
+    knn = synthetic_data.generate_frame(20000, profile="knn", seed=1)
+
+    for frame in (forest, knn):
+        assert list(frame.columns) == synthetic_data.COLUMNS
+        assert frame["age"].between(18, 100).all()
+        assert frame["trestbps"].between(90, 200).all()
+        assert frame["chol"].between(100, 400).all()
+        assert frame["thalach"].between(60, 220).all()
+        assert frame["oldpeak"].between(0, 6.2).all()
+        assert set(frame["ca"]) == {0, 1, 2, 3, 4}
+
+    assert forest["label"].tolist() == ((forest["chol"] > 240) | (forest["thalach"] < 100)).astype(int).tolist()
+    expected = (knn["chol"] > 240) | (knn["thalach"] < 100) | (knn["oldpeak"] > 2.5)
+    assert knn["label"].tolist() == expected.astype(int).tolist()
+    # Weighted bands: ages 30-75 carry weight 4, the rest 1 or 2
+    assert forest["age"].between(30, 75).mean() > 0.7
+
+
+def test_write_dataset_matches_pandas_and_is_seeded(tmp_path):
+    """Test that the chunked CSV writer reads back like pandas output and repeats per seed."""
+    first, second = tmp_path / "a.csv", tmp_path / "b.csv"
+    assert synthetic_data.write_dataset(first, 2500, profile="knn", seed=7, chunk_size=1000) == 2500
+    synthetic_data.write_dataset(second, 2500, profile="knn", seed=7, chunk_size=1000)
+    assert first.read_bytes() == second.read_bytes()
+
+    written = pd.read_csv(first)
+    assert len(written) == 2500
+    assert list(written.columns) == synthetic_data.COLUMNS
+
+    columns = synthetic_data.draw_columns(500, np.random.default_rng(3), "forest")
+    frame = pd.DataFrame(columns, columns=synthetic_data.COLUMNS)
+    frame["oldpeak"] = frame["oldpeak"] / synthetic_data.OLDPEAK_SCALE
+    assert synthetic_data.encode_csv_rows(columns) == frame.to_csv(index=False, header=False).encode()
+
+
+def test_write_dataset_rejects_empty_chunks(tmp_path):
+    """Test that a chunk size below one row is an error rather than an endless loop."""
+    with pytest.raises(ValueError):
+        synthetic_data.write_dataset(tmp_path / "data.csv", 10, chunk_size=0)
@@ -0,0 +1,82 @@
+"""Test cases for the unified training pipeline."""
+import importlib.util
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+
+spec = importlib.util.spec_from_file_location("train", ROOT / "scripts" / "train.py")
+train = importlib.util.module_from_spec(spec)
+# Registered so the candidate fits can be pickled by reference
+sys.modules["train"] = train
+spec.loader.exec_module(train)
+
+
+def make_dataset(path: Path, n: int = 300):
+    """Unlabelled rows, plus one non-numeric row that should be dropped."""
+    rng = np.random.default_rng(0)
+    frame = pd.DataFrame({
+        "age": rng.integers(30, 80, n), "sex": rng.integers(0, 2, n), "cp": rng.integers(0, 4, n),
+        "trestbps": rng.integers(90, 200, n), "chol": rng.integers(100, 400, n),
+        "fbs": rng.integers(0, 2, n), "restecg": rng.integers(0, 3, n),
+        "thalach": rng.integers(60, 220, n), "exang": rng.integers(0, 2, n),
+        "oldpeak": rng.uniform(0, 6, n).round(1), "slope": rng.integers(0, 3, n),
+        "ca": rng.integers(0, 4, n), "thal": rng.integers(0, 4, n),
+    })
+    frame.to_csv(path, index=False)
+    with open(path, "a") as handle:
+        handle.write("# trailing note\n")
+    return frame
+
+
+def test_prepare_labels_and_caches(tmp_path):
+    """Test that labels follow the rule, bad rows are dropped and the split is cached."""
+    frame = make_dataset(tmp_path / "data.csv")
+    cache = tmp_path / "cache"
+    prepared = train.prepare(tmp_path / "data.csv", "knn", cache_dir=cache)
+
+    assert len(prepared["y_train"]) + len(prepared["y_test"]) == len(frame)
+    expected = ((frame["chol"] > 240) | (frame["thalach"] < 100) | (frame["oldpeak"] > 2.5)).sum()
+    assert prepared["y_train"].sum() + prepared["y_test"].sum() == expected
+    np.testing.assert_allclose(prepared["X_train_scaled"].mean(axis=0), 0, atol=1e-9)
+    assert len(list(cache.glob("split-*.npz"))) == 1
+
+    cached = train.prepare(tmp_path / "data.csv", "knn", cache_dir=cache)
+    np.testing.assert_array_equal(cached["X_test_scaled"], prepared["X_test_scaled"])
+    # A different label rule is a different cache entry
+    train.prepare(tmp_path / "data.csv", "forest", cache_dir=cache)
+    assert len(list(cache.glob("split-*.npz"))) == 2
+
+
+def test_choose_respects_latency_budget():
+    """Test that the most accurate candidate within the budget wins, else the fastest."""
+    candidates = [
+        {"cv_accuracy": 0.90, "latency_p99_ms": 2.0},
+        {"cv_accuracy": 0.85, "latency_p99_ms": 0.5},
+        {"cv_accuracy": 0.80, "latency_p99_ms": 0.2},
+    ]
+    assert train.choose(candidates, None) == 0
+    assert train.choose(candidates, 1.0) == 1
+    assert train.choose(candidates, 0.1) == 2
+
+
+def test_train_reports_every_candidate(tmp_path, monkeypatch):
+    """Test that a small search reports accuracy, latency and size per candidate."""
+    make_dataset(tmp_path / "data.csv")
+    monkeypatch.setitem(train.PARAM_GRIDS, "random_forest", {"n_estimators": [20], "max_depth": [4, None]})
+    monkeypatch.setitem(train.PARAM_GRIDS, "knn", {"n_neighbors": [5]})
+
+    report = train.train(
+        tmp_path / "data.csv", ["random_forest", "knn"], cv=3, jobs=1,
+        cache_dir=None, export=False
+    )
+
+    assert [c["family"] for c in report["candidates"]] == ["random_forest", "random_forest", "knn"]
+    for candidate in report["candidates"]:
+        assert 0 <= candidate["test_accuracy"] <= 1
+        assert candidate["artifact_bytes"] > 0
+        assert candidate["latency_p99_ms"] >= candidate["latency_p50_ms"] > 0
+    assert set(report["selected"]) == {"random_forest", "knn"}
@@ -0,0 +1,146 @@
+"""Test cases for the compiled tree-ensemble evaluator."""
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from app.services.prediction import PredictionService
+from app.services.tree_ensemble import CompiledForest
+
+
+@pytest.fixture(scope="module")
+def forest():
+    """Load the shipped Random Forest model."""
+    return PredictionService().model
+
+
+@pytest.fixture(scope="module")
+def compiled(forest):
+    """Compile the shipped Random Forest model."""
+    return CompiledForest.from_sklearn(forest)
+
+
+def test_compiled_forest_structure(forest, compiled):
+    """Test that every tree and node is packed."""
+    assert compiled.n_trees == len(forest.estimators_)
+    assert compiled.n_nodes == sum(e.tree_.node_count for e in forest.estimators_)
+    assert list(compiled.classes_) == list(forest.classes_)
+
+
+@pytest.mark.parametrize("n_rows", [1, 7, 64, 3000])
+def test_predict_proba_matches_sklearn(forest, compiled, n_rows):
+    """Test parity with sklearn on both the small- and large-batch paths."""
+    X = np.random.default_rng(n_rows).normal(size=(n_rows, 13))
+    
+    np.testing.assert_allclose(compiled.predict_proba(X), forest.predict_proba(X), atol=1e-12)
+    np.testing.assert_array_equal(compiled.predict(X), forest.predict(X))
+
+
+def test_apply_strategies_agree(compiled):
+    """Test that the all-splits and level-by-level walks reach the same leaves."""
+    X = np.random.default_rng(0).normal(size=(50, 13)).astype(np.float32).astype(np.float64)
+    
+    np.testing.assert_array_equal(compiled._apply_dense(X), compiled._apply_levels(X))
+
+
+def test_thresholds_compared_in_float32():
+    """Test that inputs right at a split threshold branch like sklearn."""
+    rng = np.random.default_rng(1)
+    X_train = rng.normal(size=(200, 3))
+    y_train = (X_train[:, 0] + X_train[:, 1] > 0).astype(int)
+    forest = RandomForestClassifier(n_estimators=5, random_state=0).fit(X_train, y_train)
+    compiled = CompiledForest.from_sklearn(forest)
+    
+    # Probe exactly at, and one ulp around, every split threshold
+    thresholds = np.concatenate([e.tree_.threshold[e.tree_.feature >= 0] for e in forest.estimators_])
+    probes = np.concatenate([thresholds, np.nextafter(thresholds, np.inf), np.nextafter(thresholds, -np.inf)])
+    X = np.tile(probes[:, None], (1, 3))
+    
+    np.testing.assert_allclose(compiled.predict_proba(X), forest.predict_proba(X), atol=1e-12)
+
+
+def test_service_uses_compiled_backend():
+    """Test that the service scores through the compiled forest by default."""
+    service = PredictionService()
+    assert isinstance(service.compiled_model, CompiledForest)
+    
+    X = np.random.default_rng(2).normal(size=(5, 13)) * 10 + 100
+    predictions, probabilities = service.predict_matrix(X)
+    expected = service.model.predict_proba(service.scaler.transform(X))[:, 1]
+    np.testing.assert_allclose(probabilities, expected, atol=1e-12)
+
+
+def test_fold_scaler_matches_scaled_inputs(forest, compiled):
+    """Test that folding the scaler keeps every split decision, even on a split value."""
+    scaler = PredictionService().scaler
+    folded = compiled.fold_scaler(scaler.mean_, scaler.scale_)
+    assert folded.folded
+    
+    split = ~np.isinf(folded.threshold)
+    raw = folded.threshold[split]
+    probes = np.concatenate([raw, np.nextafter(raw, np.inf), np.round(raw, 1)])
+    features = folded.feature[split]
+    X = np.tile(scaler.mean_, (len(probes), 1))
+    X[np.arange(len(probes)), np.tile(features, 3)] = probes
+    
+    np.testing.assert_array_equal(folded.apply(X), compiled.apply(scaler.transform(X)))
+
+
+def test_service_maps_artifact_and_defers_sklearn_load():
+    """Test that the service serves small batches without unpickling the forest."""
+    service = PredictionService()
+    assert isinstance(service.compiled_model.threshold, np.memmap)
+    
+    service.predict_matrix(np.random.default_rng(4).normal(size=(2, 13)) * 10 + 100)
+    assert service._model is None
+
+
+def test_select_trees_averages_chosen_trees(compiled):
+    """Test that a tree subset equals the mean of its trees."""
+    X = np.random.default_rng(2).normal(size=(40, 13))
+    pair = compiled.select_trees([3, 1])
+    
+    assert pair.n_trees == 2
+    expected = (compiled.select_trees([3]).predict_proba(X) + compiled.select_trees([1]).predict_proba(X)) / 2
+    np.testing.assert_allclose(pair.predict_proba(X), expected, atol=1e-12)
+    np.testing.assert_allclose(compiled.prefix(5).predict_proba(X), compiled.select_trees(range(5)).predict_proba(X))
+
+
+def test_cap_depth_matches_truncated_walk():
+    """Test that a depth cap ends every walk at the node reached after that many steps."""
+    rng = np.random.default_rng(3)
+    X_train = rng.normal(size=(300, 4))
+    y_train = (X_train[:, 0] * X_train[:, 1] > 0).astype(int)
+    forest = RandomForestClassifier(n_estimators=4, random_state=0).fit(X_train, y_train)
+    compiled = CompiledForest.from_sklearn(forest)
+    capped = compiled.cap_depth(3)
+    X = rng.normal(size=(100, 4))
+    
+    assert capped.max_depth == 3
+    assert capped.n_nodes < compiled.n_nodes
+    # Three steps of the full forest reach the nodes that became leaves
+    node = np.repeat(compiled.roots[None, :], len(X), axis=0)
+    X32 = X.astype(np.float32).astype(np.float64)
+    for _ in range(3):
+        go_right = X32[np.arange(len(X))[:, None], compiled.feature[node]] > compiled.threshold[node]
+        node = np.where(go_right, compiled.right[node], compiled.left[node])
+    expected = compiled.value[node].mean(axis=1)
+    np.testing.assert_allclose(capped.predict_proba(X), expected, atol=1e-12)
+
+
+def test_merge_leaves_respects_tolerance():
+    """Test that merging only changes probabilities where sibling leaves were close."""
+    rng = np.random.default_rng(4)
+    X_train = rng.normal(size=(400, 3))
+    y_train = (X_train[:, 0] + rng.normal(scale=0.8, size=400) > 0).astype(int)
+    forest = RandomForestClassifier(n_estimators=3, max_depth=5, random_state=0).fit(X_train, y_train)
+    compiled = CompiledForest.from_sklearn(forest)
+    X = rng.normal(size=(200, 3))
+    
+    assert compiled.merge_leaves(0.0).n_nodes <= compiled.n_nodes
+    merged = compiled.merge_leaves(0.3)
+    assert merged.n_nodes < compiled.n_nodes
+    is_leaf = np.isinf(merged.threshold)
+    split = ~is_leaf & is_leaf[merged.left] & is_leaf[merged.right]
+    # No mergeable pair is left behind
+    assert (np.abs(merged.value[merged.left[split]] - merged.value[merged.right[split]]).max(axis=1) > 0.3).all()
+    np.testing.assert_allclose(merged.predict_proba(X).sum(axis=1), 1)